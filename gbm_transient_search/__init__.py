@@ -7,7 +7,10 @@ from gbm_transient_search.handlers.background import (
     GBMBackgroundModelFit,
     CreateBkgConfig,
 )
-from gbm_transient_search.handlers.transient_search import TransientSearch
+from gbm_transient_search.handlers.transient_search import (
+    TransientSearch,
+    TransientSearchRange,
+)
 from gbm_transient_search.handlers.localization import LocalizeTriggers
 from gbm_transient_search.handlers.report import CreateReportDate
 
@@ -29,6 +29,10 @@ from gbm_transient_search.processors.localization_setup import LocalizationSetup
 from gbm_transient_search.processors.localization_result_reader import (
     LocalizationResultReader,
 )
+from gbm_transient_search.processors.trigger_store import (
+    save_trigger_table,
+    trigger_table_path,
+)
 from gbm_transient_search.utils.env import get_bool_env_value, get_env_value
 
 base_dir = os.path.join(get_env_value("GBMDATA"), "bkg_pipe")
@@ -163,6 +167,12 @@ class LocalizeTriggers(luigi.Task):
                     )
                 )
 
+        # Columnar copy of the localized triggers for fast loading,
+        # written before the result file that marks the task as complete
+        save_trigger_table(
+            trigger_table_path(self.output()["result_file"].path), trigger_result
+        )
+
         with self.output()["result_file"].open("w") as f:
 
             yaml.dump(trigger_result, f, default_flow_style=False)
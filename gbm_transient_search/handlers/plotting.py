@@ -14,7 +14,10 @@ from gbm_transient_search.handlers.download import (
     DownloadPoshistData,
 )
 from gbm_transient_search.handlers.localization import ProcessLocalizationResult
-from gbm_transient_search.handlers.transient_search import TransientSearch
+from gbm_transient_search.handlers.transient_search import (
+    TransientSearch,
+    create_transient_detector,
+)
 from gbm_transient_search.processors.bkg_result_reader import BkgArvizReader
 from gbm_transient_search.utils.env import get_bool_env_value, get_env_value
 from gbm_transient_search.utils.file_utils import (
@@ -52,11 +55,19 @@ class PlotTriggers(luigi.Task):
     resources = {"cpu": 1}
 
     def requires(self):
-        return TransientSearch(
-            date=self.date,
-            data_type=self.data_type,
-            remote_host=self.remote_host,
-            step=self.step,
+        return dict(
+            transient_search=TransientSearch(
+                date=self.date,
+                data_type=self.data_type,
+                remote_host=self.remote_host,
+                step=self.step,
+            ),
+            overview=PlotTriggerOverview(
+                date=self.date,
+                data_type=self.data_type,
+                remote_host=self.remote_host,
+                step=self.step,
+            ),
         )
 
     def output(self):
@@ -68,7 +79,7 @@ class PlotTriggers(luigi.Task):
 
     def run(self):
 
-        with self.input().open("r") as f:
+        with self.input()["transient_search"].open("r") as f:
             trigger_information = yaml.safe_load(f)
 
         plot_tasks = []
@@ -89,6 +100,53 @@ class PlotTriggers(luigi.Task):
         os.system(f"touch {self.output().path}")
 
 
+class PlotTriggerOverview(luigi.Task):
+    """
+    Create the overview plots of the day and the plot data of the triggers.
+    This runs after the transient search, the detector loads the day in the
+    same way as the search (with the tail of the previous day, the rebinned
+    data comes from the rebin cache) and plots the triggers of the result file.
+    """
+
+    date = luigi.DateParameter()
+    data_type = luigi.Parameter(default="ctime")
+    remote_host = luigi.Parameter()
+    step = luigi.Parameter()
+
+    resources = {"cpu": 1}
+
+    def requires(self):
+        return TransientSearch(
+            date=self.date,
+            data_type=self.data_type,
+            remote_host=self.remote_host,
+            step=self.step,
+        )
+
+    def output(self):
+        return luigi.LocalTarget(
+            os.path.join(
+                base_dir,
+                f"{self.date:%y%m%d}",
+                self.data_type,
+                self.step,
+                "trigger",
+                "plot_data.hdf5",
+            )
+        )
+
+    def run(self):
+        transient_detector = create_transient_detector(pool=None)
+
+        try:
+            self.requires().load_day(transient_detector)
+            transient_detector.load_triggers(self.input().path)
+
+            transient_detector.plot_results(os.path.dirname(self.input().path))
+        finally:
+            transient_detector.close()
+
+
 class CreateAllPlots(luigi.WrapperTask):
     date = luigi.DateParameter()
     data_type = luigi.Parameter(default="ctime")
@@ -165,6 +223,12 @@ class CreateAllLightcurves(luigi.Task):
                 remote_host=self.remote_host,
                 step=self.step,
             ),
+            overview=PlotTriggerOverview(
+                date=self.date,
+                data_type=self.data_type,
+                remote_host=self.remote_host,
+                step=self.step,
+            ),
         )
 
     def output(self):
@@ -189,14 +253,7 @@ class CreateAllLightcurves(luigi.Task):
     def run(self):
         plotter = TriggerPlot.from_hdf5(
             trigger_yaml=self.input()["transient_search"].path,
-            data_path=os.path.join(
-                base_dir,
-                f"{self.date:%y%m%d}",
-                self.data_type,
-                self.step,
-                "trigger",
-                "plot_data.hdf5",
-            ),
+            data_path=self.input()["overview"].path,
         )
 
         plotter.create_trigger_plots(
@@ -1,15 +1,25 @@
 import datetime as dt
+import logging
 import os
+import time
 from datetime import datetime, timedelta
 
 import luigi
 import numpy as np
+import yaml
 
 from gbm_transient_search.handlers.background import GBMBackgroundModelFit
 from gbm_transient_search.handlers.download import DownloadData
 from gbm_transient_search.utils.configuration import gbm_transient_search_config
+from gbm_transient_search.processors.changepoint_cache import ChangepointCache
+from gbm_transient_search.processors.changepoints import ChangepointPool
+from gbm_transient_search.processors.day_tail import DayTailBuffer
+from gbm_transient_search.processors.multi_resolution import MultiResolutionSearch
 from gbm_transient_search.processors.transient_detector import TransientDetector
 from gbm_transient_search.utils.env import get_bool_env_value, get_env_value
+from gbm_transient_search.utils.file_utils import if_directory_not_existing_then_make
+from gbm_transient_search.utils.rebin_cache import RebinCache
+from gbm_transient_search.utils.stage_timer import StageTimer
 
 _valid_gbm_detectors = np.array(
     gbm_transient_search_config["data"]["detectors"]
@@ -19,6 +29,40 @@ base_dir = get_env_value("GBMDATA")
 
 simulate = get_bool_env_value("BKG_PIPE_SIMULATE")
 
+# Tails of the previous days, kept between the searches of this worker
+day_tail_buffer = DayTailBuffer(td_conf["previous_day_tail"])
+
+
+def create_transient_detector(pool):
+    """
+    Create the detector for the configured bin widths,
+    more than one bin width runs the multi resolution search
+    """
+    bin_widths = td_conf["bin_widths"]
+
+    rebin_cache = RebinCache(os.path.join(base_dir, "bkg_pipe", "cache"))
+
+    timer = StageTimer(trace_memory=td_conf["trace_memory"])
+
+    if len(bin_widths) > 1:
+        return MultiResolutionSearch(
+            bin_widths=bin_widths,
+            bad_fit_threshold=100,
+            pool=pool,
+            rebin_cache=rebin_cache,
+            low_memory=td_conf["low_memory"],
+            timer=timer,
+        )
+
+    return TransientDetector(
+        min_bin_width=bin_widths[0],
+        bad_fit_threshold=100,
+        pool=pool,
+        rebin_cache=rebin_cache,
+        low_memory=td_conf["low_memory"],
+        timer=timer,
+    )
+
 
 class TransientSearch(luigi.Task):
     date = luigi.DateParameter()
@@ -67,27 +111,214 @@ class TransientSearch(luigi.Task):
         )
 
     def run(self):
-        plot_dir = os.path.join(os.path.dirname(self.output().path))
+        with ChangepointPool() as pool:
+            transient_detector = create_transient_detector(pool)
 
-        transient_detector = TransientDetector(
-            result_file=self.input()["bkg_fit"].path,
-            min_bin_width=5,
-            bad_fit_threshold=100,
+            self.search(transient_detector)
+
+    def search(self, transient_detector):
+        """
+        Run the search for this date with an existing detector.
+        The overview plots are created by PlotTriggerOverview, so the
+        localization of the triggers does not wait for them.
+        """
+        if td_conf["engine"] not in ["changepoints", "windows"]:
+            raise ValueError(
+                f"Unknown transient search engine {td_conf['engine']}, "
+                "use changepoints or windows"
+            )
+
+        # The cache is shared by all steps of the day, the final step
+        # reuses the change points of the segments that did not change
+        transient_detector.changepoint_cache = ChangepointCache(
+            os.path.join(
+                base_dir,
+                "bkg_pipe",
+                f"{self.date:%y%m%d}",
+                self.data_type,
+                "changepoint_cache.hdf5",
+            )
         )
 
-        transient_detector.run(
-            min_separation=td_conf["min_separation"],
-            model=td_conf["model"],
+        previous_tail = self.load_day(transient_detector)
+
+        thresholds = dict(
             min_significance_brightest=td_conf["min_significance_brightest"],
             min_significance_others=td_conf["min_significance_others"],
             min_significant_dets=td_conf["min_significant_dets"],
             max_significant_dets=td_conf["max_significant_dets"],
         )
 
-        transient_detector.plot_results(plot_dir)
+        if td_conf["engine"] == "windows":
+            transient_detector.run_window_search(
+                durations=td_conf["window_durations"], **thresholds
+            )
+
+        else:
+            transient_detector.run(
+                min_separation=td_conf["min_separation"],
+                model=td_conf["model"],
+                coarse_factor=td_conf["coarse_factor"],
+                **thresholds,
+            )
+
+        if previous_tail is not None:
+            previous_result = self._previous_day_search().output()
+
+            # The triggers at the start of the day that continue a trigger of the
+            # previous day are removed. The search of the previous day is not
+            # required, to not chain the days, so this is skipped if it did not
+            # run yet.
+            if previous_result.exists():
+                with previous_result.open("r") as f:
+                    transient_detector.remove_known_triggers(yaml.safe_load(f))
+
+            else:
+                logging.warning(
+                    f"The transient search of the day before {self.date:%y%m%d} did "
+                    "not run yet, the triggers that continue one of its triggers "
+                    "are not removed"
+                )
 
         transient_detector.set_data_timestamp(
             self.input()["gbm_data_file"]["local_file"].path
         )
 
+        if_directory_not_existing_then_make(os.path.dirname(self.output().path))
+
         transient_detector.save_result(self.output().path)
+
+        # Run time and memory of the stages, to compare them across days and hosts
+        transient_detector.save_timing(
+            os.path.join(os.path.dirname(self.output().path), "search_timing.json")
+        )
+
+    def load_day(self, transient_detector):
+        """
+        Load the background fit of this date into the detector, with the tail
+        of the previous day if it is used. PlotTriggerOverview loads the day
+        in the same way, so the plots show the searched data.
+        :returns: tail of the previous day, None if it is not used
+        """
+        previous_tail = self._previous_tail()
+
+        transient_detector.load_result(
+            self.input()["bkg_fit"].path, previous_tail=previous_tail
+        )
+
+        return previous_tail
+
+    def _previous_day_search(self):
+        return TransientSearch(
+            date=self.date - timedelta(days=1),
+            data_type=self.data_type,
+            remote_host=self.remote_host,
+            step=self.step,
+        )
+
+    def _previous_tail(self):
+        """
+        Get the tail of the previous day, if it is enabled and the background
+        fit of the previous day exists (it is not required, to not chain the days)
+        """
+        if day_tail_buffer.tail_length <= 0:
+            return None
+
+        previous_fit = self._previous_day_search().requires()["bkg_fit"].output()
+
+        if not previous_fit.exists():
+            logging.info(
+                f"No background fit of the day before {self.date:%y%m%d}, "
+                "the search starts at midnight"
+            )
+            return None
+
+        return day_tail_buffer.tail(previous_fit.path)
+
+
+class TransientSearchRange(luigi.Task):
+    """
+    Run the transient search for all days of a date interval (e.g. 2020-01-01-2020-03-31)
+    with a single detector and worker pool, for the reprocessing of the archive.
+    Writes the same trigger_result.yml files as TransientSearch.
+    """
+
+    date_interval = luigi.DateIntervalParameter()
+    data_type = luigi.Parameter(default="ctime")
+    remote_host = luigi.Parameter()
+    step = luigi.Parameter()
+
+    resources = {"cpu": 1}
+
+    def _searches(self):
+        return [
+            TransientSearch(
+                date=date,
+                data_type=self.data_type,
+                remote_host=self.remote_host,
+                step=self.step,
+            )
+            for date in self.date_interval.dates()
+        ]
+
+    def requires(self):
+        return {
+            f"{search.date:%y%m%d}": search.requires() for search in self._searches()
+        }
+
+    def output(self):
+        return luigi.LocalTarget(
+            os.path.join(
+                base_dir,
+                "bkg_pipe",
+                "transient_search_range",
+                f"{self.date_interval.date_a:%y%m%d}_{self.date_interval.date_b:%y%m%d}",
+                self.data_type,
+                self.step,
+                "search_summary.yml",
+            )
+        )
+
+    def run(self):
+        summary = {"days": {}}
+
+        t_start = time.time()
+
+        with ChangepointPool() as pool:
+            transient_detector = create_transient_detector(pool)
+
+            for search in self._searches():
+
+                if search.complete():
+                    continue
+
+                t_day = time.time()
+
+                search.search(transient_detector)
+
+                summary["days"][f"{search.date:%y%m%d}"] = {
+                    "nr_triggers": len(
+                        transient_detector.trigger_information["triggers"]
+                    ),
+                    "run_time": time.time() - t_day,
+                }
+
+                logging.info(
+                    f"Searched {search.date:%y%m%d} in {time.time() - t_day:.1f} s"
+                )
+
+        run_time = time.time() - t_start
+        nr_days = len(summary["days"])
+
+        summary["run_time"] = run_time
+        summary["days_per_hour"] = nr_days / run_time * 3600 if nr_days > 0 else 0.0
+
+        logging.info(
+            f"Searched {nr_days} days in {run_time:.1f} s "
+            f"({summary['days_per_hour']:.1f} days per hour)"
+        )
+
+        os.makedirs(os.path.dirname(self.output().path), exist_ok=True)
+
+        with self.output().open("w") as f:
+            yaml.dump(summary, f, default_flow_style=False)
@@ -7,6 +7,7 @@ import arviz as az
 import numpy as np
 import pandas as pd
 import yaml
+from gbm_transient_search.utils.intervals import gap_idx
 
 
 class BkgArvizReader(object):
@@ -48,8 +49,7 @@ class BkgArvizReader(object):
         result_dict["total_time_bins"] = time_bins
 
         result_dict["saa_mask"] = np.ones(ntime_bins, dtype=bool)
-        jump_large = time_bins[1:, 0] - time_bins[0:-1, 1] > 10
-        idx = jump_large.nonzero()[0] + 1
+        idx = gap_idx(time_bins, min_gap=10)
         result_dict["saa_mask"][idx - 1] = False
         result_dict["saa_mask"][idx] = False
 
@@ -0,0 +1,155 @@
+import hashlib
+import os
+
+import h5py
+import numpy as np
+
+
+class ChangepointCache(object):
+    """
+    Persistent cache of the change points and significances of the segments
+    between two SAA passages.
+    The segments are keyed by a hash of their own time bins, counts, background,
+    the shift and scale of the mapped data and the search settings. A refit that
+    changes one segment keeps the entries of all other segments valid, as long
+    as it does not change the day-wide shift or scale. The entries that are not used by the latest
+    run are removed with prune, so the file does not grow between runs.
+    """
+
+    def __init__(self, cache_file):
+        """
+        :param cache_file: path of the hdf5 cache file
+        """
+        self._cache_file = cache_file
+
+    @staticmethod
+    def segment_key(*arrays, **settings):
+        """
+        Hash of the segment data and the search settings
+        :param arrays: arrays that define the segment (e.g. time bins and counts)
+        :param settings: search settings that change the change points
+        """
+        sha = hashlib.sha1()
+
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+
+            sha.update(f"{array.shape}{array.dtype}".encode())
+            sha.update(array.tobytes())
+
+        sha.update(repr(sorted(settings.items())).encode())
+
+        return sha.hexdigest()
+
+    def load(self, keys, group="segments"):
+        """
+        Get the cached entries of segments
+        :param keys: segment keys
+        :param group: group of the entries (e.g. per bin width)
+        :returns: dictionary with the entries of the cached keys, every entry has
+            the change_points (relative to the segment start) for each mapping,
+            the intervals (relative to the segment start) and their significances
+        """
+        entries = {}
+
+        if not os.path.exists(self._cache_file):
+            return entries
+
+        with h5py.File(self._cache_file, "r") as f:
+
+            if group not in f:
+                return entries
+
+            for key in keys:
+
+                if key not in f[group] or key in entries:
+                    continue
+
+                entry = f[group][key]
+
+                entries[key] = {
+                    "change_points": {
+                        mapping: cpts[()]
+                        for mapping, cpts in entry["change_points"].items()
+                    },
+                    "intervals": entry["intervals"][()],
+                    "significances": entry["significances"][()],
+                }
+
+        return entries
+
+    def store(self, entries, group="segments"):
+        """
+        Store the entries of segments
+        :param entries: dictionary with the entry (see load) of every segment key
+        :param group: group of the entries (e.g. per bin width)
+        """
+        cache_dir = os.path.dirname(self._cache_file)
+
+        if cache_dir != "" and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        with h5py.File(self._cache_file, "a") as f:
+
+            for key, entry in entries.items():
+
+                path = f"{group}/{key}"
+
+                if path in f:
+                    del f[path]
+
+                cache_entry = f.create_group(path)
+
+                for mapping, cpts in entry["change_points"].items():
+                    cache_entry.create_dataset(
+                        f"change_points/{mapping}", data=np.asarray(cpts, dtype=int)
+                    )
+
+                cache_entry.create_dataset(
+                    "intervals", data=np.asarray(entry["intervals"], dtype=int)
+                )
+                cache_entry.create_dataset(
+                    "significances", data=entry["significances"], compression="lzf"
+                )
+
+    def prune(self, keys, group="segments"):
+        """
+        Remove all entries of the group that are not in keys.
+        HDF5 does not release the space of deleted objects, so the kept
+        entries are copied to a new file that replaces the cache file.
+        :param keys: segment keys to keep
+        :param group: group of the entries (e.g. per bin width)
+        """
+        if not os.path.exists(self._cache_file):
+            return
+
+        with h5py.File(self._cache_file, "r") as f:
+
+            if group not in f or set(f[group].keys()) <= set(keys):
+                return
+
+        tmp_file = f"{self._cache_file}.tmp"
+
+        try:
+            with h5py.File(self._cache_file, "r") as f, h5py.File(tmp_file, "w") as g:
+
+                for name in f.keys():
+
+                    if name != group:
+                        f.copy(f[name], g, name=name)
+                        continue
+
+                    kept = g.create_group(group)
+
+                    for key in set(f[group].keys()) & set(keys):
+                        f.copy(f[group][key], kept, name=key)
+
+            os.replace(tmp_file, self._cache_file)
+
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    @property
+    def cache_file(self):
+        return self._cache_file
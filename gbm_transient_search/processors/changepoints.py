@@ -0,0 +1,437 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+from pathos.multiprocessing import cpu_count
+from pathos.pools import ProcessPool as Pool
+from gbm_transient_search.utils.growing_array import CumulativeSum, GrowingArray
+from scipy.special import xlogy
+
+
+class CumSumCost(ABC):
+    """
+    Base class for segment costs that can be evaluated from cumulative sums.
+    The cost of many segments ending at the same bin is calculated in one call.
+    """
+
+    min_size = 1
+
+    def __init__(self, signal):
+        """
+        :param signal: signal with shape (n_samples,) or (n_samples, n_features)
+        """
+        signal = self._as_2d(signal)
+
+        self._n_samples = signal.shape[0]
+        self._cum_signal = CumulativeSum(signal)
+
+    @staticmethod
+    def _as_2d(signal):
+        signal = np.asarray(signal, dtype=float)
+
+        if signal.ndim == 1:
+            signal = signal.reshape((-1, 1))
+
+        return signal
+
+    def extend(self, signal):
+        """
+        Append new samples to the signal
+        :param signal: new samples with shape (n_new,) or (n_new, n_features)
+        """
+        signal = self._as_2d(signal)
+
+        self._cum_signal.extend(signal)
+        self._n_samples += signal.shape[0]
+
+    @abstractmethod
+    def error(self, starts, end):
+        """
+        Calculate the cost of the segments [start, end) for all starts
+        :param starts: array of segment start indices
+        :param end: end index of the segments (exclusive)
+        """
+
+    @property
+    def n_samples(self):
+        return self._n_samples
+
+
+class CostL2CumSum(CumSumCost):
+    """
+    Least squared deviation cost, calculated from the cumulative
+    sums of the signal and the squared signal.
+    """
+
+    def __init__(self, signal):
+        signal = self._as_2d(signal)
+
+        self._cum_signal_sq = CumulativeSum(signal ** 2)
+
+        super(CostL2CumSum, self).__init__(signal)
+
+    def extend(self, signal):
+        signal = self._as_2d(signal)
+
+        super(CostL2CumSum, self).extend(signal)
+
+        self._cum_signal_sq.extend(signal ** 2)
+
+    def error(self, starts, end):
+        length = (end - starts).reshape((-1, 1))
+
+        cum_signal = self._cum_signal.values
+        cum_signal_sq = self._cum_signal_sq.values
+
+        seg_sum = cum_signal[end] - cum_signal[starts]
+        seg_sum_sq = cum_signal_sq[end] - cum_signal_sq[starts]
+
+        return np.sum(seg_sum_sq - seg_sum ** 2 / length, axis=1)
+
+
+class CostPoissonCumSum(CumSumCost):
+    """
+    Poisson cost (twice the negative log-likelihood of a constant rate
+    per segment without the data only terms), calculated from the
+    cumulative sum of the signal.
+    """
+
+    def __init__(self, signal):
+        self._check_signal(signal)
+
+        super(CostPoissonCumSum, self).__init__(signal)
+
+    def extend(self, signal):
+        self._check_signal(signal)
+
+        super(CostPoissonCumSum, self).extend(signal)
+
+    @staticmethod
+    def _check_signal(signal):
+        if np.any(np.asarray(signal) < 0):
+            raise ValueError("The poisson cost requires a non-negative signal")
+
+    def error(self, starts, end):
+        length = (end - starts).reshape((-1, 1))
+
+        cum_signal = self._cum_signal.values
+
+        seg_sum = cum_signal[end] - cum_signal[starts]
+
+        return 2 * np.sum(seg_sum - xlogy(seg_sum, seg_sum / length), axis=1)
+
+
+native_cost_models = {
+    "native_l2": CostL2CumSum,
+    "native_poisson": CostPoissonCumSum,
+}
+
+# ruptures models with an identical native cumulative sum implementation
+native_equivalents = {"l2": "native_l2"}
+
+
+class IncrementalPelt(object):
+    """
+    PELT change point detection for a signal that grows with time.
+    The optimal partition costs and the pruned admissible set are kept
+    between the updates, so appending samples only evaluates the new
+    candidate change points instead of segmenting the whole signal again.
+    The change points after each update are the same as the ones of pelt()
+    on the full signal with the same penalty.
+    """
+
+    def __init__(self, pen, model="native_l2", min_size=2, jump=5):
+        """
+        :param pen: penalty value
+        :param model: cost model, one of native_cost_models
+        :param min_size: minimum segment length
+        :param jump: subsample (one every jump points)
+        """
+        if model not in native_cost_models:
+            raise ValueError(
+                f"Model {model} is not supported, use one of {list(native_cost_models)}"
+            )
+
+        self._pen = pen
+        self._model = model
+        self._min_size = max(min_size, native_cost_models[model].min_size)
+        self._jump = jump
+
+        self._cost = None
+
+        # best_cost[t] is the penalized cost of the optimal partition of signal[0:t]
+        self._best_cost = GrowingArray(np.zeros(1))
+
+        # last_bkp[t] is the last change point before t in the optimal partition
+        self._last_bkp = GrowingArray(np.zeros(1, dtype=int))
+
+        self._admissible = np.empty(0, dtype=int)
+
+        # first candidate change point (multiple of jump)
+        self._next_bkp = int(np.ceil(self._min_size / jump)) * jump
+
+    def update(self, signal):
+        """
+        Append new samples and return the change points of the full signal
+        :param signal: new samples with shape (n_new,) or (n_new, n_features)
+        :returns: sorted list of breakpoints, the last one is n_samples
+        """
+        if self._cost is None:
+            self._cost = native_cost_models[self._model](signal)
+        else:
+            self._cost.extend(signal)
+
+        n_new = self._cost.n_samples + 1 - len(self._best_cost)
+
+        self._best_cost.append(np.full(n_new, np.nan))
+        self._last_bkp.append(np.zeros(n_new, dtype=int))
+
+        while self._next_bkp < self._cost.n_samples:
+            self._step(self._next_bkp)
+            self._next_bkp += self._jump
+
+        return self.predict()
+
+    def _best_partition(self, bkp):
+        """
+        Find the optimal last change point for a partition of signal[0:bkp]
+        """
+        # adding a point to the admissible set from the previous loop
+        new_adm_pt = ((bkp - self._min_size) // self._jump) * self._jump
+        admissible = np.append(self._admissible, new_adm_pt)
+
+        # only extend the change points for which a partition of 0:t exists
+        best_cost = self._best_cost.values
+
+        starts = admissible[~np.isnan(best_cost[admissible])]
+
+        costs = best_cost[starts] + (self._cost.error(starts, bkp) + self._pen)
+
+        best = np.argmin(costs)
+
+        return admissible, starts, costs, best
+
+    def _step(self, bkp):
+        """
+        Store the optimal partition of signal[0:bkp] and prune the admissible set
+        """
+        admissible, starts, costs, best = self._best_partition(bkp)
+
+        best_cost = self._best_cost.values
+
+        best_cost[bkp] = costs[best]
+        self._last_bkp.values[bkp] = starts[best]
+
+        # trimming the admissible set, the candidates are paired with the
+        # evaluated costs in order (as in ruptures)
+        self._admissible = admissible[: len(costs)][costs <= best_cost[bkp] + self._pen]
+
+    def predict(self):
+        """
+        Change points of the current signal, the end of the signal is
+        treated as the last change point without changing the stored state
+        :returns: sorted list of breakpoints, the last one is n_samples
+        """
+        if self._cost is None or self._cost.n_samples == 0:
+            return []
+
+        n_samples = self._cost.n_samples
+
+        if n_samples < self._min_size:
+            return [n_samples]
+
+        _, starts, _, best = self._best_partition(n_samples)
+
+        bkps = [n_samples]
+        bkp = starts[best]
+
+        while bkp > 0:
+            bkps.append(int(bkp))
+            bkp = self._last_bkp.values[bkp]
+
+        return sorted(bkps)
+
+    @property
+    def n_samples(self):
+        if self._cost is None:
+            return 0
+
+        return self._cost.n_samples
+
+
+def pelt(signal, pen, model="native_l2", min_size=2, jump=5):
+    """
+    Penalized change point detection (PELT) with costs from cumulative sums.
+    The recursion and the pruning of the admissible change points follow
+    ruptures.Pelt, so the same change points are returned for the l2 model,
+    but all admissible change points are evaluated in one vectorized call.
+    :param signal: signal with shape (n_samples,) or (n_samples, n_features)
+    :param pen: penalty value
+    :param model: cost model, one of native_cost_models
+    :param min_size: minimum segment length
+    :param jump: subsample (one every jump points)
+    :returns: sorted list of breakpoints, the last one is n_samples
+    """
+    if model not in native_cost_models:
+        raise ValueError(
+            f"Model {model} is not supported, use one of {list(native_cost_models)}"
+        )
+
+    n_samples = len(signal)
+
+    if max(min_size, native_cost_models[model].min_size) > n_samples:
+        raise ValueError(
+            f"Can not segment {n_samples} samples with a min_size of {min_size}"
+        )
+
+    return IncrementalPelt(pen, model=model, min_size=min_size, jump=jump).update(
+        signal
+    )
+
+
+def coarse_to_fine_pelt(signal, pen, factor, model="native_l2", min_size=2, jump=5):
+    """
+    Two stage PELT for long signals. PELT runs on the means of blocks of factor
+    samples, the gain of a change point on the block means is smaller by factor,
+    so the penalty is divided by factor. Every change point of the blocks is then
+    moved to the split with the lowest cost within one block around it, between
+    the previous refined and the next change point, at the full resolution.
+    Change points that do not lower the cost by more than the penalty are removed.
+    Changes shorter than a block are found less often than by pelt().
+    :param signal: signal with shape (n_samples,) or (n_samples, n_features)
+    :param pen: penalty value of the full resolution signal
+    :param factor: number of samples per block
+    :param model: cost model, one of native_cost_models
+    :param min_size: minimum segment length
+    :param jump: subsample (one every jump points)
+    :returns: sorted list of breakpoints, the last one is n_samples
+    """
+    signal = CumSumCost._as_2d(signal)
+    n_samples = len(signal)
+
+    block_starts = np.arange(0, n_samples, factor)
+    coarse_min_size = max(1, int(np.ceil(min_size / factor)))
+
+    if factor <= 1 or len(block_starts) < max(2, coarse_min_size):
+        return pelt(signal, pen, model=model, min_size=min_size, jump=jump)
+
+    block_sizes = np.diff(np.append(block_starts, n_samples)).reshape((-1, 1))
+    blocks = np.add.reduceat(signal, block_starts, axis=0) / block_sizes
+
+    candidates = block_starts[
+        pelt(blocks, pen / factor, model=model, min_size=coarse_min_size, jump=1)[:-1]
+    ]
+
+    cost = native_cost_models[model](signal)
+    min_size = max(min_size, cost.min_size)
+
+    bkps = [0]
+
+    for i, candidate in enumerate(candidates):
+        next_bkp = candidates[i + 1] if i + 1 < len(candidates) else n_samples
+
+        splits = np.arange(
+            max(candidate - factor, bkps[-1] + min_size),
+            min(candidate + factor, next_bkp - min_size) + 1,
+        )
+        splits = splits[splits % jump == 0]
+
+        if len(splits) == 0:
+            continue
+
+        costs = cost.error(np.full(len(splits), bkps[-1]), splits) + cost.error(
+            splits, np.full(len(splits), next_bkp)
+        )
+
+        bkps.append(int(splits[np.argmin(costs)]))
+
+    bkps = np.array(bkps + [n_samples])
+
+    # A change inside a block can give a change point on both sides of the block,
+    # remove the change points that do not pay the penalty at full resolution
+    while len(bkps) > 2:
+        gains = (
+            cost.error(bkps[:-2], bkps[2:])
+            - cost.error(bkps[:-2], bkps[1:-1])
+            - cost.error(bkps[1:-1], bkps[2:])
+        )
+
+        weakest = np.argmin(gains)
+
+        if gains[weakest] >= pen:
+            break
+
+        bkps = np.delete(bkps, weakest + 1)
+
+    return bkps[1:].tolist()
+
+
+class ChangepointPool(object):
+    """
+    Reusable process pool for the changepoint detection jobs.
+    The pool is started on the first call and kept alive between calls,
+    so it can be shared by many TransientDetector instances.
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        :param max_workers: maximal number of worker processes, defaults to cpu_count()
+        """
+        if max_workers is None:
+            max_workers = cpu_count()
+
+        self._max_workers = max_workers
+        self._n_workers = 0
+        self._pool = None
+
+    def map(self, func, jobs, job_sizes):
+        """
+        Run func for all jobs and return the results in the order of the jobs.
+        The jobs are submitted longest first and handed out one at a time,
+        so a single long job does not leave the other workers idle.
+        :param func: function to apply to every job
+        :param jobs: list of job arguments
+        :param job_sizes: size of every job, used to schedule the longest jobs first
+        """
+        if len(jobs) == 0:
+            return []
+
+        n_workers = min(self._max_workers, len(jobs))
+
+        if self._pool is None or n_workers > self._n_workers:
+            self.close()
+
+            self._pool = Pool(nodes=n_workers)
+            self._n_workers = n_workers
+
+        order = np.argsort(job_sizes, kind="stable")[::-1]
+
+        results = [None] * len(jobs)
+
+        for job_idx, result in zip(
+            order, self._pool.imap(func, [jobs[i] for i in order])
+        ):
+            results[job_idx] = result
+
+        return results
+
+    def close(self):
+        """
+        Shut down the worker processes
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool.clear()
+
+        self._pool = None
+        self._n_workers = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def n_workers(self):
+        return self._n_workers
@@ -0,0 +1,100 @@
+import os
+from collections import OrderedDict
+
+import h5py
+import numpy as np
+
+
+class DayTailBuffer(object):
+    """
+    Ring buffer with the last seconds of the data of the most recent days.
+    The tail of the previous day is prepended to the data of a day, so transients
+    shortly before midnight are not cut at the day boundary. Every result file
+    is only read once as long as it is in the buffer.
+    """
+
+    def __init__(self, tail_length, max_days=2):
+        """
+        :param tail_length: length of the tail in seconds
+        :param max_days: number of days that are kept in the buffer
+        """
+        self._tail_length = tail_length
+        self._max_days = max_days
+
+        self._tails = OrderedDict()
+
+    def tail(self, result_file):
+        """
+        Get the tail of a combined result file of the background fit
+        :param result_file: path of the result file
+        :returns: dictionary with the time bins, saa mask, observed counts,
+            model counts and stat errors of the tail, the detectors and echans
+            and the source (path and modification time) of the tail
+        """
+        key = (os.path.abspath(result_file), os.path.getmtime(result_file))
+
+        if key in self._tails:
+            self._tails.move_to_end(key)
+
+            return self._tails[key]
+
+        with h5py.File(result_file, "r") as f:
+
+            time_bins = f["time_bins"][()]
+
+            start = np.searchsorted(
+                time_bins[:, 0], time_bins[-1, 1] - self._tail_length
+            )
+
+            tail = dict(
+                time_bins=time_bins[start:],
+                saa_mask=f["saa_mask"][start:],
+                observed_counts=f["observed_counts"][start:],
+                model_counts=f["model_counts"][start:],
+                stat_err=f["stat_err"][start:],
+                detectors=list(f.attrs["detectors"]),
+                echans=list(f.attrs["echans"]),
+                source=key,
+            )
+
+        self._tails[key] = tail
+
+        while len(self._tails) > self._max_days:
+            self._tails.popitem(last=False)
+
+        return tail
+
+    @property
+    def tail_length(self):
+        return self._tail_length
+
+
+def remove_known_triggers(trigger_information, previous_trigger_information):
+    """
+    Remove the triggers with an interval that overlaps with the interval of a
+    trigger of a previous result (e.g. of the previous day)
+    :param trigger_information: result dictionary with the triggers to check
+    :param previous_trigger_information: result dictionary with the known triggers
+    :returns: names of the removed triggers
+    """
+    previous_intervals = np.array(
+        [
+            [trigger["interval"]["start"], trigger["interval"]["stop"]]
+            for trigger in previous_trigger_information["triggers"].values()
+        ]
+    ).reshape((-1, 2))
+
+    removed = []
+
+    for name, trigger in list(trigger_information["triggers"].items()):
+
+        overlap = np.logical_and(
+            trigger["interval"]["start"] <= previous_intervals[:, 1],
+            trigger["interval"]["stop"] >= previous_intervals[:, 0],
+        )
+
+        if np.any(overlap):
+            del trigger_information["triggers"][name]
+            removed.append(name)
+
+    return removed
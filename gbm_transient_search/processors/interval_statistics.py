@@ -0,0 +1,102 @@
+import numpy as np
+from gbm_transient_search.utils.growing_array import CumulativeSum, GrowingArray
+
+
+class IntervalStatistics(object):
+    """
+    Prefix-sum engine for the counts, background counts and background
+    variance of arbitrary time intervals.
+    The cumulative sums along the time axis are calculated once,
+    afterwards the sums of any batch of [start, stop) intervals
+    are obtained with two lookups per interval, independent of the interval length.
+    All trailing axes (e.g. detectors, energy channels) are handled at once.
+    """
+
+    def __init__(self, counts, bkg_counts, bkg_stat_err):
+        """
+        :param counts: observed counts with time as first axis
+        :param bkg_counts: background counts with the same shape as counts
+        :param bkg_stat_err: statistical error of the background counts
+        """
+        self._counts = GrowingArray(counts)
+        self._bkg_counts = GrowingArray(bkg_counts)
+
+        self._cum_counts = CumulativeSum(counts)
+        self._cum_bkg_counts = CumulativeSum(bkg_counts)
+        self._cum_bkg_variance = CumulativeSum(np.asarray(bkg_stat_err) ** 2)
+
+    def extend(self, counts, bkg_counts, bkg_stat_err):
+        """
+        Append new time bins without recalculating the existing cumulative sums,
+        the cost is amortized O(new bins)
+        :param counts: observed counts of the new bins
+        :param bkg_counts: background counts of the new bins
+        :param bkg_stat_err: statistical error of the background counts of the new bins
+        """
+        self._counts.append(counts)
+        self._bkg_counts.append(bkg_counts)
+
+        self._cum_counts.extend(counts)
+        self._cum_bkg_counts.extend(bkg_counts)
+        self._cum_bkg_variance.extend(np.asarray(bkg_stat_err) ** 2)
+
+    def interval_sums(self, starts, stops):
+        """
+        Sum the counts, background counts and background variance
+        for a batch of [start, stop) intervals.
+        :param starts: start indices of the intervals
+        :param stops: stop indices of the intervals (exclusive)
+        :returns: counts, bkg_counts, bkg_variance with shape (n_intervals, ...)
+        """
+        starts = np.asarray(starts, dtype=int)
+        stops = np.asarray(stops, dtype=int)
+
+        cum_counts = self._cum_counts.values
+        cum_bkg_counts = self._cum_bkg_counts.values
+        cum_bkg_variance = self._cum_bkg_variance.values
+
+        counts = cum_counts[stops] - cum_counts[starts]
+        bkg_counts = cum_bkg_counts[stops] - cum_bkg_counts[starts]
+        bkg_variance = cum_bkg_variance[stops] - cum_bkg_variance[starts]
+
+        return counts, bkg_counts, bkg_variance
+
+    def peak_indices(self, starts, stops, columns):
+        """
+        Get the index of the bin with the highest background subtracted counts
+        for each [start, stop) interval in the selected column
+        :param starts: start indices of the intervals
+        :param stops: stop indices of the intervals (exclusive),
+            the intervals must not be empty
+        :param columns: column (detector) index to use for each interval
+        """
+        starts = np.asarray(starts, dtype=int)
+        stops = np.asarray(stops, dtype=int)
+
+        if len(starts) == 0:
+            return np.empty(0, dtype=int)
+
+        lengths = stops - starts
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+        # Bins of all intervals concatenated, with their position in the interval
+        positions = np.arange(lengths.sum()) - np.repeat(offsets, lengths)
+        bins = np.repeat(starts, lengths) + positions
+        columns = np.repeat(columns, lengths)
+
+        values = (
+            self._counts.values[bins, columns] - self._bkg_counts.values[bins, columns]
+        )
+
+        # First position of the maximum in each interval, as np.argmax
+        is_max = values == np.repeat(np.maximum.reduceat(values, offsets), lengths)
+
+        first_max = np.minimum.reduceat(
+            np.where(is_max, positions, len(positions)), offsets
+        )
+
+        return starts + first_max
+
+    @property
+    def n_bins(self):
+        return len(self._cum_counts) - 1
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+def _reference_vectors(x, ref_vector):
+    """
+    Get the reference vectors as 2D array with one reference vector per row.
+    If no reference vector is passed use the unity vector (1, 1, 1  ...)
+    """
+    if ref_vector is None:
+        ref_vector = np.ones(x.shape[1])
+
+    return np.atleast_2d(np.asarray(ref_vector, dtype=float))
+
+
+def _squeeze_single_reference(mapped, ref_vector):
+    """
+    Keep the 1D output for a single reference vector
+    """
+    if ref_vector is None or np.ndim(ref_vector) == 1:
+        return mapped[:, 0]
+
+    return mapped
+
+
+def angle_distance_mapping(x, ref_vector=None):
+    """
+    Map a multi dimensional vector to the separation angle and the distance
+    between the vector and one or multiple reference vectors.
+    The row norms and dot products are calculated once and shared by both mappings.
+    :param x: 2D array with one vector per time bin
+    :param ref_vector: single reference vector or 2D stack of reference vectors
+    :returns: angles, distances with shape (n_bins,) for a single reference vector
+    and (n_bins, n_ref) for a stack of reference vectors
+    """
+    ref_vectors = _reference_vectors(x, ref_vector)
+
+    dot_prod = np.dot(x, ref_vectors.T)
+
+    x_norm_sq = np.einsum("ij,ij->i", x, x)
+    ref_norm_sq = np.einsum("ij,ij->i", ref_vectors, ref_vectors)
+
+    cos_angle = dot_prod / np.sqrt(np.outer(x_norm_sq, ref_norm_sq))
+
+    angles = (np.arccos(np.clip(cos_angle, -1, 1)) / np.pi) * 360
+
+    distances = np.sqrt(
+        np.maximum(
+            x_norm_sq.reshape((-1, 1)) - 2 * dot_prod + ref_norm_sq.reshape((1, -1)),
+            0,
+        )
+    )
+
+    return (
+        _squeeze_single_reference(angles, ref_vector),
+        _squeeze_single_reference(distances, ref_vector),
+    )
+
+
+def distance_mapping(x, ref_vector=None):
+    """
+    Maps a multi dimensional vector to the distance to a reference vector.
+    If no reference vector is passed use the unity vector (1, 1, 1  ...)
+    """
+    return angle_distance_mapping(x, ref_vector)[1]
+
+
+def angle_mapping(x, ref_vector=None):
+    """
+    Map a multi demensional vector to the separation angle between the vector
+    and a reference vector.
+    If no reference vector is passed use the unity vector (1, 1, 1  ...)
+    """
+    return angle_distance_mapping(x, ref_vector)[0]
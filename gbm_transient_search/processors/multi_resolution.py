@@ -0,0 +1,330 @@
+import copy
+
+import yaml
+from gbm_transient_search.processors.changepoints import ChangepointPool
+from gbm_transient_search.processors.day_tail import remove_known_triggers
+from gbm_transient_search.processors.transient_detector import (
+    TransientDetector,
+    detect_cpts,
+)
+from gbm_transient_search.processors.trigger_store import (
+    save_trigger_table,
+    trigger_table_path,
+)
+from gbm_transient_search.utils.stage_timer import StageTimer
+
+
+class MultiResolutionSearch(object):
+    """
+    Transient search on a pyramid of rebinnings (e.g. 1, 5, 20 and 80 s).
+    The result file is loaded and rebinned once for the finest bin width,
+    every coarser level is built by aggregating the bins of the previous level
+    and uses the saa mask and background fit mask of the finest level, so the
+    significances of all levels are calculated from the same energy channels.
+    The change point detection of all levels runs in one pool call and the
+    triggers of the levels are merged, overlapping triggers are represented
+    by the most significant one.
+    """
+
+    def __init__(
+        self,
+        result_file=None,
+        bin_widths=[1, 5, 20, 80],
+        mad=False,
+        bad_fit_threshold=60,
+        pool=None,
+        changepoint_cache=None,
+        rebin_cache=None,
+        low_memory=False,
+        timer=None,
+        plot_bin_width=None,
+        segment_transform=False,
+    ):
+        """
+        bin_widths: Minimal bin widths of the levels
+        plot_bin_width: Bin width of the level that is used for the plots,
+            defaults to the finest level
+        For the other parameters see TransientDetector
+        """
+        self._bin_widths = sorted(bin_widths)
+
+        if plot_bin_width is None:
+            plot_bin_width = self._bin_widths[0]
+
+        self._plot_level = self._bin_widths.index(plot_bin_width)
+
+        self._pool = pool
+        self._owns_pool = pool is None
+
+        if timer is None:
+            timer = StageTimer()
+
+        self._timer = timer
+
+        self._levels = [
+            TransientDetector(
+                min_bin_width=bin_width,
+                mad=mad,
+                bad_fit_threshold=bad_fit_threshold,
+                pool=pool,
+                changepoint_cache=changepoint_cache,
+                rebin_cache=rebin_cache,
+                low_memory=low_memory,
+                timer=timer,
+                segment_transform=segment_transform,
+            )
+            for bin_width in self._bin_widths
+        ]
+
+        self._trigger_information = None
+
+        if result_file is not None:
+            self.load_result(result_file)
+
+    def load_result(self, result_file, previous_tail=None):
+        """
+        Load a result file from the background fit and build the rebinning pyramid
+        previous_tail: tail of the previous day that is prepended to the data
+        """
+        # Resets the timer that is shared by all levels
+        self._levels[0].load_result(result_file, previous_tail=previous_tail)
+
+        for previous, level in zip(self._levels[:-1], self._levels[1:]):
+
+            rebin_source = None
+
+            if previous._rebin_source is not None:
+                rebin_source = dict(
+                    previous=previous._rebin_source,
+                    previous_bin_width=previous._min_bin_width,
+                )
+
+            level.load_data(
+                dates=previous._dates,
+                detectors=previous._detectors,
+                echans=previous._echans,
+                data_type=previous._data_type,
+                time_bins=previous._rebinned_time_bins,
+                saa_mask=previous._rebinned_saa_mask,
+                observed_counts=previous._rebinned_observed_counts,
+                bkg_counts=previous._rebinned_bkg_counts,
+                bkg_stat_err=previous._rebinned_bkg_stat_err,
+                data_rows=previous._data_rows,
+                good_bkg_fit_mask=previous._good_bkg_fit_mask,
+                recalc_saa_mask=False,
+                rebin_source=rebin_source,
+                day_start=previous._day_start,
+            )
+
+    def run(
+        self,
+        min_separation=5,
+        min_size=1,
+        jump=1,
+        model="l2",
+        coarse_factor=1,
+        min_significance_brightest=5,
+        min_significance_others=5,
+        min_significant_dets=2,
+        max_significant_dets=2,
+    ):
+        """
+        Run the search on all levels and merge the triggers.
+        For the parameters see TransientDetector.run
+        """
+        cpt_kwargs = dict(
+            min_size=min_size, jump=jump, model=model, coarse_factor=coarse_factor
+        )
+
+        pending = [
+            level._pending_changepoint_jobs(**cpt_kwargs) for level in self._levels
+        ]
+
+        jobs = [job for _, level_jobs, _ in pending for job in level_jobs]
+        job_sizes = [size for _, _, level_sizes in pending for size in level_sizes]
+
+        if self._pool is None:
+            self._pool = ChangepointPool()
+
+        # The change points of all levels are detected in one pool call
+        with self._timer.stage("changepoints"):
+            cpts_output = self._pool.map(detect_cpts, jobs, job_sizes)
+
+        for level, (cached_output, level_jobs, _) in zip(self._levels, pending):
+
+            level._finish_changepoints(
+                cached_output,
+                cpts_output[: len(level_jobs)],
+                min_separation=min_separation,
+                **cpt_kwargs,
+            )
+            cpts_output = cpts_output[len(level_jobs) :]
+
+            level._find_triggers(
+                min_significance_brightest=min_significance_brightest,
+                min_significance_others=min_significance_others,
+                min_significant_dets=min_significant_dets,
+                max_significant_dets=max_significant_dets,
+            )
+
+        self._merge_triggers()
+
+    def run_window_search(
+        self,
+        durations=[10, 20, 50, 100, 200, 500, 1000],
+        min_significance_brightest=5,
+        min_significance_others=5,
+        min_significant_dets=2,
+        max_significant_dets=2,
+    ):
+        """
+        Run the sliding window search on all levels and merge the triggers.
+        For the parameters see TransientDetector.run_window_search
+        """
+        for level in self._levels:
+
+            level.run_window_search(
+                durations=durations,
+                min_significance_brightest=min_significance_brightest,
+                min_significance_others=min_significance_others,
+                min_significant_dets=min_significant_dets,
+                max_significant_dets=max_significant_dets,
+            )
+
+        self._merge_triggers()
+
+    def _merge_triggers(self):
+        """
+        Merge the triggers of all levels, triggers with overlapping intervals
+        are combined to the most significant one
+        """
+        triggers = []
+
+        for bin_width, level in zip(self._bin_widths, self._levels):
+
+            for trigger in level.trigger_information["triggers"].values():
+                trigger = copy.deepcopy(trigger)
+                trigger["bin_width"] = bin_width
+
+                triggers.append(trigger)
+
+        triggers.sort(key=lambda trigger: trigger["interval"]["start"])
+
+        groups = []
+
+        for trigger in triggers:
+
+            if len(groups) > 0 and trigger["interval"]["start"] <= groups[-1]["stop"]:
+                groups[-1]["triggers"].append(trigger)
+                groups[-1]["stop"] = max(
+                    groups[-1]["stop"], trigger["interval"]["stop"]
+                )
+
+            else:
+                groups.append(
+                    {"stop": trigger["interval"]["stop"], "triggers": [trigger]}
+                )
+
+        trigger_information = copy.deepcopy(self._levels[0].trigger_information)
+        trigger_information["bin_widths"] = self._bin_widths
+        trigger_information["triggers"] = {}
+
+        for group in groups:
+
+            trigger = max(group["triggers"], key=lambda t: t["significances"])
+
+            trigger["detected_bin_widths"] = sorted(
+                set(t["bin_width"] for t in group["triggers"])
+            )
+
+            trigger_information["triggers"][trigger["trigger_name"]] = trigger
+
+        self._trigger_information = trigger_information
+
+    def plot_results(self, output_dir):
+        plot_level = self._levels[self._plot_level]
+
+        # Plot the merged triggers with the lightcurves of the plot level
+        # The level has no triggers if the merged triggers were loaded from a file
+        level_triggers = plot_level.trigger_information
+        plot_level._trigger_information = self._trigger_information
+
+        try:
+            plot_level.plot_results(output_dir)
+        finally:
+            plot_level._trigger_information = level_triggers
+
+    def set_data_timestamp(self, data_file_path):
+        self._levels[0].set_data_timestamp(data_file_path)
+
+        self._trigger_information["data_timestamp"] = self._levels[
+            0
+        ].trigger_information["data_timestamp"]
+
+    def remove_known_triggers(self, previous_trigger_information):
+        """
+        Remove the merged triggers that overlap with a trigger of a previous result
+        """
+        remove_known_triggers(self._trigger_information, previous_trigger_information)
+
+    def load_triggers(self, trigger_result_path):
+        """
+        Load the merged triggers of a previous run from its result file (e.g. to plot them)
+        """
+        with open(trigger_result_path, "r") as f:
+            self._trigger_information = yaml.safe_load(f)
+
+    def save_result(self, output_path):
+        save_trigger_table(trigger_table_path(output_path), self._trigger_information)
+
+        with open(output_path, "w") as f:
+            yaml.dump(self._trigger_information, f, default_flow_style=False)
+
+    def save_timing(self, output_path):
+        """
+        Save the run time and memory of the stages of all levels as json
+        """
+        self._timer.save(output_path)
+
+    def close(self):
+        """
+        Shut down the changepoint worker pool if it is owned by this search
+        """
+        if self._owns_pool and self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    @property
+    def changepoint_cache(self):
+        return self._levels[0].changepoint_cache
+
+    @changepoint_cache.setter
+    def changepoint_cache(self, changepoint_cache):
+        for level in self._levels:
+            level.changepoint_cache = changepoint_cache
+
+    @property
+    def timer(self):
+        return self._timer
+
+    @timer.setter
+    def timer(self, timer):
+        self._timer = timer
+
+        for level in self._levels:
+            level.timer = timer
+
+    @property
+    def trigger_information(self):
+        """
+        Result dictionary with the merged triggers of all levels, None before a search
+        """
+        return self._trigger_information
+
+    @property
+    def levels(self):
+        return self._levels
+
+    @property
+    def bin_widths(self):
+        return self._bin_widths
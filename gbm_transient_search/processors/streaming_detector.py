@@ -0,0 +1,472 @@
+import numpy as np
+from gbm_transient_search.processors.changepoints import (
+    IncrementalPelt,
+    native_cost_models,
+    native_equivalents,
+)
+from gbm_transient_search.processors.interval_statistics import IntervalStatistics
+from gbm_transient_search.processors.mapping import angle_distance_mapping
+from gbm_transient_search.processors.saa_calc import SaaCalc
+from gbm_transient_search.processors.transient_detector import (
+    TransientDetector,
+    combine_echans,
+    segment_transform_stats,
+    transform_segment,
+    valid_det_names,
+)
+from gbm_transient_search.utils.binning import TimeRebinner
+from gbm_transient_search.utils.growing_array import GrowingArray
+from gbm_transient_search.utils.intervals import compressed_runs
+
+
+class StreamingTransientDetector(TransientDetector):
+    """
+    Transient search for data that arrives in chunks during the day.
+    The appended time bins are rebinned, mapped and segmented incrementally,
+    the PELT state of every segment between two SAA passages is kept between
+    the updates, so only the new bins are processed.
+
+    The bad background fit mask is fixed with the first update. The offset
+    (and MAD scaling) of the mapped data and the PELT penalty depend on the
+    length of the segment, an open segment is transformed and segmented again
+    whenever it doubled its length since the last fit and once more when it is
+    closed by an SAA passage or the final update. The change points of a closed
+    segment are therefore the same as in the batch search with segment_transform,
+    the refits cost O(segment length) amortized.
+    """
+
+    def __init__(
+        self,
+        dates,
+        detectors,
+        echans,
+        data_type="ctime",
+        min_bin_width=1e-99,
+        mad=False,
+        bad_fit_threshold=60,
+        good_bkg_fit_mask=None,
+        penalty=None,
+        min_separation=5,
+        min_size=1,
+        jump=1,
+        model="native_l2",
+        min_significance_brightest=5,
+        min_significance_others=5,
+        min_significant_dets=2,
+        max_significant_dets=2,
+    ):
+        """
+        good_bkg_fit_mask: Mask of the detectors and echans with a good background fit
+            (e.g. from the previous day), if None it is calculated from the first update.
+        penalty: PELT penalty, if None 2 * log(bins of the segment) as in the batch search
+        model: native_l2 (or l2) or native_poisson, the ruptures models can not be updated.
+        For the other parameters see TransientDetector.run
+        """
+        # The day-wide statistics are not known before the end of the day,
+        # so every segment is transformed with its own statistics
+        super(StreamingTransientDetector, self).__init__(
+            min_bin_width=min_bin_width,
+            mad=mad,
+            bad_fit_threshold=bad_fit_threshold,
+            segment_transform=True,
+        )
+
+        model = native_equivalents.get(model, model)
+
+        if model not in native_cost_models:
+            raise ValueError(
+                f"Model {model} can not be updated, use one of "
+                f"{list(native_equivalents) + list(native_cost_models)}"
+            )
+
+        self._dates = np.array(dates)
+        self._detectors = np.array(detectors)
+        self._echans = np.array([int(echan) for echan in echans])
+        self._data_type = data_type
+
+        self._dets_idx = [valid_det_names.index(det) for det in self._detectors]
+        self._data_dets_idx = self._dets_idx
+
+        self._good_bkg_fit_mask = good_bkg_fit_mask
+        self._penalty = penalty
+
+        self._min_separation = min_separation
+        self._pelt_kwargs = dict(model=model, min_size=min_size, jump=jump)
+        self._changepoint_settings = dict(
+            min_separation=min_separation, penalty=penalty, **self._pelt_kwargs
+        )
+        self._threshold_kwargs = dict(
+            min_significance_brightest=min_significance_brightest,
+            min_significance_others=min_significance_others,
+            min_significant_dets=min_significant_dets,
+            max_significant_dets=max_significant_dets,
+        )
+
+        self._buffers = {}
+        self._n_committed = 0
+
+        self._rebinned_time_bins = None
+        self._interval_stats = None
+
+        # Segments between two SAA passages with their transformation and PELT state
+        self._valid_slices = []
+        self._segments = []
+        self._segment_open = False
+
+        self._trigger_information = None
+        self._reported_intervals = []
+
+    def update(self, time_bins, observed_counts, bkg_counts, bkg_stat_err, final=False):
+        """
+        Append new time bins and background predictions and update the
+        change points, significances and triggers.
+        time_bins: time bins of the new data
+        observed_counts: observed counts of the new data (time, detector, echan)
+        bkg_counts: background prediction for the new data
+        bkg_stat_err: statistical error of the background prediction
+        final: the data of the day is complete, also use the last rebinned bin
+            if it is shorter than min_bin_width
+        returns: dictionary of the triggers that are found for the first time,
+            i.e. that do not overlap with a trigger of an earlier update
+        """
+        # The timer records the stages of the latest update
+        self._timer.reset()
+
+        self._append_raw(time_bins, observed_counts, bkg_counts, bkg_stat_err)
+
+        if self._good_bkg_fit_mask is None:
+            self._mask_bad_bkg_fits(self._bad_fit_threshold)
+
+        with self._stage("rebin"):
+            first_new = self._rebin_pending(final)
+
+        with self._stage("changepoints"):
+            self._process_new_bins(first_new)
+
+            if final:
+                self._close_segment()
+
+        if self._interval_stats is None:
+            return {}
+
+        self._update_triggers()
+
+        return self._new_triggers()
+
+    def _new_triggers(self):
+        """
+        Triggers whose interval does not overlap with the interval of a trigger
+        that was already reported. The name of a trigger depends on the start
+        of its interval, which can move with later data.
+        """
+        new_triggers = {}
+
+        for name, trigger in self._trigger_information["triggers"].items():
+            start = trigger["interval"]["start"]
+            stop = trigger["interval"]["stop"]
+
+            reported = [
+                interval
+                for interval in self._reported_intervals
+                if start <= interval[1] and interval[0] <= stop
+            ]
+
+            if len(reported) == 0:
+                new_triggers[name] = trigger
+                self._reported_intervals.append([start, stop])
+
+            # Follow a reported trigger whose interval grows
+            for interval in reported:
+                interval[0] = min(interval[0], start)
+                interval[1] = max(interval[1], stop)
+
+        return new_triggers
+
+    def _append_raw(self, time_bins, observed_counts, bkg_counts, bkg_stat_err):
+        """
+        Append the new data and calculate the saa mask of the new time bins
+        """
+        if "_time_bins" not in self._buffers:
+            saa_mask = SaaCalc(time_bins).saa_mask
+
+            self._data_rows = np.arange(observed_counts.shape[1])
+
+        else:
+            # Include the last known bin to find a time jump at the chunk boundary
+            saa_mask = SaaCalc(np.vstack([self._time_bins[-1:], time_bins])).saa_mask[
+                1:
+            ]
+
+        self._append("_time_bins", time_bins)
+        self._append("_saa_mask", saa_mask)
+        self._append("_observed_counts", observed_counts)
+        self._append("_bkg_counts", bkg_counts)
+        self._append("_bkg_stat_err", bkg_stat_err)
+
+    def _rebin_pending(self, final=False):
+        """
+        Rebin the time bins that are not part of a completed rebinned bin yet.
+        The last rebinned bin is kept open until it reaches min_bin_width,
+        so the rebinning is the same as for the whole day.
+        returns: index of the first new rebinned bin
+        """
+        if self._rebinned_time_bins is None:
+            first_new = 0
+        else:
+            first_new = len(self._rebinned_time_bins)
+
+        pending = slice(self._n_committed, None)
+
+        rebinner = TimeRebinner(
+            self._time_bins[pending], self._min_bin_width, mask=self._saa_mask[pending]
+        )
+
+        rebinned_saa_mask = rebinner.rebinned_saa_mask
+
+        n_raw_bins, bin_width = rebinner.rebin(
+            np.ones(len(self._time_bins[pending])),
+            np.diff(self._time_bins[pending], axis=1)[:, 0],
+        )
+
+        n_new = len(rebinned_saa_mask)
+
+        if (
+            not final
+            and n_new > 0
+            and rebinned_saa_mask[-1]
+            and bin_width[-1] < self._min_bin_width
+        ):
+            n_new -= 1
+
+        if n_new == 0:
+            return first_new
+
+        rebinned = dict(
+            _rebinned_time_bins=rebinner.time_rebinned[:n_new],
+            _rebinned_saa_mask=rebinned_saa_mask[:n_new],
+            _rebinned_observed_counts=rebinner.rebin(self._observed_counts[pending])[0][
+                :n_new
+            ],
+            _rebinned_bkg_counts=rebinner.rebin(self._bkg_counts[pending])[0][:n_new],
+            _rebinned_bkg_stat_err=rebinner.rebin_errors(self._bkg_stat_err[pending])[
+                0
+            ][:n_new],
+        )
+
+        rebinned["_rebinned_time_bin_width"] = np.diff(
+            rebinned["_rebinned_time_bins"], axis=1
+        )[:, 0]
+        rebinned["_rebinned_mean_time"] = np.mean(
+            rebinned["_rebinned_time_bins"], axis=1
+        )
+
+        for key, value in rebinned.items():
+            self._append(key, value)
+
+        self._n_committed += int(np.sum(n_raw_bins[:n_new]))
+
+        return first_new
+
+    def _append(self, key, value):
+        """
+        Append new bins to an attribute, the attribute is a view of a
+        buffer that grows with amortized O(new bins) cost
+        """
+        if key not in self._buffers:
+            self._buffers[key] = GrowingArray(value)
+
+        else:
+            self._buffers[key].append(value)
+
+        setattr(self, key, self._buffers[key].values)
+
+    def _process_new_bins(self, first_new):
+        """
+        Combine and clean the new rebinned bins outside of the SAA
+        and update the change points of the segments
+        """
+        new_saa_mask = self._rebinned_saa_mask[first_new:]
+
+        if not np.any(new_saa_mask):
+
+            # A bin in the SAA closes the open segment
+            if len(new_saa_mask) > 0:
+                self._close_segment()
+
+            return
+
+        observed_counts = self._rebinned_observed_counts[first_new:][new_saa_mask]
+        bkg_counts = self._rebinned_bkg_counts[first_new:][new_saa_mask]
+        bkg_stat_err = self._rebinned_bkg_stat_err[first_new:][new_saa_mask]
+
+        # Combine the energy channels with a good background fit
+        stats_data = combine_echans(
+            observed_counts[:, self._dets_idx],
+            bkg_counts[:, self._dets_idx],
+            bkg_stat_err[:, self._dets_idx],
+            self._good_bkg_fit_mask[self._dets_idx],
+        )
+
+        if self._interval_stats is None:
+            self._interval_stats = IntervalStatistics(*stats_data)
+        else:
+            self._interval_stats.extend(*stats_data)
+
+        counts_cleaned = observed_counts - bkg_counts
+
+        self._append("_counts_cleaned", counts_cleaned)
+        self._append(
+            "_rates_cleaned",
+            (
+                counts_cleaned.T
+                / self._rebinned_time_bin_width[first_new:][new_saa_mask]
+            ).T,
+        )
+
+        # The mapped data of the new bins is filled per segment
+        n_new = len(counts_cleaned)
+
+        self._append(
+            "_data_trans",
+            np.empty((n_new, np.sum(self._good_bkg_fit_mask[self._data_rows]))),
+        )
+        self._append("_angles", np.empty(n_new))
+        self._append("_distances", np.empty(n_new))
+
+        self._update_segments(
+            new_saa_mask, first_idx=self._interval_stats.n_bins - n_new
+        )
+
+    def _update_segments(self, new_saa_mask, first_idx):
+        """
+        Add the new bins outside of the SAA to their segment,
+        a masked rebinned bin closes the open segment
+        first_idx: index of the first new bin outside of the SAA
+        """
+        if self._segment_open and not new_saa_mask[0]:
+            self._close_segment()
+
+        runs = compressed_runs(new_saa_mask)
+
+        for i, (start, stop) in enumerate(runs):
+
+            if i == 0 and self._segment_open:
+                self._extend_segment(first_idx + stop)
+
+            else:
+                self._valid_slices.append([first_idx + start, first_idx + stop])
+                self._segments.append({})
+                self._segment_open = True
+
+                self._fit_segment(len(self._segments) - 1)
+
+            # Every run but the last one is followed by a bin in the SAA
+            if i < len(runs) - 1 or not new_saa_mask[-1]:
+                self._close_segment()
+
+    def _extend_segment(self, stop):
+        """
+        Append the new bins up to stop to the open segment
+        """
+        slice_idx = len(self._segments) - 1
+        segment = self._segments[slice_idx]
+        valid_slice = self._valid_slices[slice_idx]
+
+        old_stop = valid_slice[1]
+        valid_slice[1] = stop
+
+        if stop - valid_slice[0] >= 2 * segment["n_fit"]:
+            self._fit_segment(slice_idx)
+            return
+
+        data_trans = transform_segment(
+            self._flattened_counts(old_stop, stop),
+            transform_stats=segment["transform_stats"],
+        )
+
+        self._set_mapped_data(old_stop, stop, data_trans)
+
+        for mapping, array in [("angle", self._angles), ("distance", self._distances)]:
+            segment["pelts"][mapping].update(array[old_stop:stop])
+
+    def _close_segment(self):
+        """
+        Close the open segment, its change points are calculated with
+        the transformation and penalty of the complete segment
+        """
+        if not self._segment_open:
+            return
+
+        slice_idx = len(self._segments) - 1
+        start, stop = self._valid_slices[slice_idx]
+
+        if self._segments[slice_idx]["n_fit"] != stop - start:
+            self._fit_segment(slice_idx)
+
+        self._segment_open = False
+
+    def _fit_segment(self, slice_idx):
+        """
+        Transform, map and segment all bins of a segment, as in the batch search
+        """
+        start, stop = self._valid_slices[slice_idx]
+
+        data = self._flattened_counts(start, stop)
+        transform_stats = segment_transform_stats(data, mad=self._mad)
+
+        self._set_mapped_data(
+            start, stop, transform_segment(data, transform_stats=transform_stats)
+        )
+
+        penalty = self._penalty
+
+        if penalty is None:
+            penalty = 2 * np.log(stop - start)
+
+        pelts = {}
+
+        for mapping, array in [("angle", self._angles), ("distance", self._distances)]:
+            pelts[mapping] = IncrementalPelt(penalty, **self._pelt_kwargs)
+            pelts[mapping].update(array[start:stop])
+
+        self._segments[slice_idx] = {
+            "n_fit": stop - start,
+            "transform_stats": transform_stats,
+            "pelts": pelts,
+        }
+
+    def _flattened_counts(self, start, stop):
+        """
+        Cleaned counts of the channels with a good background fit
+        """
+        return self._counts_cleaned[start:stop][
+            :, self._good_bkg_fit_mask[self._data_rows]
+        ]
+
+    def _set_mapped_data(self, start, stop, data_trans):
+        """
+        Store the transformed data and its mapping for the bins [start, stop)
+        """
+        angles, distances = angle_distance_mapping(data_trans)
+
+        self._data_trans[start:stop] = data_trans
+        self._angles[start:stop] = angles
+        self._distances[start:stop] = distances
+
+    def _update_triggers(self):
+        """
+        Calculate the significances of the current change points and select the triggers
+        """
+        cpts_output = []
+
+        for slice_idx, segment in enumerate(self._segments):
+            start = self._valid_slices[slice_idx][0]
+
+            for mapping, pelt in segment["pelts"].items():
+                cpts_output.append(
+                    (mapping, slice_idx, np.array(pelt.predict(), dtype=int) + start)
+                )
+
+        self._collect_changepoints(cpts_output, min_separation=self._min_separation)
+
+        self._find_triggers(**self._threshold_kwargs)
@@ -1,5 +1,4 @@
-import copy
-from copy import deepcopy
+import itertools
 from datetime import datetime
 
 import h5py
@@ -8,30 +7,32 @@ import pytz
 import ruptures as rpt
 import yaml
 from astropy.io import fits
+from gbm_transient_search.processors.changepoints import (
+    ChangepointPool,
+    coarse_to_fine_pelt,
+    native_cost_models,
+    native_equivalents,
+    pelt,
+)
+from gbm_transient_search.processors.day_tail import remove_known_triggers
+from gbm_transient_search.processors.interval_statistics import IntervalStatistics
+from gbm_transient_search.processors.mapping import angle_distance_mapping
 from gbm_transient_search.processors.saa_calc import SaaCalc
+from gbm_transient_search.processors.trigger_store import (
+    save_trigger_table,
+    trigger_table_path,
+)
+from gbm_transient_search.processors.window_search import WindowSearch
+from gbm_transient_search.utils.binning import TimeRebinner
+from gbm_transient_search.utils.detectors import valid_det_names
+from gbm_transient_search.utils.intervals import compressed_runs, merge_segments
 from gbm_transient_search.utils.plotting.trigger_plot import TriggerPlot
-from gbmbkgpy.utils.binner import Rebinner
-from gbmgeometry import GBMTime
+from gbm_transient_search.utils.rebin_cache import RebinCache
+from gbm_transient_search.utils.significance import li_and_ma_gaussian_background
+from gbm_transient_search.utils.stage_timer import StageTimer, peak_memory
+from gbm_transient_search.utils.time_conversion import trigger_names_from_met
 from loguru import logger
-from pathos.multiprocessing import cpu_count
-from pathos.pools import ProcessPool as Pool
 from scipy import stats
-from threeML.utils.statistics.stats_tools import Significance
-
-valid_det_names = [
-    "n0",
-    "n1",
-    "n2",
-    "n3",
-    "n4",
-    "n5",
-    "n6",
-    "n7",
-    "n8",
-    "n9",
-    "na",
-    "nb",
-]
 
 
 class TransientDetector(object):
@@ -43,19 +44,62 @@ class TransientDetector(object):
     """
 
     def __init__(
-        self, result_file=None, min_bin_width=1e-99, mad=False, bad_fit_threshold=60
+        self,
+        result_file=None,
+        min_bin_width=1e-99,
+        mad=False,
+        bad_fit_threshold=60,
+        pool=None,
+        changepoint_cache=None,
+        rebin_cache=None,
+        low_memory=False,
+        timer=None,
+        segment_transform=False,
     ):
         """
         Instantiate the search class and prepare the data for processing.
+        pool: ChangepointPool to run the changepoint detection, if None the detector
+            starts its own pool which is shut down with close()
+        changepoint_cache: ChangepointCache to reuse the change points and significances
+            of segments that did not change since the last run (e.g. between the first
+            and final step)
+        rebin_cache: RebinCache to reuse the rebinned data of the same input
+        low_memory: Only load the searched detectors as float32, clean the data in place
+            and release the unbinned data after the setup. The significances agree
+            with the default mode within the float32 precision, not exactly.
+        timer: StageTimer that records the run time and memory of the stages,
+            by default a new timer is used
+        segment_transform: Shift (and scale with mad) every segment between the SAAs
+            with its own statistics instead of the ones of the whole day. The mapped
+            data of a segment then only depends on the segment, as in the streaming
+            search, but the change points differ from the default day-wide transform.
         """
 
         self._min_bin_width = min_bin_width
         self._mad = mad
+        self._segment_transform = segment_transform
+        self._transform_stats = None
         self._bad_fit_threshold = bad_fit_threshold
 
+        self._pool = pool
+        self._owns_pool = pool is None
+
+        self._changepoint_cache = changepoint_cache
+        self._cached_segments = {}
+        self._significance_source = None
+        self._rebin_cache = rebin_cache
+        self._rebin_source = None
+        self._low_memory = low_memory
+        self._day_start = None
+        self._trigger_information = None
+
+        if timer is None:
+            timer = StageTimer()
+
+        self._timer = timer
+
         if result_file is not None:
-            self._load_result_file(result_file)
-            self._setup()
+            self.load_result(result_file)
 
     def run(
         self,
@@ -63,6 +107,7 @@ class TransientDetector(object):
         min_size=1,
         jump=1,
         model="l2",
+        coarse_factor=1,
         min_significance_brightest=5,
         min_significance_others=5,
         min_significant_dets=2,
@@ -72,65 +117,225 @@ class TransientDetector(object):
         min_separation: Minimal separation (in bins) between the change points in angles and distnaces.
         min_size: Minimal separation (in bins) between changepoints.
         jump: Subsampling of time series.
-        model: Model for the cost function.
+        model: Model for the cost function. The ruptures models (e.g. l2) or
+            the native cumulative sum models native_l2 and native_poisson.
+        coarse_factor: Run PELT on the means of blocks of coarse_factor bins first
+            and refine the change points at full resolution, 1 to disable.
+            Requires a native model (or l2).
         min_significance_brightest: Required significance for the brightest detector.
         min_significance_others: Required significance for other detectors,
         min_significant_dets: Min number of detectors required to be significant
         max_significant_dets: Max number of detectors allowed to be significant
         """
-        self._detect_changepoints(
-            min_separation=min_separation, min_size=min_size, jump=jump, model=model
+        with self._stage("changepoints"):
+            self._detect_changepoints(
+                min_separation=min_separation,
+                min_size=min_size,
+                jump=jump,
+                model=model,
+                coarse_factor=coarse_factor,
+            )
+
+        self._find_triggers(
+            min_significance_brightest=min_significance_brightest,
+            min_significance_others=min_significance_others,
+            min_significant_dets=min_significant_dets,
+            max_significant_dets=max_significant_dets,
         )
-        self._calc_significances()
-        self._apply_threshold_significance(
-            significance_brightest=min_significance_brightest,
-            significance_others=min_significance_others,
-            min_dets=min_significant_dets,
-            max_dets=max_significant_dets,
+
+    def _find_triggers(
+        self,
+        min_significance_brightest=5,
+        min_significance_others=5,
+        min_significant_dets=2,
+        max_significant_dets=2,
+    ):
+        """
+        Calculate the significances of the intervals between the change points
+        and select the triggers
+        """
+        with self._stage("significances"):
+            self._calc_significances()
+
+        self._select_triggers(
+            min_significance_brightest=min_significance_brightest,
+            min_significance_others=min_significance_others,
+            min_significant_dets=min_significant_dets,
+            max_significant_dets=max_significant_dets,
         )
-        self._select_intervals()
-        self._find_peak_times()
-        self._create_result_dict()
 
-    def _setup(self):
+    def run_window_search(
+        self,
+        durations=[10, 20, 50, 100, 200, 500, 1000],
+        min_significance_brightest=5,
+        min_significance_others=5,
+        min_significant_dets=2,
+        max_significant_dets=2,
+    ):
+        """
+        Search with sliding windows of fixed durations instead of change points.
+        The windows start at every bin and the triggers are selected with the
+        same thresholds as in run.
+        durations: Durations of the windows in seconds
+        For the other parameters see run
+        """
+        with self._stage("window_search"):
+            # Windows without a detector above the brightest threshold
+            # can not pass the selection and are not kept
+            self._calc_window_significances(
+                durations, min_significance=min_significance_brightest
+            )
+
+        self._select_triggers(
+            min_significance_brightest=min_significance_brightest,
+            min_significance_others=min_significance_others,
+            min_significant_dets=min_significant_dets,
+            max_significant_dets=max_significant_dets,
+        )
+
+    def _calc_window_significances(self, durations, min_significance=-np.inf):
+        """
+        Calculate the significances of the sliding windows of the durations,
+        only the windows with a detector above min_significance are kept
+        """
+        bin_width = np.median(
+            np.diff(self._rebinned_time_bins[self._rebinned_saa_mask], axis=1)
+        )
+
+        window_search = WindowSearch(
+            self._interval_stats, self._valid_slices, bin_width
+        )
+
+        self._intervals_all, self._significances_all = window_search.search(
+            durations, min_significance=min_significance
+        )
+
+        self._significance_source = dict(
+            engine="windows",
+            durations=list(durations),
+            min_significance=min_significance,
+        )
+
+    def _select_triggers(
+        self,
+        min_significance_brightest=5,
+        min_significance_others=5,
+        min_significant_dets=2,
+        max_significant_dets=2,
+    ):
+        """
+        Apply the thresholds to the significances of the intervals
+        and build the triggers
+        """
+        with self._stage("selection"):
+            self._apply_threshold_significance(
+                significance_brightest=min_significance_brightest,
+                significance_others=min_significance_others,
+                min_dets=min_significant_dets,
+                max_dets=max_significant_dets,
+            )
+            self._select_intervals()
+            self._find_peak_times()
+            self._create_result_dict()
+
+    def _stage(self, name):
+        """
+        Record the run time and memory of a stage with the timer
+        """
+        return self._timer.stage(name, min_bin_width=self._min_bin_width)
+
+    def _setup(self, recalc_saa_mask=True, good_bkg_fit_mask=None):
+        """
+        Rebin, mask, combine and map the loaded data
+        recalc_saa_mask: Calculate the saa mask from the time bins, False to use
+            the loaded saa mask (e.g. of data that was rebinned before)
+        good_bkg_fit_mask: Mask of the detectors and echans with a good background
+            fit to use instead of calculating it from the data
+        """
+        # The intervals and significances of a previous day are not valid anymore
+        self._intervals_all = None
+        self._significances_all = None
+        self._significance_source = None
+
         self._dets_idx = []
 
         for det in self._detectors:
             self._dets_idx.append(valid_det_names.index(det))
 
-        # Calculate new saa mask to fix stan fit
-        saa_calc = SaaCalc(self._time_bins)
-        self._saa_mask = saa_calc.saa_mask
+        # Position of the searched detectors in the detector axis of the data
+        self._data_dets_idx = [list(self._data_rows).index(i) for i in self._dets_idx]
 
-        self._rebinn_data(self._min_bin_width)
+        with self._stage("rebin"):
+            if recalc_saa_mask:
+                # Calculate new saa mask to fix stan fit
+                saa_calc = SaaCalc(self._time_bins)
+                self._saa_mask = saa_calc.saa_mask
 
-        self._mask_bad_bkg_fits(self._bad_fit_threshold)
+            self._rebinn_data(self._min_bin_width)
 
-        # Combine all energy bins for significance calculation
-        self._combine_energy_bins()
+        with self._stage("bad_fit_mask"):
+            if good_bkg_fit_mask is None:
+                self._mask_bad_bkg_fits(self._bad_fit_threshold)
+
+            else:
+                self._good_bkg_fit_mask = good_bkg_fit_mask
+
+        with self._stage("combine_energy_bins"):
+            # Combine all energy bins for significance calculation
+            self._combine_energy_bins()
+
+        # Prefix sums of the combined data for the interval statistics
+        self._interval_stats = IntervalStatistics(
+            self._observed_counts_combined,
+            self._bkg_counts_combined,
+            self._bkg_stat_err_combined,
+        )
 
         # Clean data
-        self._counts_cleaned = (
-            self._rebinned_observed_counts[self._rebinned_saa_mask]
-            - self._rebinned_bkg_counts[self._rebinned_saa_mask]
+        self._counts_cleaned = self._rebinned_observed_counts[self._rebinned_saa_mask]
+        self._counts_cleaned -= self._rebinned_bkg_counts[self._rebinned_saa_mask]
+
+        self._counts_cleaned_total = self._detector_columns(
+            self._observed_counts_combined - self._bkg_counts_combined
         )
 
-        self._counts_cleaned_total = {
-            det: (self._observed_counts_total[det] - self._bkg_counts_total[det])
-            for det in self._detectors
-        }
+        if self._low_memory:
+            self._rates_cleaned = None
+
+            # The unbinned data is not needed after the rebinning
+            self._observed_counts = None
+            self._bkg_counts = None
+            self._bkg_stat_err = None
 
-        self._rates_cleaned = (
-            self._counts_cleaned.T
-            / self._rebinned_time_bin_width[self._rebinned_saa_mask]
-        ).T
+        else:
+            self._rates_cleaned = (
+                self._counts_cleaned.T
+                / self._rebinned_time_bin_width[self._rebinned_saa_mask]
+            ).T
 
-        self._transform_data(self._mad)
+        with self._stage("transform"):
+            self._transform_data(self._mad)
 
-    def _load_result_file(self, result_file):
+        logger.info(f"Lifetime peak memory after the setup: {peak_memory():.0f} MB")
+
+    def _load_result_file(self, result_file, previous_tail=None):
         """
         Load result file from background fit
+        previous_tail: tail of the previous day (see DayTailBuffer) that is
+            prepended to the data
         """
+        # The key of the rebin cache is known before the data is read
+        rebin_source = dict(
+            result_file=RebinCache.file_source(result_file),
+            low_memory=self._low_memory,
+        )
+
+        if previous_tail is not None:
+            rebin_source["previous_tail"] = previous_tail.get("source")
+
+            if rebin_source["previous_tail"] is None:
+                rebin_source = None
+
         with h5py.File(result_file, "r") as f:
 
             dates = f.attrs["dates"]
@@ -141,9 +346,43 @@ class TransientDetector(object):
             detectors = f.attrs["detectors"]
             time_bins = f["time_bins"][()]
             saa_mask = f["saa_mask"][()]
-            observed_counts = f["observed_counts"][()]
-            model_counts = f["model_counts"][()]
-            stat_err = f["stat_err"][()]
+
+            if self._low_memory:
+                # Only read the searched detectors, one detector at a time
+                data_rows = sorted(valid_det_names.index(det) for det in detectors)
+
+                observed_counts, model_counts, stat_err = [
+                    read_detectors(f[name], data_rows)
+                    for name in ["observed_counts", "model_counts", "stat_err"]
+                ]
+
+            else:
+                observed_counts = f["observed_counts"][()]
+                model_counts = f["model_counts"][()]
+                stat_err = f["stat_err"][()]
+
+                data_rows = np.arange(observed_counts.shape[1])
+
+        day_start = time_bins[0, 0]
+
+        if previous_tail is not None:
+            (
+                time_bins,
+                saa_mask,
+                observed_counts,
+                model_counts,
+                stat_err,
+            ) = prepend_tail(
+                previous_tail,
+                detectors,
+                echans,
+                data_rows,
+                time_bins,
+                saa_mask,
+                observed_counts,
+                model_counts,
+                stat_err,
+            )
 
         self._dates = dates
         self._detectors = detectors
@@ -154,30 +393,61 @@ class TransientDetector(object):
         self._observed_counts = observed_counts
         self._bkg_counts = model_counts
         self._bkg_stat_err = stat_err
+        self._data_rows = data_rows
+        self._rebin_source = rebin_source
+        self._day_start = day_start
+
+        logger.info(
+            f"Lifetime peak memory after loading the data: {peak_memory():.0f} MB"
+        )
 
     def _rebinn_data(self, min_bin_width):
         """
-        Rebinn the observed data and background
+        Rebinn the observed data and background,
+        the rebinned data is loaded from the rebin cache if it was rebinned before
         """
-        self._data_rebinner = Rebinner(
-            self._time_bins, min_bin_width, mask=self._saa_mask
-        )
+        rebinned = None
 
-        self._rebinned_time_bins = self._data_rebinner.time_rebinned
+        use_cache = self._rebin_cache is not None and self._rebin_source is not None
 
-        self._rebinned_saa_mask = self._data_rebinner.rebinned_saa_mask
+        if use_cache:
+            cache_key = self._rebin_cache.key(min_bin_width, self._rebin_source)
 
-        self._rebinned_observed_counts = self._data_rebinner.rebin(
-            self._observed_counts
-        )[0]
+            rebinned = self._rebin_cache.load(cache_key)
 
-        self._rebinned_bkg_counts = self._data_rebinner.rebin(self._bkg_counts)[0]
+        if rebinned is None:
+            data_rebinner = TimeRebinner(
+                self._time_bins, min_bin_width, mask=self._saa_mask
+            )
 
-        self._rebinned_bkg_stat_err = self._data_rebinner.rebin_errors(
-            self._bkg_stat_err
-        )[0]
+            # The bin mapping is calculated once for all arrays
+            observed_counts, bkg_counts = data_rebinner.rebin(
+                self._observed_counts, self._bkg_counts
+            )
 
-        self._valid_slices = slice_disjoint(self._rebinned_saa_mask)
+            rebinned = dict(
+                time_bins=data_rebinner.time_rebinned,
+                saa_mask=data_rebinner.rebinned_saa_mask,
+                observed_counts=observed_counts,
+                bkg_counts=bkg_counts,
+                bkg_stat_err=data_rebinner.rebin_errors(self._bkg_stat_err)[0],
+            )
+
+            if use_cache:
+                self._rebin_cache.store(cache_key, **rebinned)
+
+        self._rebinned_time_bins = rebinned["time_bins"]
+
+        self._rebinned_saa_mask = rebinned["saa_mask"]
+
+        self._rebinned_observed_counts = rebinned["observed_counts"]
+
+        self._rebinned_bkg_counts = rebinned["bkg_counts"]
+
+        self._rebinned_bkg_stat_err = rebinned["bkg_stat_err"]
+
+        # Segments between the SAAs in the index space of the data outside of the SAAs
+        self._valid_slices = compressed_runs(self._rebinned_saa_mask)
 
         self._rebinned_time_bin_width = np.diff(self._rebinned_time_bins, axis=1)[:, 0]
         self._rebinned_mean_time = np.mean(self._rebinned_time_bins, axis=1)
@@ -186,24 +456,35 @@ class TransientDetector(object):
         """
         Transform the data to and apply mapping
         """
-        self._data_flattened = self._counts_cleaned[:, self._good_bkg_fit_mask]
+        data_flattened = self._counts_cleaned[
+            :, self._good_bkg_fit_mask[self._data_rows]
+        ]
 
-        if mad:
+        if self._low_memory:
+            self._data_trans = data_flattened
+
+        else:
+            self._data_trans = np.empty(data_flattened.shape)
 
-            med_abs_div = stats.median_abs_deviation(self._data_flattened, axis=0)
-            median = np.median(self._data_flattened, axis=0)
+        if self._segment_transform:
+            # Every segment between the SAAs is transformed with its own statistics,
+            # so its mapped data only depends on the data of the segment
+            self._transform_stats = None
 
-            self._data_trans = (self._data_flattened - median) / med_abs_div
+            for start, stop in self._valid_slices:
+                self._data_trans[start:stop] = transform_segment(
+                    data_flattened[start:stop], mad=mad
+                )
 
         else:
-            self._data_trans = self._data_flattened
+            # The statistics of the whole day are part of the changepoint cache keys
+            self._transform_stats = segment_transform_stats(data_flattened, mad=mad)
 
-        self._data_trans = (
-            self._data_trans - np.min(self._data_trans, axis=0).reshape((1, -1)) + 1
-        )
+            self._data_trans[:] = transform_segment(
+                data_flattened, transform_stats=self._transform_stats
+            )
 
-        self._distances = distance_mapping(self._data_trans)
-        self._angles = angle_mapping(self._data_trans)
+        self._angles, self._distances = angle_distance_mapping(self._data_trans)
 
     def _mask_bad_bkg_fits(
         self, max_med_sig=60, max_neg_med_sig=-30, max_neg_sig=-100, n_parts=20
@@ -219,46 +500,33 @@ class TransientDetector(object):
 
         part_idx = np.linspace(0, self._observed_counts.shape[0], n_parts, dtype=int)
 
-        for det in self._detectors:
-
-            det_idx = valid_det_names.index(det)
+        # Sum up the partitions for all detectors and echans at once
+        counts = np.add.reduceat(self._observed_counts, part_idx[:-1], axis=0)
+        bkg_counts = np.add.reduceat(self._bkg_counts, part_idx[:-1], axis=0)
+        bkg_var = np.add.reduceat(self._bkg_stat_err ** 2, part_idx[:-1], axis=0)
 
-            for e in self._echans:
+        # Only evaluate the detectors and echans that are searched
+        counts = counts[:, self._data_dets_idx][:, :, self._echans]
+        bkg_counts = bkg_counts[:, self._data_dets_idx][:, :, self._echans]
+        bkg_var = bkg_var[:, self._data_dets_idx][:, :, self._echans]
 
-                sig = Significance(
-                    self._observed_counts[:, det_idx, e].sum(),
-                    self._bkg_counts[:, det_idx, e].sum(),
-                )
-                sig_total = sig.li_and_ma_equivalent_for_gaussian_background(
-                    np.sum(self._bkg_stat_err[:, det_idx, e] ** 2)
-                )
-
-                sigs = []
-                counts = np.empty(n_parts - 1)
-                bkg_counts = np.empty(n_parts - 1)
-                bkg_errs = np.empty(n_parts - 1)
-
-                for i, (a, b) in enumerate(zip(part_idx[:-1], part_idx[1:])):
-
-                    counts[i] = self._observed_counts[a:b, det_idx, e].sum()
-                    bkg_counts[i] = self._bkg_counts[a:b, det_idx, e].sum()
-                    bkg_errs[i] = np.sqrt(
-                        np.sum(self._bkg_stat_err[a:b, det_idx, e] ** 2)
-                    )
+        sig_total = li_and_ma_gaussian_background(
+            counts.sum(axis=0), bkg_counts.sum(axis=0), bkg_var.sum(axis=0)
+        )
 
-                sig = Significance(counts, bkg_counts)
-                sigs.extend(sig.li_and_ma_equivalent_for_gaussian_background(bkg_errs))
+        sigs = li_and_ma_gaussian_background(counts, bkg_counts, np.sqrt(bkg_var))
 
-                median_sig = np.median(sigs)
+        median_sig = np.median(sigs, axis=0)
 
-                good = True
-                if sig_total <= max_neg_sig or median_sig <= max_neg_med_sig:
-                    good = False
-                if median_sig >= max_med_sig:
-                    good = False
+        bad = np.logical_or.reduce(
+            [
+                sig_total <= max_neg_sig,
+                median_sig <= max_neg_med_sig,
+                median_sig >= max_med_sig,
+            ]
+        )
 
-                if good:
-                    good_bkg_fit_mask[det_idx, e] = True
+        good_bkg_fit_mask[np.ix_(self._dets_idx, self._echans)] = ~bad
 
         self._good_bkg_fit_mask = good_bkg_fit_mask
 
@@ -266,140 +534,289 @@ class TransientDetector(object):
         """
         Combine the energy bins that are used for the calculation of the significance
         """
-        data = {}
-        background = {}
-        bkg_stat_err = {}
-
         if echans is None:
             echans = self._echans
-            echan_mask = copy.deepcopy(self._good_bkg_fit_mask)
 
-        else:
-            # Build the mask of the echans to combine
-            e_mask = np.zeros(8, dtype=bool)
-            e_mask[echans] = True
+        # Mask of the echans to combine with a good bkg fit for all rows of the data
+        e_mask = np.zeros(8, dtype=bool)
+        e_mask[echans] = True
 
-            # Get the echans with a good bkg fit and combin with e_mask
-            det_echan_mask = copy.deepcopy(self._good_bkg_fit_mask)
-            det_echan_mask[:, ~e_mask] = False
+        row_echan_mask = self._good_bkg_fit_mask[self._data_rows] & e_mask
 
-        for det in self._detectors:
-            det_idx = valid_det_names.index(det)
-
-            echan_mask = det_echan_mask[det_idx, :]
-
-            # Combine all energy channels for the calculation of the significance
-            data[det] = self._rebinned_observed_counts[
-                self._rebinned_saa_mask, det_idx, :
-            ][:, echan_mask].sum(axis=1)
-            background[det] = self._rebinned_bkg_counts[
-                self._rebinned_saa_mask, det_idx, :
-            ][:, echan_mask].sum(axis=1)
-            bkg_stat_err[det] = np.sqrt(
-                np.sum(
-                    self._rebinned_bkg_stat_err[self._rebinned_saa_mask, det_idx, :][
-                        :, echan_mask
-                    ]
-                    ** 2,
-                    axis=1,
-                )
-            )
+        # Searched detectors, without the bins in the SAA
+        select = np.ix_(self._rebinned_saa_mask, self._data_dets_idx)
+
+        observed_counts, bkg_counts, bkg_stat_err = combine_echans(
+            self._rebinned_observed_counts,
+            self._rebinned_bkg_counts,
+            self._rebinned_bkg_stat_err,
+            row_echan_mask,
+        )
 
-        self._observed_counts_total = data
-        self._bkg_counts_total = background
-        self._bkg_stat_err_total = bkg_stat_err
+        # Dense (time, detector) arrays in the order of self._detectors
+        self._observed_counts_combined = observed_counts[select]
+        self._bkg_counts_combined = bkg_counts[select]
+        self._bkg_stat_err_combined = bkg_stat_err[select]
+
+        # Views of the columns per detector
+        self._observed_counts_total = self._detector_columns(
+            self._observed_counts_combined
+        )
+        self._bkg_counts_total = self._detector_columns(self._bkg_counts_combined)
+        self._bkg_stat_err_total = self._detector_columns(self._bkg_stat_err_combined)
+
+    def _detector_columns(self, array):
+        """
+        Dictionary with views of the columns of a (time, detector) array
+        """
+        return {det: array[:, i] for i, det in enumerate(self._detectors)}
 
     def _detect_changepoints(self, min_separation=0, **kwargs):
         """
-        Find changepoints applying the ruptures PELT method
-        in the angles time series
+        Find changepoints applying the PELT method in the angles time series,
+        either with ruptures or with the native cumulative sum implementation
         """
+        cached_output, jobs, job_sizes = self._pending_changepoint_jobs(**kwargs)
 
-        def detect_cpts(arg):
+        if self._pool is None:
+            self._pool = ChangepointPool()
 
-            array, mapping, slice_idx, valid_slice, kwargs = arg
+        cpts_output = self._pool.map(detect_cpts, jobs, job_sizes)
 
-            array_slice = array[valid_slice[0] : valid_slice[1]]
+        self._finish_changepoints(
+            cached_output, cpts_output, min_separation=min_separation, **kwargs
+        )
 
-            penalty = 2 * np.log(len(array_slice))
+    def _pending_changepoint_jobs(self, **kwargs):
+        """
+        Get the cached change points and the jobs for the segments
+        that are not cached
+        """
+        jobs, job_sizes = self._changepoint_jobs(**kwargs)
 
-            algo_dist = rpt.Pelt(**kwargs).fit(array_slice)
+        cached_output = []
+        self._cached_segments = {}
 
-            cpts_seg = algo_dist.predict(pen=penalty)
+        if self._changepoint_cache is not None:
+            valid_rows = np.flatnonzero(self._rebinned_saa_mask)
 
-            return (mapping, slice_idx, cpts_seg + valid_slice[0])
+            self._segment_keys = [
+                self._segment_key(valid_rows[start], valid_rows[stop - 1] + 1, **kwargs)
+                for start, stop in self._valid_slices
+            ]
 
-        def find_min_distance(array, value):
-            array = np.asarray(array)
-            return (np.abs(array - value)).min()
+            entries = self._changepoint_cache.load(
+                self._segment_keys, group=self._cache_group
+            )
 
-        jobs = []
-        pool = Pool(cpu_count())
+            for slice_idx, key in enumerate(self._segment_keys):
 
-        for i, valid_slice in enumerate(self._valid_slices):
-            jobs.append((self._angles, "angle", i, valid_slice, kwargs))
+                if key not in entries:
+                    continue
 
-        for i, valid_slice in enumerate(self._valid_slices):
-            jobs.append((self._distances, "distance", i, valid_slice, kwargs))
+                self._cached_segments[slice_idx] = entries[key]
 
-        cpts_output = pool.map(detect_cpts, jobs)
+                for mapping, cpts in entries[key]["change_points"].items():
+                    cached_output.append(
+                        (mapping, slice_idx, cpts + self._valid_slices[slice_idx][0])
+                    )
 
-        change_points_angles = [None] * len(self._valid_slices)
+            job_sizes = [
+                size
+                for job, size in zip(jobs, job_sizes)
+                if job[2] not in self._cached_segments
+            ]
+            jobs = [job for job in jobs if job[2] not in self._cached_segments]
 
-        for mapping, slice_idx, cpts in cpts_output:
-            if mapping == "angle":
-                change_points_angles[slice_idx] = cpts
+            logger.info(
+                f"Reusing the cached change points of {len(self._cached_segments)} "
+                f"of {len(self._valid_slices)} segments"
+            )
 
-        change_points = deepcopy(change_points_angles)
+        return cached_output, jobs, job_sizes
+
+    def _finish_changepoints(
+        self, cached_output, cpts_output, min_separation=0, **kwargs
+    ):
+        """
+        Combine the new change points with the cached ones
+        """
+        self._changepoint_settings = dict(min_separation=min_separation, **kwargs)
+
+        self._collect_changepoints(
+            cached_output + cpts_output, min_separation=min_separation
+        )
+
+    def _segment_key(self, first_row, stop_row, **kwargs):
+        """
+        Cache key of a segment, from the data of the segment, the day-wide
+        transform (unless every segment is transformed on its own) and the search settings.
+        A refit of other segments only changes the key if it changes the
+        day-wide shift or scale.
+        first_row, stop_row: Rows of the segment in the rebinned data (with the SAAs)
+        """
+        rows = slice(first_row, stop_row)
+
+        transform_stats = [
+            np.atleast_1d(np.asarray(stats, dtype=float))
+            for stats in (self._transform_stats or ())
+        ]
+
+        return self._changepoint_cache.segment_key(
+            self._rebinned_time_bins[rows],
+            self._rebinned_observed_counts[rows],
+            self._rebinned_bkg_counts[rows],
+            self._rebinned_bkg_stat_err[rows],
+            self._good_bkg_fit_mask,
+            np.asarray(self._data_rows),
+            np.asarray(self._dets_idx),
+            *transform_stats,
+            mad=self._mad,
+            segment_transform=self._segment_transform,
+            **kwargs,
+        )
+
+    @property
+    def _cache_group(self):
+        return f"bin_width_{self._min_bin_width}"
+
+    def _changepoint_jobs(self, **kwargs):
+        """
+        Build the changepoint detection jobs for the angles and
+        distances of all valid slices
+        """
+        jobs = []
+        job_sizes = []
+
+        for mapping, array in [("angle", self._angles), ("distance", self._distances)]:
+
+            for i, valid_slice in enumerate(self._valid_slices):
+                jobs.append(
+                    (
+                        array[valid_slice[0] : valid_slice[1]],
+                        mapping,
+                        i,
+                        valid_slice,
+                        kwargs,
+                    )
+                )
+                job_sizes.append(valid_slice[1] - valid_slice[0])
+
+        return jobs, job_sizes
+
+    def _collect_changepoints(self, cpts_output, min_separation=0):
+        """
+        Combine the changepoints of the angles and distances
+        """
+        change_points = {
+            mapping: [[] for _ in range(len(self._valid_slices))]
+            for mapping in ["angle", "distance"]
+        }
 
         for mapping, slice_idx, cpts in cpts_output:
-            if mapping == "distances":
+            change_points[mapping][slice_idx] = cpts
 
-                for cpt in cpts:
+        self._segment_changepoints = change_points
 
-                    if (
-                        find_min_distance(change_points_angles[slice_idx], cpt)
-                        > min_separation
-                    ):
-                        change_points[slice_idx].append(cpt)
+        self._change_points_all = [
+            fuse_changepoints(angle_cpts, distance_cpts, min_separation)
+            for angle_cpts, distance_cpts in zip(
+                change_points["angle"], change_points["distance"]
+            )
+        ]
 
-        self._change_points_all = change_points
+    def close(self):
+        """
+        Shut down the changepoint worker pool if it is owned by this detector
+        """
+        if self._owns_pool and self._pool is not None:
+            self._pool.close()
+            self._pool = None
 
     def _calc_significances(self):
         """
         Calculate the significance of the interval between two subsequent change points.
         Treat the sections between SAA passages individually to not have intervals spanning
-        over long dead times.
+        over long dead times. The significances of cached segments with the same
+        intervals are reused.
         """
+        segment_intervals = []
+        segment_significances = []
+
+        for slice_idx, cpts_segment in enumerate(self._change_points_all):
+            cpts_segment = np.asarray(cpts_segment, dtype=int)
 
-        intervals = []
+            intervals = np.column_stack([cpts_segment[:-1], cpts_segment[1:]])
+            segment_intervals.append(intervals.reshape((-1, 2)))
 
-        for cpts_segment in self._change_points_all:
-            intervals_segment = list(zip(cpts_segment[:-1], cpts_segment[1:]))
-            intervals.extend(intervals_segment)
+            cached = self._cached_segments.get(slice_idx)
+            start = self._valid_slices[slice_idx][0]
 
-        n = len(intervals)
-        counts = np.empty(n)
-        bkg_counts = np.empty(n)
-        bkg_errs = np.empty(n)
+            if cached is not None and np.array_equal(
+                cached["intervals"] + start, segment_intervals[-1]
+            ):
+                segment_significances.append(cached["significances"])
 
-        significances = np.zeros((len(intervals), len(self._detectors)))
+            else:
+                segment_significances.append(None)
 
-        for det_idx, det in enumerate(self._detectors):
+        missing = [i for i, sig in enumerate(segment_significances) if sig is None]
 
-            for i, (a, b) in enumerate(intervals):
+        if len(missing) > 0:
+            significances = self._interval_significances(
+                np.concatenate([segment_intervals[i] for i in missing])
+            )
+
+            splits = np.cumsum([len(segment_intervals[i]) for i in missing])[:-1]
+
+            for i, sig in zip(missing, np.split(significances, splits)):
+                segment_significances[i] = sig
 
-                counts[i] = self._observed_counts_total[det][a:b].sum()
-                bkg_counts[i] = self._bkg_counts_total[det][a:b].sum()
-                bkg_errs[i] = np.sqrt(np.sum(self._bkg_stat_err_total[det][a:b] ** 2))
+        self._intervals_all = np.concatenate(
+            segment_intervals + [np.empty((0, 2), dtype=int)]
+        )
+        self._significances_all = np.concatenate(
+            segment_significances + [np.empty((0, len(self._detectors)))]
+        )
 
-            sig = Significance(counts, bkg_counts)
-            significances[
-                :, det_idx
-            ] = sig.li_and_ma_equivalent_for_gaussian_background(bkg_errs)
+        if self._changepoint_cache is not None:
+            self._update_cache(missing, segment_intervals, segment_significances)
 
-        self._intervals_all = np.array(intervals)
-        self._significances_all = significances
+        self._significance_source = dict(
+            engine="changepoints", **self._changepoint_settings
+        )
+
+    def _update_cache(self, slice_idxs, segment_intervals, segment_significances):
+        """
+        Store the change points and significances of the segments that were
+        not cached and remove the entries that are not used by this run
+        """
+        entries = {}
+
+        for slice_idx in slice_idxs:
+            start = self._valid_slices[slice_idx][0]
+
+            entries[self._segment_keys[slice_idx]] = {
+                "change_points": {
+                    mapping: np.asarray(cpts[slice_idx], dtype=int) - start
+                    for mapping, cpts in self._segment_changepoints.items()
+                },
+                "intervals": segment_intervals[slice_idx] - start,
+                "significances": segment_significances[slice_idx],
+            }
+
+        self._changepoint_cache.store(entries, group=self._cache_group)
+        self._changepoint_cache.prune(self._segment_keys, group=self._cache_group)
+
+    def _interval_significances(self, intervals):
+        """
+        Significances of intervals (start and stop index) for all searched detectors
+        """
+        counts, bkg_counts, bkg_var = self._interval_stats.interval_sums(
+            intervals[:, 0], intervals[:, 1]
+        )
+
+        return li_and_ma_gaussian_background(counts, bkg_counts, np.sqrt(bkg_var))
 
     def _apply_threshold_significance(
         self, significance_brightest=5, significance_others=2, min_dets=2, max_dets=10
@@ -420,65 +837,243 @@ class TransientDetector(object):
 
         valid_idx = np.logical_and(valid_brightest, valid_others)
 
+        in_day = self._starts_in_day(self._intervals_all)
+
+        if np.any(valid_idx & ~in_day):
+            logger.info(
+                f"{np.sum(valid_idx & ~in_day)} significant intervals start in the "
+                "tail of the previous day, they are left to the search of that day"
+            )
+
+        valid_idx &= in_day
+
         self._intervals = self._intervals_all[valid_idx]
         self._significances = self._significances_all[valid_idx]
 
+    def _starts_in_day(self, intervals):
+        """
+        Mask of the intervals that start in the day and not in the prepended tail
+        of the previous day. The triggers of the tail would get the date of the
+        previous day and their data is not in the background fit of this day,
+        which is used to localize and plot the triggers.
+        """
+        if self._day_start is None:
+            return np.ones(len(intervals), dtype=bool)
+
+        interval_starts = self._rebinned_time_bins[self._rebinned_saa_mask][
+            np.asarray(intervals, dtype=int).reshape((-1, 2))[:, 0], 0
+        ]
+
+        return interval_starts >= self._day_start
+
     def _select_intervals(self):
-        # Get non-overlapping segments
-        trigger_intervals = segment_disjoint(self._intervals)
-        disjoint_segments_idx = segment_disjoint_idx(self._intervals)
+        (
+            self._trigger_intervals,
+            self._max_dets,
+            self._max_intervals,
+            self._max_significances,
+        ) = select_triggers(self._intervals, self._significances, self._detectors)
 
-        max_dets = []
-        max_intervals = []
-        max_significances = []
+    def _find_peak_times(self):
+        self._trigger_times, self._trigger_peak_times = self._calc_trigger_times(
+            self._max_intervals, self._max_dets
+        )
 
-        # For each trigger interval find the detector with the brightest (sub)-interval
-        for seg_idx in disjoint_segments_idx:
-            sigs = self._significances[seg_idx[0] : seg_idx[1]]
-            ints = self._intervals[seg_idx[0] : seg_idx[1]]
+    def _calc_trigger_times(self, max_intervals, max_dets):
+        """
+        Get the start times of the trigger intervals and the peak times
+        of the triggers in the most significant detector
+        """
+        det_columns = [list(self._detectors).index(det) for det in max_dets]
 
-            max_sig = np.max(sigs)
-            int_idx, det_idx = np.where(sigs == max_sig)
+        max_index = self._interval_stats.peak_indices(
+            max_intervals[:, 0], max_intervals[:, 1], det_columns
+        )
 
-            if int_idx.shape[0] != 1:
-                logger.error(
-                    "Found multiple intervals with the exact same significance"
-                )
-                int_idx = int_idx[0]
-            if det_idx.shape[0] != 1:
-                logger.error(
-                    "Found multiple detectors with the exact same significance"
-                )
-                det_idx = det_idx[0]
+        trigger_peak_times = self._rebinned_time_bins[self._rebinned_saa_mask][
+            max_index, 0
+        ]
 
-            max_dets.append(self._detectors[det_idx[0]])
-            max_intervals.append(ints[int_idx[0]])
-            max_significances.append(max_sig)
+        trigger_times = self._rebinned_time_bins[self._rebinned_saa_mask][
+            max_intervals[:, 0], 0
+        ]
 
-        self._trigger_intervals = np.array(trigger_intervals)
-        self._max_dets = np.array(max_dets)
-        self._max_intervals = np.array(max_intervals)
-        self._max_significances = np.array(max_significances)
+        return trigger_times, np.array(trigger_peak_times)
 
-    def _find_peak_times(self):
+    def threshold_sweep(
+        self,
+        min_significance_brightest,
+        min_significance_others,
+        min_significant_dets,
+        max_significant_dets,
+        **kwargs,
+    ):
+        """
+        Evaluate the triggers for a grid of significance thresholds.
+        The intervals and significances of the last run (run or run_window_search)
+        on the current data are reused, or calculated once, the thresholds are applied to all combinations at once and every distinct
+        selection of intervals is only turned into triggers once.
+        min_significance_brightest: List of required significances for the brightest detector.
+        min_significance_others: List of required significances for the other detectors.
+        min_significant_dets: List of min numbers of significant detectors
+        max_significant_dets: List of max numbers of significant detectors
+        kwargs: min_separation, min_size, jump, model and coarse_factor for the change
+            point detection, the change points are only detected again if they differ
+            from the settings of the last run
+        returns: list with the thresholds, the number of triggers and the triggers
+            for every combination of the thresholds
+        """
+        sig_brightest = np.atleast_1d(min_significance_brightest)
+        sig_others = np.atleast_1d(min_significance_others)
+        min_dets = np.atleast_1d(min_significant_dets)
+        max_dets = np.atleast_1d(max_significant_dets)
 
-        # Get the peak time of the
-        trigger_peak_times = []
+        self._prepare_sweep(np.min(sig_brightest), **kwargs)
 
-        for i, (a, b) in enumerate(self._max_intervals):
+        significances = self._significances_all
 
-            max_index = (
-                np.argmax(self._counts_cleaned_total[self._max_dets[i]][a:b]) + a
+        # Number of significant detectors per interval for all thresholds
+        valid_brightest = (
+            np.max(significances, axis=1, initial=-np.inf)[np.newaxis, :]
+            > sig_brightest[:, np.newaxis]
+        )
+        nr_dets_others = np.sum(
+            significances[np.newaxis] > sig_others[:, np.newaxis, np.newaxis], axis=2
+        )
+
+        valid_others = np.logical_and(
+            nr_dets_others[:, np.newaxis, np.newaxis, :]
+            >= min_dets[np.newaxis, :, np.newaxis, np.newaxis],
+            nr_dets_others[:, np.newaxis, np.newaxis, :]
+            <= max_dets[np.newaxis, np.newaxis, :, np.newaxis],
+        )
+
+        valid_idx = np.logical_and(
+            valid_brightest[:, np.newaxis, np.newaxis, np.newaxis, :],
+            valid_others[np.newaxis],
+        ).reshape((-1, significances.shape[0]))
+
+        valid_idx &= self._starts_in_day(self._intervals_all)[np.newaxis]
+
+        # Combinations with the same valid intervals give the same triggers
+        unique_valid_idx, combination_idx = np.unique(
+            valid_idx, axis=0, return_inverse=True
+        )
+
+        unique_triggers = [
+            self._sweep_triggers(unique_valid) for unique_valid in unique_valid_idx
+        ]
+
+        sweep_result = []
+
+        for i, thresholds in enumerate(
+            itertools.product(sig_brightest, sig_others, min_dets, max_dets)
+        ):
+            triggers = unique_triggers[combination_idx.flat[i]]
+
+            sweep_result.append(
+                {
+                    "min_significance_brightest": thresholds[0].item(),
+                    "min_significance_others": thresholds[1].item(),
+                    "min_significant_dets": thresholds[2].item(),
+                    "max_significant_dets": thresholds[3].item(),
+                    "nr_triggers": len(triggers),
+                    "triggers": triggers,
+                }
             )
 
-            trigger_peak_times.append(
-                self._rebinned_time_bins[self._rebinned_saa_mask][max_index, 0]
+        return sweep_result
+
+    def _prepare_sweep(self, min_significance, **kwargs):
+        """
+        Make sure that the intervals and significances of the current data
+        cover the sweep. Without kwargs the ones of the last run are used,
+        the windows are recalculated if they were cut above min_significance.
+        With kwargs (or without a previous run) the change points are detected
+        with these settings, unless the last run used the same settings.
+        """
+        source = self._significance_source
+
+        if source is not None and len(kwargs) == 0:
+
+            if source["engine"] == "windows" and (
+                source["min_significance"] > min_significance
+            ):
+                with self._stage("window_search"):
+                    self._calc_window_significances(
+                        source["durations"], min_significance=min_significance
+                    )
+
+            return
+
+        cpt_kwargs = dict(
+            min_separation=5, min_size=1, jump=1, model="l2", coarse_factor=1
+        )
+        cpt_kwargs.update(kwargs)
+
+        if source == dict(engine="changepoints", **cpt_kwargs):
+            return
+
+        with self._stage("changepoints"):
+            self._detect_changepoints(**cpt_kwargs)
+
+        with self._stage("significances"):
+            self._calc_significances()
+
+    def _sweep_triggers(self, valid_idx):
+        """
+        Build the list of triggers for one selection of intervals
+        """
+        _, max_dets, max_intervals, max_significances = select_triggers(
+            self._intervals_all[valid_idx],
+            self._significances_all[valid_idx],
+            self._detectors,
+        )
+
+        trigger_times, trigger_peak_times = self._calc_trigger_times(
+            max_intervals, max_dets
+        )
+
+        interval_starts, interval_stops = self._interval_times(max_intervals)
+
+        triggers = []
+
+        for i, t0 in enumerate(trigger_times):
+
+            triggers.append(
+                {
+                    "trigger_time": t0.tolist(),
+                    "peak_time": (trigger_peak_times[i] - t0).tolist(),
+                    "significance": max_significances[i].tolist(),
+                    "interval": {
+                        "start": interval_starts[i].tolist(),
+                        "stop": interval_stops[i].tolist(),
+                    },
+                    "most_significant_detector": str(max_dets[i]),
+                }
             )
 
-        self._trigger_times = self._rebinned_time_bins[self._rebinned_saa_mask][
-            self._max_intervals[:, 0], 0
-        ]
-        self._trigger_peak_times = np.array(trigger_peak_times)
+        return triggers
+
+    def _interval_times(self, intervals):
+        """
+        Start and stop times of intervals, the indices of the intervals refer to
+        the bins outside of the SAAs and the stop is the first bin after the interval
+        """
+        mean_time = self._rebinned_mean_time[self._rebinned_saa_mask]
+
+        return (
+            mean_time[intervals[:, 0]],
+            mean_time[np.minimum(intervals[:, 1], len(mean_time) - 1)],
+        )
+
+    @property
+    def trigger_information(self):
+        """
+        Result dictionary with the triggers of the last search (or of the
+        loaded result file), None before a search
+        """
+        return self._trigger_information
 
     @property
     def trigger_peak_times(self):
@@ -519,26 +1114,34 @@ class TransientDetector(object):
             "triggers": {},
         }
 
-        for i, t0 in enumerate(self.trigger_times):
-            t0 = self.trigger_times[i]
+        # Significances of the most significant interval in all detectors
+        detector_significances = self._interval_significances(
+            np.asarray(self.trigger_intervals, dtype=int).reshape((-1, 2))
+        )
+
+        interval_starts, interval_stops = self._interval_times(
+            np.asarray(self.trigger_intervals, dtype=int).reshape((-1, 2))
+        )
 
-            gbm_time = GBMTime.from_MET(t0)
-            date_str = gbm_time.time.datetime.strftime("%y%m%d")
-            day_fraction = f"{round(gbm_time.time.mjd % 1, 3):.3f}"[2:]
+        # Convert all trigger times to UTC at once
+        trigger_names, date_strs, utc_strs = trigger_names_from_met(self.trigger_times)
 
-            trigger_name = f"GRT{date_str}{day_fraction}"
+        for i, t0 in enumerate(self.trigger_times):
+
+            date_str = date_strs[i].item()
+            trigger_name = trigger_names[i].item()
             sig = self.trigger_significances.tolist()[i]
             max_det = self.trigger_most_sig_det.tolist()[i]
 
             peak_time = self.trigger_peak_times[i] - t0
-            tstart = self._rebinned_mean_time[self.trigger_intervals[i]][0].tolist()
-            tstop = self._rebinned_mean_time[self.trigger_intervals[i]][1].tolist()
+            tstart = interval_starts[i].tolist()
+            tstop = interval_stops[i].tolist()
 
             t_info = {
                 "date": date_str,
                 "trigger_name": trigger_name,
                 "trigger_time": t0.tolist(),
-                "trigger_time_utc": gbm_time.utc,
+                "trigger_time_utc": utc_strs[i].item(),
                 "peak_time": peak_time.tolist(),
                 "significances": sig,
                 "interval": {
@@ -546,6 +1149,9 @@ class TransientDetector(object):
                     "stop": tstop,
                 },
                 "most_significant_detector": max_det,
+                "detector_significances": dict(
+                    zip(self._detectors.tolist(), detector_significances[i].tolist())
+                ),
             }
 
             trigger_information["triggers"][trigger_name] = t_info
@@ -553,25 +1159,39 @@ class TransientDetector(object):
         self._trigger_information = trigger_information
 
     def plot_results(self, output_dir):
+        with self._stage("plot"):
+            plotter = TriggerPlot(
+                triggers=self._trigger_information["triggers"],
+                time_bins=self._rebinned_time_bins,
+                counts=self._all_detectors(self._rebinned_observed_counts),
+                detectors=self._detectors,
+                echans=self._echans,
+                bkg_counts=self._all_detectors(self._rebinned_bkg_counts),
+                counts_cleaned=self._all_detectors(self._counts_cleaned),
+                saa_mask=self._rebinned_saa_mask,
+                good_bkg_fit_mask=self._good_bkg_fit_mask,
+                angles=self._angles,
+                show_all_echans=True,
+                show_angles=True,
+            )
 
-        plotter = TriggerPlot(
-            triggers=self._trigger_information["triggers"],
-            time_bins=self._rebinned_time_bins,
-            counts=self._rebinned_observed_counts,
-            detectors=self._detectors,
-            echans=self._echans,
-            bkg_counts=self._rebinned_bkg_counts,
-            counts_cleaned=self._counts_cleaned,
-            saa_mask=self._rebinned_saa_mask,
-            good_bkg_fit_mask=self._good_bkg_fit_mask,
-            angles=self._angles,
-            show_all_echans=True,
-            show_angles=True,
-        )
+            plotter.create_overview_plots(output_dir)
 
-        plotter.create_overview_plots(output_dir)
+            plotter.save_plot_data(output_dir)
 
-        plotter.save_plot_data(output_dir)
+    def _all_detectors(self, array):
+        """
+        Expand data that only contains the searched detectors to all detectors
+        """
+        n_dets = self._good_bkg_fit_mask.shape[0]
+
+        if array.shape[1] == n_dets:
+            return array
+
+        full_array = np.zeros((array.shape[0], n_dets) + array.shape[2:], array.dtype)
+        full_array[:, self._data_rows] = array
+
+        return full_array
 
     def set_data_timestamp(self, data_file_path):
         # Wrap in try except for the simulation to work
@@ -590,133 +1210,378 @@ class TransientDetector(object):
         self._trigger_information["data_timestamp"] = data_timestamp
 
     def save_result(self, output_path):
+        # Columnar copy of the triggers for fast loading, written first as
+        # the yaml file is the output of the search task
+        save_trigger_table(trigger_table_path(output_path), self._trigger_information)
+
         # output_file = os.path.join(os.path.dirname(output_path), "trigger_information.yml")
         with open(output_path, "w") as f:
             yaml.dump(self._trigger_information, f, default_flow_style=False)
 
+    def remove_known_triggers(self, previous_trigger_information):
+        """
+        Remove the triggers that overlap with a trigger of a previous result,
+        e.g. the triggers at the start of the day that continue a trigger
+        of the previous day
+        """
+        removed = remove_known_triggers(
+            self._trigger_information, previous_trigger_information
+        )
+
+        if len(removed) > 0:
+            logger.info(f"Removed the known triggers {removed}")
+
+    def load_triggers(self, trigger_result_path):
+        """
+        Load the triggers of a previous run from its result file (e.g. to plot them)
+        """
+        with open(trigger_result_path, "r") as f:
+            self._trigger_information = yaml.safe_load(f)
+
+    def load_result(self, result_file, previous_tail=None):
+        """
+        Load a result file from the background fit,
+        this allows to reuse the detector (and its pool) for many days
+        previous_tail: tail of the previous day (see DayTailBuffer) that is
+            prepended to the data, to find transients across midnight. Only the
+            intervals that start in the day become triggers.
+        """
+        self._timer.reset()
+
+        with self._stage("load"):
+            self._load_result_file(result_file, previous_tail=previous_tail)
+
+        self._setup()
+
+    def save_timing(self, output_path):
+        """
+        Save the run time and memory of the stages as json
+        """
+        self._timer.save(output_path)
+
+    @property
+    def timer(self):
+        return self._timer
+
+    @timer.setter
+    def timer(self, timer):
+        self._timer = timer
+
+    @property
+    def changepoint_cache(self):
+        return self._changepoint_cache
+
+    @changepoint_cache.setter
+    def changepoint_cache(self, changepoint_cache):
+        self._changepoint_cache = changepoint_cache
+
     def load_simulation(self, simulation):
         """
         Load simulation
         """
-        self._dates = simulation.dates
-        self._detectors = simulation.detectors
-        self._echans = np.array([int(echan) for echan in simulation.echans])
-        self._data_type = simulation.data_type
-        self._time_bins = simulation.time_bins
-        self._saa_mask = simulation.saa_mask
-        self._observed_counts = simulation.observed_counts
-        self._bkg_counts = simulation.bkg_counts
-        self._bkg_stat_err = simulation.bkg_stat_err
+        self.load_data(
+            dates=simulation.dates,
+            detectors=simulation.detectors,
+            echans=simulation.echans,
+            data_type=simulation.data_type,
+            time_bins=simulation.time_bins,
+            saa_mask=simulation.saa_mask,
+            observed_counts=simulation.observed_counts,
+            bkg_counts=simulation.bkg_counts,
+            bkg_stat_err=simulation.bkg_stat_err,
+        )
 
-        self._setup()
+    def load_data(
+        self,
+        dates,
+        detectors,
+        echans,
+        data_type,
+        time_bins,
+        saa_mask,
+        observed_counts,
+        bkg_counts,
+        bkg_stat_err,
+        data_rows=None,
+        good_bkg_fit_mask=None,
+        recalc_saa_mask=True,
+        rebin_source=None,
+        day_start=None,
+    ):
+        """
+        Load data and background that are already in memory
+        data_rows: Detector index (in valid_det_names) of the entries in the
+            detector axis of the data, defaults to all detectors
+        good_bkg_fit_mask: Mask of the detectors and echans with a good background
+            fit, if None it is calculated from the data
+        recalc_saa_mask: Calculate the saa mask from the time bins,
+            False to use saa_mask as it is
+        rebin_source: Source of the data that identifies it in the rebin cache,
+            if None the rebinned data is not cached
+        day_start: Start time of the day if the data begins with the tail of the
+            previous day, the intervals that start before it do not become triggers
+        """
+        self._dates = dates
+        self._detectors = detectors
+        self._echans = np.array([int(echan) for echan in echans])
+        self._data_type = data_type
+        self._time_bins = time_bins
+        self._saa_mask = saa_mask
+        self._observed_counts = observed_counts
+        self._bkg_counts = bkg_counts
+        self._bkg_stat_err = bkg_stat_err
 
+        if data_rows is None:
+            data_rows = np.arange(observed_counts.shape[1])
 
-def distance_mapping(x, ref_vector=None):
+        self._data_rows = data_rows
+        self._rebin_source = rebin_source
+        self._day_start = day_start
+
+        self._setup(
+            recalc_saa_mask=recalc_saa_mask, good_bkg_fit_mask=good_bkg_fit_mask
+        )
+
+
+def prepend_tail(
+    tail,
+    detectors,
+    echans,
+    data_rows,
+    time_bins,
+    saa_mask,
+    observed_counts,
+    model_counts,
+    stat_err,
+):
     """
-    Maps a multi dimensional vector to the length of the vector
+    Prepend the tail of the previous day to the data of a day
+    :param tail: tail of the previous day (see DayTailBuffer)
+    :param data_rows: rows of the detector axis of the data of the day
+    :returns: time bins, saa mask, observed counts, model counts and stat errors
     """
+    if list(tail["detectors"]) != list(detectors) or list(tail["echans"]) != list(
+        echans
+    ):
+        logger.warning(
+            "The previous day was fitted with other detectors or echans, "
+            "its tail is not used"
+        )
+
+        return time_bins, saa_mask, observed_counts, model_counts, stat_err
 
-    if ref_vector is None:
-        ref_vector = np.repeat(1, x.shape[1])
+    # Only use the bins that end before the first bin of the day
+    n_tail = np.searchsorted(tail["time_bins"][:, 1], time_bins[0, 0], side="right")
 
-    distance = np.sqrt(np.sum((x - ref_vector) ** 2, axis=1))
+    def prepend(tail_array, array):
+        if tail_array.ndim == 3:
+            tail_array = tail_array[:n_tail, data_rows]
+        else:
+            tail_array = tail_array[:n_tail]
+
+        return np.concatenate([tail_array.astype(array.dtype), array])
 
-    return distance
+    return (
+        prepend(tail["time_bins"], time_bins),
+        prepend(tail["saa_mask"], saa_mask),
+        prepend(tail["observed_counts"], observed_counts),
+        prepend(tail["model_counts"], model_counts),
+        prepend(tail["stat_err"], stat_err),
+    )
 
 
-def angle(x, ref_vector):
+def segment_transform_stats(data, mad=False):
     """
-    Calculate the separation angle between a vector and a reference vector
+    Statistics of the cleaned counts of a segment between two SAA passages
+    (or of the whole day) that define the transformation for the mapping
+    :param data: (time, channel) array of the cleaned counts of the segment
+    :param mad: normalize the columns with the median and the median absolute
+        deviation of the segment
+    :returns: median, scale and minimum of the normalized data for every column
     """
-    dot_prod = np.dot(x, ref_vector)
+    if mad:
+        median = np.median(data, axis=0)
+        scale = stats.median_abs_deviation(data, axis=0)
+        scale = np.where(scale > 0, scale, 1)
 
-    norm1 = np.sqrt(np.sum(x ** 2))
-    norm2 = np.sqrt(np.sum(ref_vector ** 2))
+    else:
+        median = 0
+        scale = 1
 
-    if abs(dot_prod / (norm1 * norm2)) > 1:
-        return 0
+    return median, scale, np.min((data - median) / scale, axis=0)
 
-    else:
-        return np.arccos(dot_prod / (norm1 * norm2))
 
+def transform_segment(data, mad=False, transform_stats=None):
+    """
+    Transform the cleaned counts of a segment between two SAA passages for the
+    mapping, every column is shifted to a minimum of 1
+    :param data: (time, channel) array of the cleaned counts of the segment
+    :param mad: normalize the columns with the median and the median absolute
+        deviation of the segment first
+    :param transform_stats: median, scale and minimum (see segment_transform_stats)
+        to use instead of the ones of data
+    :returns: transformed data
+    """
+    if transform_stats is None:
+        transform_stats = segment_transform_stats(data, mad=mad)
+
+    median, scale, minimum = transform_stats
+
+    return (data - median) / scale - minimum + 1
 
-def angle_mapping(x, ref_vector=None):
+
+def combine_echans(observed_counts, bkg_counts, bkg_stat_err, echan_mask):
     """
-    Map a multi demensional vector to the separation angle between the vector
-    and a reference vector.
-    If no reference vector is passed use the unity vector (1, 1, 1  ...)
+    Sum the energy channels of (time, detector, echan) arrays in one pass,
+    without copying the selected channels
+    :param echan_mask: boolean (detector, echan) mask of the channels to combine
+    :returns: combined counts, background counts and background errors
+        with shape (time, detector)
     """
-    if ref_vector is None:
-        ref_vector = np.repeat(1, x.shape[1])
+    weights = echan_mask.astype(observed_counts.dtype)
 
-    x_ang = np.apply_along_axis(angle, axis=1, arr=x, ref_vector=ref_vector)
+    return (
+        np.einsum("tde,de->td", observed_counts, weights),
+        np.einsum("tde,de->td", bkg_counts, weights),
+        np.sqrt(np.einsum("tde,tde,de->td", bkg_stat_err, bkg_stat_err, weights)),
+    )
 
-    return (x_ang / np.pi) * 360
 
+def read_detectors(dataset, data_rows):
+    """
+    Read the selected detectors of a (time, detector, echan) dataset as float32,
+    one detector at a time to not hold a float64 copy of the full dataset
+    """
+    data = np.empty((dataset.shape[0], len(data_rows), dataset.shape[2]), np.float32)
 
-def slice_disjoint(arr):
+    for i, det_idx in enumerate(data_rows):
+        data[:, i, :] = dataset[:, det_idx, :]
+
+    return data
+
+
+def detect_cpts(arg):
     """
-    Returns an array of disjoint indices from a bool array
-    :param arr: and array of bools
+    Run PELT on one slice of a mapping,
+    returns the change points in indices of the full mapping
     """
+    array_slice, mapping, slice_idx, valid_slice, kwargs = arg
+
+    kwargs = dict(kwargs)
+    coarse_factor = kwargs.pop("coarse_factor", 1)
+
+    penalty = 2 * np.log(len(array_slice))
+
+    if coarse_factor > 1:
+        model = native_equivalents.get(kwargs["model"], kwargs["model"])
+
+        if model not in native_cost_models:
+            raise ValueError(
+                f"The coarse to fine search requires one of "
+                f"{list(native_equivalents) + list(native_cost_models)}"
+            )
+
+        cpts_seg = coarse_to_fine_pelt(
+            array_slice,
+            penalty,
+            coarse_factor,
+            model=model,
+            min_size=kwargs["min_size"],
+            jump=kwargs["jump"],
+        )
+
+    elif kwargs["model"] in native_cost_models:
+        cpts_seg = pelt(array_slice, pen=penalty, **kwargs)
+
+    else:
+        algo_dist = rpt.Pelt(**kwargs).fit(array_slice)
+
+        cpts_seg = algo_dist.predict(pen=penalty)
+
+    return (mapping, slice_idx, cpts_seg + valid_slice[0])
 
-    arr = (arr).nonzero()[0]
-
-    slices = []
-    start_slice = arr[0]
-    counter = 0
-    for i in range(len(arr) - 1):
-        if arr[i + 1] > arr[i] + 1:
-            end_slice = arr[i]
-            slices.append([start_slice, end_slice])
-            start_slice = arr[i + 1]
-            counter += 1
-    if counter == 0:
-        return [[arr[0], arr[-1]]]
-    if end_slice != arr[-1]:
-        slices.append([start_slice, arr[-1]])
-    return slices
-
-
-def segment_disjoint(arr):
+
+def fuse_changepoints(angle_cpts, distance_cpts, min_separation=0):
     """
-    Returns an array of disjoint segments from an array of (overlapping) segments
-    :param arr: and array of segments
+    Add the change points of the distances that are more than min_separation
+    away from the nearest change point of the angles
+    :param angle_cpts: sorted change points of the angles
+    :param distance_cpts: change points of the distances
+    :returns: sorted array of the combined change points
     """
-    arr = np.sort(arr)
-    slices = []
-    start_slice = arr[0][0]
-    counter = 0
-    for i in range(len(arr) - 1):
-        if arr[i + 1][0] > arr[i][1]:
-            end_slice = arr[i][1]
-            slices.append([start_slice, end_slice])
-            start_slice = arr[i + 1][0]
-            counter += 1
-    if counter == 0:
-        return arr
-    if end_slice != arr[-1][1]:
-        slices.append([start_slice, arr[-1][1]])
-    return slices
-
-
-def segment_disjoint_idx(arr):
+    angle_cpts = np.asarray(angle_cpts, dtype=int)
+    distance_cpts = np.asarray(distance_cpts, dtype=int)
+
+    if len(angle_cpts) == 0:
+        return np.unique(distance_cpts)
+
+    # Nearest angle change point on both sides of each distance change point
+    idx = np.searchsorted(angle_cpts, distance_cpts)
+
+    left = angle_cpts[np.clip(idx - 1, 0, len(angle_cpts) - 1)]
+    right = angle_cpts[np.clip(idx, 0, len(angle_cpts) - 1)]
+
+    min_distance = np.minimum(
+        np.abs(distance_cpts - left), np.abs(distance_cpts - right)
+    )
+
+    return np.sort(
+        np.concatenate([angle_cpts, distance_cpts[min_distance > min_separation]])
+    )
+
+
+def select_triggers(intervals, significances, detectors):
     """
-    Returns an array of start and end indexes from an array of (overlapping) segments
-    :param arr: and array of segments
+    Combine the overlapping significant intervals to triggers and find the
+    most significant (sub)-interval and detector of each trigger
+    :param intervals: array of the significant intervals
+    :param significances: significances of the intervals for each detector
+    :param detectors: detector names
+    :returns: trigger intervals, most significant detectors, most significant intervals
+        and maximal significances
     """
-    arr = np.sort(arr)
-    slices = []
-    start_idx = 0
-    counter = 0
-    for i in range(len(arr) - 1):
-        if arr[i + 1][0] > arr[i][1]:
-            end_idx = i + 1
-            slices.append([start_idx, end_idx])
-            start_idx = i + 1
-            counter += 1
-    if counter == 0:
-        return [[0, len(arr) - 1]]
-    if end_idx != len(arr):
-        slices.append([start_idx, len(arr)])
-    return slices
+    if len(intervals) == 0:
+        return (
+            np.empty((0, 2), dtype=int),
+            np.array([], dtype=str),
+            np.empty((0, 2), dtype=int),
+            np.array([]),
+        )
+
+    # Get non-overlapping segments and the segment of each interval
+    trigger_intervals, segment_idx = merge_segments(intervals)
+
+    # Group the intervals by trigger, the stable sort keeps their order in a group
+    order = np.argsort(segment_idx, kind="stable")
+    group_starts = np.unique(segment_idx[order], return_index=True)[1]
+    group_sizes = np.diff(np.append(group_starts, len(order)))
+
+    # For each trigger interval find the detector with the brightest (sub)-interval
+    interval_max = np.max(significances, axis=1)[order]
+
+    max_significances = np.maximum.reduceat(interval_max, group_starts)
+
+    is_max = significances[order] == np.repeat(max_significances, group_sizes)[:, None]
+
+    n_max = np.add.reduceat(np.sum(is_max, axis=1), group_starts)
+
+    if np.any(n_max > 1):
+        logger.error(
+            "Found multiple intervals or detectors with the exact same significance "
+            f"in {np.sum(n_max > 1)} triggers"
+        )
+
+    # First interval of every group that reaches the maximum
+    max_positions = np.flatnonzero(np.any(is_max, axis=1))
+    first_max = np.unique(segment_idx[order][max_positions], return_index=True)[1]
+
+    max_rows = order[max_positions[first_max]]
+
+    max_dets = np.asarray(detectors)[np.argmax(significances[max_rows], axis=1)]
+
+    return (
+        np.array(trigger_intervals),
+        np.array(max_dets),
+        intervals[max_rows],
+        max_significances,
+    )
@@ -0,0 +1,168 @@
+import os
+
+import h5py
+import numpy as np
+from gbm_transient_search.utils.detectors import valid_det_names
+
+_string_columns = [
+    "trigger_name",
+    "date",
+    "trigger_time_utc",
+    "most_significant_detector",
+]
+
+_float_columns = [
+    "trigger_time",
+    "peak_time",
+    "significance",
+    "interval_start",
+    "interval_stop",
+    "ra",
+    "ra_err",
+    "dec",
+    "dec_err",
+    "balrog_one_sig_err_circle",
+    "balrog_two_sig_err_circle",
+    "bin_width",
+]
+
+
+def trigger_table_path(result_path):
+    """
+    Path of the trigger table that belongs to a yaml result file
+    (e.g. trigger_result.yml -> trigger_result.h5)
+    """
+    return f"{os.path.splitext(result_path)[0]}.h5"
+
+
+def _trigger_value(trigger, column):
+    if column == "significance":
+        return trigger["significances"]
+
+    if column in ["interval_start", "interval_stop"]:
+        return trigger["interval"][column.replace("interval_", "")]
+
+    value = trigger.get(column)
+
+    if value is None:
+        return np.nan
+
+    return value
+
+
+def trigger_columns(trigger_information):
+    """
+    Convert the triggers of a result dictionary (as in trigger_result.yml)
+    to columns with one row per trigger
+    :param trigger_information: result dictionary of the transient search
+        or the localization
+    :returns: dictionary with the column arrays
+    """
+    triggers = list(trigger_information["triggers"].values())
+
+    columns = {}
+
+    for column in _string_columns:
+        columns[column] = np.array(
+            [str(trigger[column]) for trigger in triggers], dtype=str
+        )
+
+    for column in _float_columns:
+        columns[column] = np.array(
+            [_trigger_value(trigger, column) for trigger in triggers], dtype=float
+        )
+
+    # Significances in all detectors, NaN for the detectors that are not searched
+    detector_significances = np.full((len(triggers), len(valid_det_names)), np.nan)
+
+    for i, trigger in enumerate(triggers):
+
+        for det, sig in trigger.get("detector_significances", {}).items():
+            detector_significances[i, valid_det_names.index(det)] = sig
+
+    columns["detector_significances"] = detector_significances
+
+    return columns
+
+
+def save_trigger_table(output_path, trigger_information):
+    """
+    Save the triggers of a result dictionary as columns in a hdf5 file.
+    The table is written to a temporary file that replaces the output,
+    so there is never a partly written table. Write it before the yaml
+    result, which marks the task as complete.
+    :param output_path: path of the hdf5 file
+    :param trigger_information: result dictionary of the transient search
+        or the localization
+    """
+    columns = trigger_columns(trigger_information)
+
+    tmp_file = f"{output_path}.tmp"
+
+    try:
+        with h5py.File(tmp_file, "w") as f:
+
+            f.attrs["dates"] = np.array(trigger_information["dates"], dtype="S")
+            f.attrs["data_type"] = trigger_information["data_type"]
+            f.attrs["detectors"] = np.array(trigger_information["detectors"], dtype="S")
+            f.attrs["echans"] = trigger_information["echans"]
+
+            for column, values in columns.items():
+
+                if values.dtype.kind == "U":
+                    values = values.astype("S")
+
+                f.create_dataset(column, data=values)
+
+            f["detector_significances"].attrs["detectors"] = np.array(
+                valid_det_names, dtype="S"
+            )
+
+        os.replace(tmp_file, output_path)
+
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def load_trigger_table(table_path):
+    """
+    Load the columns of a trigger table
+    :param table_path: path of the hdf5 file
+    :returns: dictionary with the column arrays
+    """
+    columns = {}
+
+    with h5py.File(table_path, "r") as f:
+
+        for column in f.keys():
+            values = f[column][()]
+
+            if values.dtype.kind == "S":
+                values = values.astype(str)
+
+            columns[column] = values
+
+        columns["data_type"] = np.full(
+            len(columns["trigger_name"]), str(f.attrs["data_type"])
+        )
+
+    return columns
+
+
+def load_trigger_tables(table_paths):
+    """
+    Load and concatenate the trigger tables of many days,
+    missing tables are skipped
+    :param table_paths: list of the paths of the hdf5 files
+    :returns: dictionary with the column arrays of all triggers
+    """
+    tables = [load_trigger_table(path) for path in table_paths if os.path.exists(path)]
+
+    if len(tables) == 0:
+        return {}
+
+    return {
+        column: np.concatenate([table[column] for table in tables])
+        for column in tables[0].keys()
+    }
@@ -0,0 +1,83 @@
+import numpy as np
+from gbm_transient_search.utils.significance import li_and_ma_gaussian_background
+
+
+class WindowSearch(object):
+    """
+    Blind search for excesses with sliding windows of fixed durations.
+    For every duration the significance of the window starting at every
+    bin is calculated from the prefix sums of the IntervalStatistics, for
+    all detectors at once. The cost is O(T x n_durations) independent of the
+    data, and the durations are independent of each other.
+    The windows do not span over the SAA passages.
+    """
+
+    def __init__(self, interval_stats, valid_slices, bin_width):
+        """
+        :param interval_stats: IntervalStatistics of the combined counts (time, detector)
+        :param valid_slices: [start, stop) of the segments between the SAA passages
+        :param bin_width: width of the time bins, to convert the durations to bins
+        """
+        self._interval_stats = interval_stats
+        self._valid_slices = np.asarray(valid_slices, dtype=int).reshape((-1, 2))
+        self._bin_width = bin_width
+
+    def window_bins(self, durations):
+        """
+        Number of bins of the windows, durations shorter than a bin are one bin
+        :param durations: durations of the windows in seconds
+        :returns: sorted unique numbers of bins
+        """
+        n_bins = np.round(np.asarray(durations, dtype=float) / self._bin_width)
+
+        return np.unique(np.maximum(n_bins, 1).astype(int))
+
+    def windows(self, n_bins):
+        """
+        Start and stop of all windows with n_bins bins inside the segments
+        :param n_bins: number of bins of the windows
+        :returns: array of shape (n_windows, 2) with the half-open [start, stop)
+        """
+        starts = np.concatenate(
+            [np.arange(start, stop - n_bins + 1) for start, stop in self._valid_slices]
+            + [np.empty(0, dtype=int)]
+        ).astype(int)
+
+        return np.column_stack([starts, starts + n_bins])
+
+    def significances(self, windows):
+        """
+        Significances of the windows for all detectors
+        """
+        counts, bkg_counts, bkg_var = self._interval_stats.interval_sums(
+            windows[:, 0], windows[:, 1]
+        )
+
+        return li_and_ma_gaussian_background(counts, bkg_counts, np.sqrt(bkg_var))
+
+    def search(self, durations, min_significance=-np.inf):
+        """
+        Calculate the significances of the windows of all durations
+        :param durations: durations of the windows in seconds
+        :param min_significance: only keep the windows with at least one detector
+            above this significance, limits the memory for short bins
+        :returns: windows of shape (n, 2) and their significances of shape (n, n_det)
+        """
+        # Start with no windows, so that no durations give empty arrays
+        no_windows = np.empty((0, 2), dtype=int)
+
+        intervals = [no_windows]
+        significances = [self.significances(no_windows)]
+
+        for n_bins in self.window_bins(durations):
+            windows = self.windows(n_bins)
+            window_significances = self.significances(windows)
+
+            keep = (
+                np.max(window_significances, axis=1, initial=-np.inf) > min_significance
+            )
+
+            intervals.append(windows[keep])
+            significances.append(window_significances[keep])
+
+        return np.concatenate(intervals), np.concatenate(significances)
@@ -0,0 +1,91 @@
+import h5py
+import numpy as np
+import pytest
+
+from gbm_transient_search.processors.transient_detector import valid_det_names
+
+
+def synthetic_day(
+    n_bins=6000,
+    gaps=((1500, 1700), (4000, 4300)),
+    burst_bin=2500,
+    seed=1,
+    t0=600000000.0,
+):
+    """
+    Simulated day of 1 s bins with data gaps (SAA passages), a slowly varying
+    background and a burst in the first four detectors
+    """
+    rng = np.random.default_rng(seed)
+
+    keep = np.ones(n_bins, dtype=bool)
+
+    for start, stop in gaps:
+        keep[start:stop] = False
+
+    starts = t0 + np.flatnonzero(keep).astype(float)
+    time_bins = np.column_stack([starts, starts + 1])
+
+    t = np.arange(len(time_bins))
+
+    bkg_counts = (
+        20
+        + 5 * np.sin(t / 600.0)[:, np.newaxis, np.newaxis]
+        + rng.uniform(0, 10, (1, len(valid_det_names), 8))
+    )
+
+    source = np.zeros_like(bkg_counts)
+
+    if burst_bin is not None:
+        profile = np.exp(-0.5 * ((t - burst_bin) / 15.0) ** 2)
+        source[:, :4, :3] = profile[:, np.newaxis, np.newaxis] * np.array(
+            [30, 20, 15, 10]
+        ).reshape((1, 4, 1))
+
+    return dict(
+        dates=np.array(["210101"]),
+        detectors=np.array(valid_det_names),
+        echans=np.array([str(echan) for echan in range(8)]),
+        data_type="ctime",
+        time_bins=time_bins,
+        saa_mask=np.ones(len(time_bins), dtype=bool),
+        observed_counts=rng.poisson(bkg_counts + source).astype(float),
+        bkg_counts=bkg_counts,
+        bkg_stat_err=0.05 * np.sqrt(bkg_counts),
+    )
+
+
+def write_result_file(path, day):
+    """
+    Write a simulated day in the format of the background fit result files
+    """
+    with h5py.File(path, "w") as f:
+        f.attrs["dates"] = day["dates"].tolist()
+        f.attrs["trigger"] = "None"
+        f.attrs["trigger_time"] = 0.0
+        f.attrs["data_type"] = day["data_type"]
+        f.attrs["echans"] = day["echans"].tolist()
+        f.attrs["detectors"] = day["detectors"].tolist()
+
+        f.create_dataset("time_bins", data=day["time_bins"])
+        f.create_dataset("saa_mask", data=day["saa_mask"])
+        f.create_dataset("observed_counts", data=day["observed_counts"])
+        f.create_dataset("model_counts", data=day["bkg_counts"])
+        f.create_dataset("stat_err", data=day["bkg_stat_err"])
+
+    return str(path)
+
+
+@pytest.fixture
+def day():
+    return synthetic_day()
+
+
+@pytest.fixture
+def make_day():
+    return synthetic_day
+
+
+@pytest.fixture
+def result_file(tmp_path, day):
+    return write_result_file(tmp_path / "fit_result.hdf5", day)
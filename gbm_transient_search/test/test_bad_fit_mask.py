@@ -0,0 +1,97 @@
+import numpy as np
+
+from conftest import write_result_file
+from gbm_transient_search.processors.transient_detector import (
+    TransientDetector,
+    valid_det_names,
+)
+from gbm_transient_search.utils.significance import li_and_ma_gaussian_background
+
+
+# Loops over the detectors and echans of the detector before the vectorization,
+# with the Li & Ma significance of threeML replaced by the equivalent function
+def old_good_bkg_fit_mask(
+    observed_counts,
+    model_counts,
+    stat_err,
+    detectors,
+    echans,
+    max_med_sig=60,
+    max_neg_med_sig=-30,
+    max_neg_sig=-100,
+    n_parts=20,
+):
+    good_bkg_fit_mask = np.zeros((14, 8), dtype=bool)
+
+    part_idx = np.linspace(0, observed_counts.shape[0], n_parts, dtype=int)
+
+    for det in detectors:
+
+        det_idx = valid_det_names.index(det)
+
+        for e in echans:
+
+            sig_total = li_and_ma_gaussian_background(
+                observed_counts[:, det_idx, e].sum(),
+                model_counts[:, det_idx, e].sum(),
+                np.sum(stat_err[:, det_idx, e] ** 2),
+            )
+
+            sigs = []
+            counts = np.empty(n_parts - 1)
+            bkg_counts = np.empty(n_parts - 1)
+            bkg_errs = np.empty(n_parts - 1)
+
+            for i, (a, b) in enumerate(zip(part_idx[:-1], part_idx[1:])):
+
+                counts[i] = observed_counts[a:b, det_idx, e].sum()
+                bkg_counts[i] = model_counts[a:b, det_idx, e].sum()
+                bkg_errs[i] = np.sqrt(np.sum(stat_err[a:b, det_idx, e] ** 2))
+
+            sigs.extend(li_and_ma_gaussian_background(counts, bkg_counts, bkg_errs))
+
+            median_sig = np.median(sigs)
+
+            good = True
+            if sig_total <= max_neg_sig or median_sig <= max_neg_med_sig:
+                good = False
+            if median_sig >= max_med_sig:
+                good = False
+
+            if good:
+                good_bkg_fit_mask[det_idx, e] = True
+
+    return good_bkg_fit_mask
+
+
+def test_bad_fit_mask_matches_loops(day, tmp_path):
+    # Strongly underfitted background in n2 echan 1 and overfitted one in n6 echan 4
+    day["bkg_counts"][:, 2, 1] *= 0.1
+    day["bkg_counts"][:, 6, 4] *= 3
+
+    # n5 and the echans 0 and 7 are not searched
+    day["detectors"] = np.array([det for det in valid_det_names if det != "n5"])
+    day["echans"] = np.array([str(echan) for echan in range(1, 7)])
+
+    result_file = write_result_file(tmp_path / "fit_result.hdf5", day)
+
+    expected = old_good_bkg_fit_mask(
+        day["observed_counts"],
+        day["bkg_counts"],
+        day["bkg_stat_err"],
+        day["detectors"],
+        range(1, 7),
+        max_med_sig=100,
+    )
+
+    assert not expected[2, 1]
+    assert not expected[6, 4]
+    assert np.sum(expected) == (len(valid_det_names) - 1) * 6 - 2
+
+    for low_memory in [False, True]:
+        detector = TransientDetector(
+            min_bin_width=5, bad_fit_threshold=100, low_memory=low_memory
+        )
+        detector.load_result(result_file)
+
+        assert np.array_equal(detector._good_bkg_fit_mask, expected)
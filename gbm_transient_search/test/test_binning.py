@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from gbm_transient_search.utils.binning import TimeRebinner
+
+# Bin by bin loop of the gbmbkgpy Rebinner, as used before the TimeRebinner
+
+
+def loop_rebin(time_bins, min_bin_width, mask, *arrays):
+    starts, stops, saa_mask = [], [], []
+
+    n = 0
+    bin_open = False
+
+    for index, b in enumerate(time_bins):
+        if not mask[index]:
+            if bin_open:
+                stops.append(index)
+                saa_mask.append(True)
+                bin_open = False
+
+            starts.append(index)
+            stops.append(index + 1)
+            saa_mask.append(False)
+            continue
+
+        if not bin_open:
+            bin_open = True
+            starts.append(index)
+            n = 0
+
+        n += b[1] - b[0]
+
+        if n >= min_bin_width:
+            stops.append(index + 1)
+            saa_mask.append(True)
+            bin_open = False
+
+    if bin_open:
+        stops.append(len(time_bins))
+        saa_mask.append(True)
+
+    rebinned_time_bins = np.array(
+        [[time_bins[a, 0], time_bins[b - 1, 1]] for a, b in zip(starts, stops)]
+    )
+
+    rebinned = [
+        np.array([np.sum(array[a:b], axis=0) for a, b in zip(starts, stops)])
+        for array in arrays
+    ]
+
+    return rebinned_time_bins, np.array(saa_mask), rebinned
+
+
+def random_time_bins(rng, n, uniform):
+    if uniform:
+        widths = np.full(n, rng.choice([0.1, 0.256, 1.0]))
+    else:
+        widths = rng.uniform(0.05, 2, n)
+
+    edges = 600000000.0 + np.cumsum(np.append(0, widths))
+
+    return np.column_stack([edges[:-1], edges[1:]])
+
+
+@pytest.mark.parametrize("uniform", [True, False])
+def test_matches_loop(uniform):
+    rng = np.random.default_rng(11)
+
+    for n in range(1, 120, 7):
+        time_bins = random_time_bins(rng, n, uniform)
+        mask = rng.random(n) < 0.8
+        counts = rng.poisson(5, (n, 3, 2)).astype(np.float32)
+
+        for min_bin_width in [0.5, 1.024, 5.0]:
+            rebinner = TimeRebinner(time_bins, min_bin_width, mask=mask)
+
+            expected_time_bins, expected_mask, (expected_counts,) = loop_rebin(
+                time_bins, min_bin_width, mask, counts
+            )
+
+            assert np.array_equal(rebinner.time_rebinned, expected_time_bins)
+            assert np.array_equal(rebinner.rebinned_saa_mask, expected_mask)
+
+            rebinned_counts = rebinner.rebin(counts)[0]
+
+            assert rebinned_counts.dtype == np.float32
+            assert np.array_equal(rebinned_counts, expected_counts)
+
+
+def test_rebin_errors():
+    rng = np.random.default_rng(12)
+
+    time_bins = random_time_bins(rng, 50, False)
+    errors = rng.random((50, 4))
+
+    rebinner = TimeRebinner(time_bins, 2.0)
+
+    _, _, (expected,) = loop_rebin(time_bins, 2.0, np.ones(50, bool), errors ** 2)
+
+    assert np.allclose(rebinner.rebin_errors(errors)[0], np.sqrt(expected))
+
+    with pytest.raises(ValueError):
+        rebinner.rebin(errors[:10])
@@ -0,0 +1,116 @@
+import h5py
+import numpy as np
+
+from gbm_transient_search.processors.changepoint_cache import ChangepointCache
+from gbm_transient_search.processors.changepoints import ChangepointPool
+from gbm_transient_search.processors.transient_detector import TransientDetector
+
+run_kwargs = dict(
+    model="native_l2",
+    min_significance_brightest=5,
+    min_significance_others=5,
+    min_significant_dets=3,
+    max_significant_dets=8,
+)
+
+
+def run_detector(day, pool, changepoint_cache=None, segment_transform=False):
+    detector = TransientDetector(
+        min_bin_width=5,
+        bad_fit_threshold=100,
+        pool=pool,
+        changepoint_cache=changepoint_cache,
+        segment_transform=segment_transform,
+    )
+    detector.load_data(**day)
+    detector.run(**run_kwargs)
+
+    return detector
+
+
+def same_change_points(detector_a, detector_b):
+    return len(detector_a._change_points_all) == len(
+        detector_b._change_points_all
+    ) and all(
+        np.array_equal(cpts_a, cpts_b)
+        for cpts_a, cpts_b in zip(
+            detector_a._change_points_all, detector_b._change_points_all
+        )
+    )
+
+
+def test_cached_rerun_matches_uncached_run(day, tmp_path):
+    cache = ChangepointCache(str(tmp_path / "changepoint_cache.hdf5"))
+
+    with ChangepointPool(max_workers=2) as pool:
+        run_detector(day, pool, cache)
+
+        cached = run_detector(day, pool, cache)
+        uncached = run_detector(day, pool)
+
+    assert sorted(cached._cached_segments) == [0, 1, 2]
+
+    assert same_change_points(cached, uncached)
+    assert np.array_equal(cached._intervals_all, uncached._intervals_all)
+    assert np.array_equal(cached._significances_all, uncached._significances_all)
+
+
+def test_day_wide_transform_in_cache_key(day, tmp_path):
+    cache = ChangepointCache(str(tmp_path / "changepoint_cache.hdf5"))
+
+    with ChangepointPool(max_workers=2) as pool:
+        first = run_detector(day, pool, cache)
+
+        # A refit of the second segment that keeps the day-wide transform
+        # keeps the other segments
+        day["bkg_counts"][2000:2100] *= 0.99
+
+        second = run_detector(day, pool, cache)
+
+        # A refit that changes the minimum of the cleaned counts of the day
+        # changes the mapped data of all segments
+        day["observed_counts"][2050] -= 200
+
+        third = run_detector(day, pool, cache)
+        uncached = run_detector(day, pool)
+
+    assert np.array_equal(second._transform_stats[2], first._transform_stats[2])
+    assert sorted(second._cached_segments) == [0, 2]
+
+    assert not np.array_equal(third._transform_stats[2], second._transform_stats[2])
+    assert len(third._cached_segments) == 0
+    assert same_change_points(third, uncached)
+
+
+def test_refit_reuses_unchanged_segments(day, tmp_path):
+    cache = ChangepointCache(str(tmp_path / "changepoint_cache.hdf5"))
+
+    with ChangepointPool(max_workers=2) as pool:
+        first = run_detector(day, pool, cache, segment_transform=True)
+
+        n_segments = len(first._valid_slices)
+
+        assert n_segments == 3
+        assert len(first._cached_segments) == 0
+
+        # A refit that changes the background of the second segment only
+        day["bkg_counts"][2000:2100] *= 1.01
+
+        second = run_detector(day, pool, cache, segment_transform=True)
+        uncached = run_detector(day, pool, segment_transform=True)
+
+    assert sorted(second._cached_segments) == [0, 2]
+
+    assert np.array_equal(second._intervals_all, uncached._intervals_all)
+    # The prefix sums run over the whole day, so the significances of a
+    # recalculation only agree within the rounding
+    assert np.allclose(
+        second._significances_all, uncached._significances_all, rtol=1e-10, atol=0
+    )
+    assert list(second.trigger_information["triggers"]) == list(
+        uncached.trigger_information["triggers"]
+    )
+
+    # The entry of the old second segment is removed
+    with h5py.File(cache.cache_file, "r") as f:
+        assert sorted(f["bin_width_5"].keys()) == sorted(second._segment_keys)
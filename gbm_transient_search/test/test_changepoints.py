@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from gbm_transient_search.processors.changepoints import (
+    IncrementalPelt,
+    coarse_to_fine_pelt,
+    pelt,
+)
+from gbm_transient_search.processors.transient_detector import fuse_changepoints
+
+rpt = pytest.importorskip("ruptures")
+
+
+def piecewise_signal(rng, n, n_bkps=5):
+    levels = rng.uniform(0, 10, n_bkps + 1)
+    bkps = np.sort(rng.choice(n, n_bkps, replace=False))
+
+    return levels[np.searchsorted(bkps, np.arange(n))]
+
+
+@pytest.mark.parametrize("min_size, jump", [(1, 1), (2, 1), (1, 3), (3, 2)])
+def test_native_l2_matches_ruptures(min_size, jump):
+    rng = np.random.default_rng(42)
+
+    for n in [20, 150, 500]:
+        signal = piecewise_signal(rng, n) + rng.normal(0, 1, n)
+        penalty = 2 * np.log(n)
+
+        expected = (
+            rpt.Pelt(model="l2", min_size=min_size, jump=jump)
+            .fit(signal)
+            .predict(pen=penalty)
+        )
+
+        assert (
+            pelt(signal, pen=penalty, model="native_l2", min_size=min_size, jump=jump)
+            == expected
+        )
+
+
+def test_native_poisson_finds_rate_change():
+    rng = np.random.default_rng(1)
+
+    signal = np.concatenate([rng.poisson(5, 300), rng.poisson(20, 200)]).astype(float)
+
+    bkps = pelt(signal, pen=2 * np.log(len(signal)), model="native_poisson")
+
+    assert bkps[-1] == len(signal)
+    assert np.min(np.abs(np.array(bkps[:-1]) - 300)) <= 5
+
+
+def test_native_poisson_rejects_negative_signal():
+    with pytest.raises(ValueError):
+        pelt(np.array([1.0, -1.0, 2.0]), pen=1, model="native_poisson")
+
+
+@pytest.mark.parametrize("model", ["native_l2", "native_poisson"])
+def test_incremental_pelt_matches_batch(model):
+    rng = np.random.default_rng(7)
+
+    signal = rng.poisson(piecewise_signal(rng, 600) + 1).astype(float)
+    penalty = 2 * np.log(2000)
+
+    incremental = IncrementalPelt(penalty, model=model, min_size=2, jump=3)
+
+    n_samples = 0
+
+    for chunk in np.array_split(signal, 17):
+        n_samples += len(chunk)
+
+        assert incremental.update(chunk) == pelt(
+            signal[:n_samples], pen=penalty, model=model, min_size=2, jump=3
+        )
+
+
+@pytest.mark.parametrize("factor", [1, 4, 8])
+def test_coarse_to_fine_finds_steps(factor):
+    rng = np.random.default_rng(7)
+
+    # Long steps, the refinement has to find the exact positions
+    levels = np.array([0.0, 5.0, 1.0, 8.0, 3.0])
+    bkps = [113, 402, 651, 1000]
+    signal = np.repeat(levels, np.diff([0] + bkps + [1300])) + rng.normal(0, 1, 1300)
+
+    penalty = 2 * np.log(len(signal))
+
+    cpts = coarse_to_fine_pelt(signal, penalty, factor, min_size=1, jump=1)
+
+    assert cpts == pelt(signal, pen=penalty, model="native_l2", min_size=1, jump=1)
+    assert cpts == bkps + [1300]
+
+
+def old_fuse_changepoints(angle_cpts, distance_cpts, min_separation):
+    # Loop that was used before fuse_changepoints, without the sorting
+    change_points = list(angle_cpts)
+
+    for cpt in distance_cpts:
+        if np.abs(np.asarray(angle_cpts) - cpt).min() > min_separation:
+            change_points.append(cpt)
+
+    return change_points
+
+
+def test_fuse_changepoints():
+    # Without angle change points all distance change points are kept
+    assert np.array_equal(fuse_changepoints([], [30, 10, 10], 5), [10, 30])
+    assert fuse_changepoints([], [], 5).size == 0
+
+    # A distance change point exactly min_separation away is a duplicate
+    assert np.array_equal(fuse_changepoints([20, 50], [15, 25, 56], 5), [20, 50, 56])
+    assert np.array_equal(fuse_changepoints([20, 50], [14, 44], 5), [14, 20, 44, 50])
+
+    # Unsorted distance change points give a sorted result
+    assert np.array_equal(
+        fuse_changepoints([20, 50], [90, 0, 35, 48], 5), [0, 20, 35, 50, 90]
+    )
+
+    rng = np.random.default_rng(3)
+
+    for _ in range(50):
+        angle_cpts = np.sort(rng.choice(500, rng.integers(1, 20), replace=False))
+        distance_cpts = rng.choice(500, rng.integers(0, 20), replace=False)
+
+        assert np.array_equal(
+            fuse_changepoints(angle_cpts, distance_cpts, 5),
+            np.sort(old_fuse_changepoints(angle_cpts, distance_cpts, 5)),
+        )
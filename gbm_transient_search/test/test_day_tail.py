@@ -0,0 +1,124 @@
+import h5py
+import numpy as np
+
+from conftest import write_result_file
+from gbm_transient_search.processors.day_tail import (
+    DayTailBuffer,
+    remove_known_triggers,
+)
+from gbm_transient_search.processors.multi_resolution import MultiResolutionSearch
+from gbm_transient_search.processors.transient_detector import TransientDetector
+
+
+def write_day(path, start):
+    time_bins = start + np.column_stack([np.arange(0, 1000), np.arange(1, 1001)])
+
+    with h5py.File(path, "w") as f:
+        f.attrs["detectors"] = ["n0", "n1"]
+        f.attrs["echans"] = ["2", "3"]
+        f["time_bins"] = time_bins
+        f["saa_mask"] = np.ones(len(time_bins), dtype=bool)
+
+        for name in ["observed_counts", "model_counts", "stat_err"]:
+            f[name] = np.ones((len(time_bins), 2, 2))
+
+
+def test_day_tail_buffer(tmp_path):
+    paths = [str(tmp_path / f"day_{i}.h5") for i in range(3)]
+
+    for i, path in enumerate(paths):
+        write_day(path, 1000 * i)
+
+    buffer = DayTailBuffer(tail_length=100, max_days=2)
+
+    tail = buffer.tail(paths[0])
+
+    assert tail["time_bins"][0, 0] == 900
+    assert tail["time_bins"][-1, 1] == 1000
+    assert tail["observed_counts"].shape == (100, 2, 2)
+    assert tail["detectors"] == ["n0", "n1"]
+
+    # Cached tails are not read again
+    assert buffer.tail(paths[0]) is tail
+
+    buffer.tail(paths[1])
+    buffer.tail(paths[2])
+
+    assert buffer.tail(paths[0]) is not tail
+
+
+def test_remove_known_triggers():
+    def result(*intervals):
+        return {
+            "triggers": {
+                f"GRT{i}": {"interval": {"start": start, "stop": stop}}
+                for i, (start, stop) in enumerate(intervals)
+            }
+        }
+
+    trigger_information = result((90, 120), (130, 140), (300, 310))
+
+    removed = remove_known_triggers(trigger_information, result((80, 100), (200, 210)))
+
+    assert removed == ["GRT0"]
+    assert list(trigger_information["triggers"]) == ["GRT1", "GRT2"]
+    assert remove_known_triggers(trigger_information, result()) == []
+
+
+def test_no_triggers_in_previous_tail(day, tmp_path):
+    # Split the day during the burst, the second part is the next day
+    split = 2510
+
+    paths = []
+
+    for i, part in enumerate([slice(None, split), slice(split, None)]):
+        part_day = dict(day)
+
+        for name in [
+            "time_bins",
+            "saa_mask",
+            "observed_counts",
+            "bkg_counts",
+            "bkg_stat_err",
+        ]:
+            part_day[name] = day[name][part]
+
+        paths.append(write_result_file(tmp_path / f"day_{i}.hdf5", part_day))
+
+    day_start = day["time_bins"][split, 0]
+
+    run_kwargs = dict(
+        model="native_l2",
+        min_significance_brightest=5,
+        min_significance_others=5,
+        min_significant_dets=3,
+        max_significant_dets=8,
+    )
+
+    previous = TransientDetector(paths[0], min_bin_width=5, bad_fit_threshold=100)
+    previous.run(**run_kwargs)
+
+    assert len(previous.trigger_information["triggers"]) == 1
+
+    tail = DayTailBuffer(tail_length=600).tail(paths[0])
+
+    for search in [
+        TransientDetector(min_bin_width=5, bad_fit_threshold=100),
+        MultiResolutionSearch(bin_widths=[5, 20], bad_fit_threshold=100),
+    ]:
+        search.load_result(paths[1], previous_tail=tail)
+        search.run(**run_kwargs)
+
+        detector = (
+            search if isinstance(search, TransientDetector) else search._levels[1]
+        )
+
+        # The burst is significant in the tail, but left to the previous day
+        in_day = detector._starts_in_day(detector._intervals_all)
+
+        assert np.any(np.max(detector._significances_all[~in_day], axis=1) > 5)
+
+        for trigger in search.trigger_information["triggers"].values():
+            assert trigger["trigger_time"] >= day_start
+
+        search.close()
@@ -0,0 +1,25 @@
+import numpy as np
+
+from gbm_transient_search.processors.interval_statistics import IntervalStatistics
+
+
+def test_peak_indices_match_argmax():
+    rng = np.random.default_rng(2)
+
+    # Integer counts to have ties between the bins
+    counts = rng.poisson(5, (300, 4)).astype(float)
+    bkg_counts = np.full_like(counts, 5.0)
+
+    stats = IntervalStatistics(counts, bkg_counts, np.sqrt(bkg_counts))
+
+    starts = rng.integers(0, 290, 200)
+    stops = starts + rng.integers(1, 10, 200)
+    columns = rng.integers(0, 4, 200)
+
+    expected = [
+        np.argmax(counts[a:b, col] - bkg_counts[a:b, col]) + a
+        for a, b, col in zip(starts, stops, columns)
+    ]
+
+    assert stats.peak_indices(starts, stops, columns).tolist() == expected
+    assert len(stats.peak_indices([], [], [])) == 0
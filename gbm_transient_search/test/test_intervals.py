@@ -0,0 +1,175 @@
+import numpy as np
+
+from gbm_transient_search.utils.intervals import (
+    compressed_runs,
+    index_runs,
+    mask_runs,
+    merge_segments,
+)
+
+# Loop implementations that were used before the interval module, only valid
+# for sorted segments without nested segments and masks with at least one True
+
+
+def old_slice_disjoint(arr):
+    arr = (arr).nonzero()[0]
+
+    slices = []
+    start_slice = arr[0]
+    counter = 0
+    for i in range(len(arr) - 1):
+        if arr[i + 1] > arr[i] + 1:
+            end_slice = arr[i]
+            slices.append([start_slice, end_slice])
+            start_slice = arr[i + 1]
+            counter += 1
+    if counter == 0:
+        return [[arr[0], arr[-1]]]
+    if end_slice != arr[-1]:
+        slices.append([start_slice, arr[-1]])
+    return slices
+
+
+def old_slice_disjoint_idx(arr):
+    slices = []
+    start_slice = arr[0]
+    counter = 0
+    for i in range(len(arr) - 1):
+        if arr[i + 1] > arr[i] + 1:
+            end_slice = arr[i]
+            slices.append([start_slice, end_slice])
+            start_slice = arr[i + 1]
+            counter += 1
+    if counter == 0:
+        return [[arr[0], arr[-1]]]
+    if end_slice != arr[-1]:
+        slices.append([start_slice, arr[-1]])
+    return slices
+
+
+def old_segment_disjoint(arr):
+    arr = np.sort(arr)
+    slices = []
+    start_slice = arr[0][0]
+    counter = 0
+    for i in range(len(arr) - 1):
+        if arr[i + 1][0] > arr[i][1]:
+            end_slice = arr[i][1]
+            slices.append([start_slice, end_slice])
+            start_slice = arr[i + 1][0]
+            counter += 1
+    if counter == 0:
+        return arr
+    if end_slice != arr[-1][1]:
+        slices.append([start_slice, arr[-1][1]])
+    return slices
+
+
+def old_segment_disjoint_idx(arr):
+    arr = np.sort(arr)
+    slices = []
+    start_idx = 0
+    counter = 0
+    for i in range(len(arr) - 1):
+        if arr[i + 1][0] > arr[i][1]:
+            end_idx = i + 1
+            slices.append([start_idx, end_idx])
+            start_idx = i + 1
+            counter += 1
+    if counter == 0:
+        return [[0, len(arr)]]
+    if end_idx != len(arr):
+        slices.append([start_idx, len(arr)])
+    return slices
+
+
+def random_mask(rng, n):
+    return np.repeat(rng.random(n) < 0.6, rng.integers(1, 5, n))
+
+
+def random_segments(rng, n):
+    """
+    Sorted segments without nesting, with at least two separate groups
+    """
+    starts = np.cumsum(rng.integers(0, 4, n))
+    stops = np.maximum.accumulate(starts + rng.integers(0, 6, n))
+
+    return np.column_stack([starts, stops])
+
+
+def test_mask_runs_matches_loop():
+    rng = np.random.default_rng(3)
+
+    for n in range(1, 60):
+        mask = random_mask(rng, n)
+
+        if not mask.any():
+            continue
+
+        runs = mask_runs(mask)
+        runs[:, 1] -= 1
+
+        assert runs.tolist() == np.array(old_slice_disjoint(mask)).tolist()
+
+
+def test_index_runs_matches_loop():
+    rng = np.random.default_rng(4)
+
+    for n in range(1, 60):
+        idx = np.flatnonzero(random_mask(rng, n))
+
+        if len(idx) == 0:
+            continue
+
+        assert (
+            index_runs(idx).tolist() == np.array(old_slice_disjoint_idx(idx)).tolist()
+        )
+
+
+def test_merge_segments_matches_loop():
+    rng = np.random.default_rng(5)
+
+    for n in range(2, 60):
+        segments = random_segments(rng, n)
+
+        expected_idx = old_segment_disjoint_idx(segments)
+
+        if len(expected_idx) == 1:
+            # The loop returns the unmerged input for a single group
+            continue
+
+        merged, groups = merge_segments(segments)
+
+        assert merged.tolist() == np.array(old_segment_disjoint(segments)).tolist()
+
+        for i, (start, stop) in enumerate(expected_idx):
+            assert np.all(groups[start:stop] == i)
+
+
+def test_merge_segments_edge_cases():
+    merged, groups = merge_segments([[0, 3], [2, 5], [4, 6]])
+    assert merged.tolist() == [[0, 6]]
+    assert groups.tolist() == [0, 0, 0]
+
+    # Unsorted and nested segments
+    merged, groups = merge_segments([[10, 12], [0, 8], [2, 3], [5, 9]])
+    assert merged.tolist() == [[0, 9], [10, 12]]
+    assert groups.tolist() == [1, 0, 0, 0]
+
+    merged, groups = merge_segments(np.empty((0, 2), dtype=int))
+    assert merged.shape == (0, 2)
+    assert len(groups) == 0
+
+
+def test_compressed_runs():
+    rng = np.random.default_rng(6)
+
+    for n in range(0, 60):
+        mask = random_mask(rng, n)
+        values = np.arange(len(mask))
+
+        runs = compressed_runs(mask)
+
+        assert [values[mask][start:stop].tolist() for start, stop in runs] == [
+            values[start:stop].tolist() for start, stop in mask_runs(mask)
+        ]
@@ -0,0 +1,43 @@
+import numpy as np
+
+from gbm_transient_search.processors.changepoints import ChangepointPool
+from gbm_transient_search.processors.transient_detector import TransientDetector
+
+run_kwargs = dict(
+    model="native_l2",
+    min_significance_brightest=5,
+    min_significance_others=5,
+    min_significant_dets=3,
+    max_significant_dets=8,
+)
+
+
+def test_low_memory_matches_default_mode(result_file):
+    detectors = {}
+
+    with ChangepointPool(max_workers=2) as pool:
+
+        for low_memory in [False, True]:
+            detector = TransientDetector(
+                min_bin_width=5,
+                bad_fit_threshold=100,
+                pool=pool,
+                low_memory=low_memory,
+            )
+            detector.load_result(result_file)
+            detector.run(**run_kwargs)
+
+            detectors[low_memory] = detector
+
+    default, low_memory = detectors[False], detectors[True]
+
+    # The data is read as float32, so the significances only agree within
+    # its precision (about 1e-5 sigma on this day)
+    assert np.array_equal(low_memory._intervals_all, default._intervals_all)
+    assert np.allclose(
+        low_memory._significances_all, default._significances_all, rtol=0, atol=1e-4
+    )
+    assert list(low_memory.trigger_information["triggers"]) == list(
+        default.trigger_information["triggers"]
+    )
+    assert len(default.trigger_information["triggers"]) == 1
@@ -0,0 +1,98 @@
+import numpy as np
+
+from gbm_transient_search.processors.mapping import (
+    angle_distance_mapping,
+    angle_mapping,
+    distance_mapping,
+)
+
+
+# Per time bin mappings of the detector before the vectorization
+def old_distance_mapping(x, ref_vector=None):
+    if ref_vector is None:
+        ref_vector = np.repeat(1, x.shape[1])
+
+    distance = np.sqrt(np.sum((x - ref_vector) ** 2, axis=1))
+
+    return distance
+
+
+def old_angle(x, ref_vector):
+    dot_prod = np.dot(x, ref_vector)
+
+    norm1 = np.sqrt(np.sum(x ** 2))
+    norm2 = np.sqrt(np.sum(ref_vector ** 2))
+
+    if abs(dot_prod / (norm1 * norm2)) > 1:
+        return 0
+
+    else:
+        return np.arccos(dot_prod / (norm1 * norm2))
+
+
+def old_angle_mapping(x, ref_vector=None):
+    if ref_vector is None:
+        ref_vector = np.repeat(1, x.shape[1])
+
+    x_ang = np.apply_along_axis(old_angle, axis=1, arr=x, ref_vector=ref_vector)
+
+    return (x_ang / np.pi) * 360
+
+
+def test_single_reference_matches_old_mapping():
+    rng = np.random.default_rng(3)
+
+    x = rng.normal(0, 5, (500, 12))
+
+    for ref_vector in [None, rng.normal(0, 5, 12)]:
+        angles, distances = angle_distance_mapping(x, ref_vector)
+
+        # A single reference vector gives one value per time bin
+        assert angles.shape == distances.shape == (500,)
+
+        assert np.allclose(angles, old_angle_mapping(x, ref_vector))
+        assert np.allclose(distances, old_distance_mapping(x, ref_vector))
+
+        assert np.array_equal(angle_mapping(x, ref_vector), angles)
+        assert np.array_equal(distance_mapping(x, ref_vector), distances)
+
+
+def test_reference_stack_matches_old_mapping():
+    rng = np.random.default_rng(4)
+
+    x = rng.normal(0, 5, (500, 12))
+    ref_vectors = rng.normal(0, 5, (3, 12))
+
+    angles, distances = angle_distance_mapping(x, ref_vectors)
+
+    # One column per reference vector, also for a stack of one vector
+    assert angles.shape == distances.shape == (500, 3)
+    assert angle_distance_mapping(x, ref_vectors[:1])[0].shape == (500, 1)
+
+    for i, ref_vector in enumerate(ref_vectors):
+        assert np.allclose(angles[:, i], old_angle_mapping(x, ref_vector))
+        assert np.allclose(distances[:, i], old_distance_mapping(x, ref_vector))
+
+
+def test_angle_clipping():
+    rng = np.random.default_rng(5)
+
+    ref_vector = rng.uniform(1, 5, 5)
+
+    # Parallel vectors, the rounding of some of the cosines is above 1
+    x = np.outer(rng.uniform(0.1, 10, 200), ref_vector)
+
+    cos_angle = x.dot(ref_vector) / (
+        np.linalg.norm(x, axis=1) * np.linalg.norm(ref_vector)
+    )
+    assert np.any(cos_angle > 1)
+
+    angles = angle_mapping(x, ref_vector)
+
+    assert not np.any(np.isnan(angles))
+    assert np.allclose(angles, old_angle_mapping(x, ref_vector), atol=1e-5)
+    assert np.allclose(angles, 0, atol=1e-5)
+
+    # Antiparallel vectors are clipped to -1 (the old mapping returned 0
+    # for the cosines that were rounded below -1)
+    assert np.allclose(angle_mapping(-x, ref_vector), 360)
@@ -0,0 +1,94 @@
+import numpy as np
+
+from gbm_transient_search.processors.changepoints import ChangepointPool
+from gbm_transient_search.processors.multi_resolution import MultiResolutionSearch
+from gbm_transient_search.processors.transient_detector import TransientDetector
+
+
+def trigger(name, start, stop, significance):
+    return {
+        "trigger_name": name,
+        "interval": {"start": start, "stop": stop},
+        "significances": significance,
+    }
+
+
+def test_merge_triggers():
+    search = MultiResolutionSearch(bin_widths=[20, 5])
+
+    fine, coarse = search._levels
+
+    fine._trigger_information = {
+        "dates": ["210101"],
+        "triggers": {
+            "A": trigger("A", 100, 150, 8),
+            "B": trigger("B", 500, 520, 6),
+        },
+    }
+    coarse._trigger_information = {
+        "dates": ["210101"],
+        "triggers": {
+            "C": trigger("C", 120, 200, 10),
+            "D": trigger("D", 900, 950, 7),
+        },
+    }
+
+    search._merge_triggers()
+
+    triggers = search.trigger_information["triggers"]
+
+    assert search.trigger_information["bin_widths"] == [5, 20]
+    assert list(triggers) == ["C", "B", "D"]
+    assert triggers["C"]["detected_bin_widths"] == [5, 20]
+    assert triggers["B"]["detected_bin_widths"] == [5]
+    assert triggers["D"]["bin_width"] == 20
+
+    # The triggers of the levels are not changed
+    assert "bin_width" not in coarse.trigger_information["triggers"]["C"]
+
+
+def test_pyramid_matches_direct_rebinning(day, result_file):
+    with ChangepointPool(max_workers=2) as pool:
+        search = MultiResolutionSearch(
+            result_file, bin_widths=[5, 20], bad_fit_threshold=100, pool=pool
+        )
+
+        fine, coarse = search._levels
+
+        direct = TransientDetector(min_bin_width=20, bad_fit_threshold=100, pool=pool)
+        direct.load_data(**day, good_bkg_fit_mask=fine._good_bkg_fit_mask)
+
+        # All levels use the masks of the finest level
+        assert coarse._good_bkg_fit_mask is fine._good_bkg_fit_mask
+        assert np.array_equal(coarse._saa_mask, fine._rebinned_saa_mask)
+
+        assert np.array_equal(coarse._rebinned_time_bins, direct._rebinned_time_bins)
+        assert np.array_equal(coarse._rebinned_saa_mask, direct._rebinned_saa_mask)
+        assert np.array_equal(coarse._valid_slices, direct._valid_slices)
+
+        for name in ["observed_counts", "bkg_counts", "bkg_stat_err"]:
+            assert np.allclose(
+                getattr(coarse, f"_rebinned_{name}"),
+                getattr(direct, f"_rebinned_{name}"),
+            )
+
+        assert np.allclose(coarse._angles, direct._angles)
+
+        kwargs = dict(
+            min_separation=5,
+            model="native_l2",
+            min_significance_brightest=5,
+            min_significance_others=5,
+            min_significant_dets=3,
+            max_significant_dets=8,
+        )
+
+        search.run(**kwargs)
+        direct.run(**kwargs)
+
+    assert np.array_equal(coarse._intervals_all, direct._intervals_all)
+    assert np.allclose(coarse._significances_all, direct._significances_all)
+    assert list(coarse.trigger_information["triggers"]) == list(
+        direct.trigger_information["triggers"]
+    )
+    assert len(search.trigger_information["triggers"]) == 1
@@ -0,0 +1,103 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from conftest import write_result_file
+from gbm_transient_search.processors import transient_detector
+from gbm_transient_search.processors.transient_detector import TransientDetector
+from gbm_transient_search.utils import rebin_cache
+from gbm_transient_search.utils.rebin_cache import RebinCache
+
+
+def load_detector(result_file, cache):
+    detector = TransientDetector(
+        min_bin_width=5, bad_fit_threshold=100, rebin_cache=cache
+    )
+    detector.load_result(result_file)
+
+    return detector
+
+
+def cache_files(cache):
+    return sorted(os.listdir(cache.cache_dir))
+
+
+def test_rebin_cache_hit_and_miss(day, result_file, tmp_path, monkeypatch):
+    cache = RebinCache(str(tmp_path / "cache"))
+
+    first = load_detector(result_file, cache)
+
+    assert len(cache_files(cache)) == 1
+
+    # A hit does not rebin the data
+    with monkeypatch.context() as m:
+        m.setattr(transient_detector, "TimeRebinner", None)
+
+        second = load_detector(result_file, cache)
+
+    assert np.array_equal(second._rebinned_time_bins, first._rebinned_time_bins)
+    assert np.array_equal(
+        second._rebinned_observed_counts, first._rebinned_observed_counts
+    )
+
+    # A new fit of the day is a miss
+    day["observed_counts"] += 1
+    write_result_file(result_file, day)
+
+    os.utime(result_file, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+    third = load_detector(result_file, cache)
+
+    assert len(cache_files(cache)) == 2
+    assert np.array_equal(
+        third._rebinned_observed_counts,
+        load_detector(result_file, None)._rebinned_observed_counts,
+    )
+    assert not np.array_equal(
+        third._rebinned_observed_counts, first._rebinned_observed_counts
+    )
+
+
+def test_rebin_cache_eviction(tmp_path, monkeypatch):
+    cache = RebinCache(str(tmp_path), max_size=2500, tmp_max_age=60)
+
+    keys = [cache.key(5, ("day", i)) for i in range(3)]
+
+    for key in keys:
+        cache.store(key, counts=np.zeros(100))
+
+        # The modification times mark the order of use
+        time.sleep(0.01)
+
+    # Every entry has about 900 bytes, the least recently used one is removed
+    assert cache.load(keys[0]) is None
+    assert cache.load(keys[1]) is not None
+    assert cache.load(keys[2]) is not None
+
+    # A failed write does not leave a temporary file
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(rebin_cache.np, "savez", fail)
+
+        with pytest.raises(OSError):
+            cache.store(keys[0], counts=np.zeros(100))
+
+    assert not any(name.endswith(".tmp") for name in cache_files(cache))
+
+    # Temporary files of writes that were killed are removed once they are old
+    stale = tmp_path / "stale.npz.tmp"
+    running = tmp_path / "running.npz.tmp"
+
+    stale.write_bytes(b"0")
+    running.write_bytes(b"0")
+
+    os.utime(stale, (time.time() - 120, time.time() - 120))
+
+    cache.store(keys[0], counts=np.zeros(100))
+
+    assert not stale.exists()
+    assert running.exists()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from gbm_transient_search.utils.significance import li_and_ma_gaussian_background
+
+
+def random_counts(rng, shape):
+    bkg_counts = rng.uniform(1, 1e5, shape)
+    counts = rng.poisson(bkg_counts * rng.uniform(0.8, 1.5, shape)).astype(float)
+    bkg_err = np.sqrt(bkg_counts) * rng.uniform(0.01, 3, shape)
+
+    return counts, bkg_counts, bkg_err
+
+
+def test_matches_threeml():
+    stats_tools = pytest.importorskip("threeML.utils.statistics.stats_tools")
+
+    rng = np.random.default_rng(1)
+
+    counts, bkg_counts, bkg_err = random_counts(rng, (500, 12))
+
+    expected = np.column_stack(
+        [
+            stats_tools.Significance(
+                counts[:, i], bkg_counts[:, i]
+            ).li_and_ma_equivalent_for_gaussian_background(bkg_err[:, i])
+            for i in range(counts.shape[1])
+        ]
+    )
+
+    sig = li_and_ma_gaussian_background(counts, bkg_counts, bkg_err)
+
+    assert sig.shape == (500, 12)
+    assert np.allclose(sig, expected, rtol=1e-8, atol=1e-8)
+
+
+def test_sign_and_symmetry():
+    sig = li_and_ma_gaussian_background([150, 100, 50], [100, 100, 100], 5)
+
+    assert sig[0] > 0
+    assert sig[1] == 0
+    assert sig[2] < 0
+
+
+def test_limits_are_finite():
+    # Zero counts
+    sig = li_and_ma_gaussian_background([0, 0], [10, 1e6], [1, 1e4])
+    assert np.all(np.isfinite(sig))
+    assert np.all(sig < 0)
+
+    # Background error much larger than the background counts
+    sig = li_and_ma_gaussian_background(1e3, 1e2, 1e8)
+    assert np.isfinite(sig) and sig > 0
+
+    # Known background, the Poisson Li & Ma significance
+    o, b = 130.0, 100.0
+    sig = li_and_ma_gaussian_background(o, b, 0)
+    assert np.isclose(sig, np.sqrt(2 * (o * np.log(o / b) + b - o)))
+
+    # A tiny background error converges to the known background
+    assert np.isclose(li_and_ma_gaussian_background(o, b, 1e-6), sig)
@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+import pytest
+
+from gbm_transient_search.utils.stage_timer import (
+    MemorySampler,
+    StageTimer,
+    current_memory,
+)
+
+pytestmark = pytest.mark.skipif(
+    current_memory() is None, reason="the resident memory can only be read on Linux"
+)
+
+
+def test_stage_memory():
+    timer = StageTimer(sample_interval=0.001, trace_memory=True)
+
+    with timer.stage("allocate", bin_width=5):
+        data = np.ones(50 * 1024 ** 2 // 8)
+        del data
+
+    with timer.stage("keep"):
+        data = np.ones(50 * 1024 ** 2 // 8)
+
+    allocate, keep = timer.stages
+
+    for stage in timer.stages:
+        assert stage["peak_rss_mb"] >= max(stage["rss_start_mb"], stage["rss_end_mb"])
+
+    assert allocate["bin_width"] == 5
+
+    # Memory released within a stage is only seen by the sampler if it was
+    # held for longer than the sample interval, so its peak is checked with
+    # tracemalloc, which records every allocation
+    assert allocate["peak_traced_mb"] > 40
+    assert abs(allocate["rss_delta_mb"]) < 10
+
+    # Memory that stays allocated is in the resident peak of the stage
+    assert keep["rss_delta_mb"] > 40
+    assert keep["peak_rss_mb"] - keep["rss_start_mb"] > 40
+    assert keep["peak_traced_mb"] > 40
+    # The lifetime peak (ru_maxrss) is updated by the kernel with a delay,
+    # so it is only compared within a few MB
+    assert keep["lifetime_peak_rss_mb"] > keep["peak_rss_mb"] - 5
+
+    del data
+
+
+def test_memory_sampler():
+    sampler = MemorySampler(interval=0.001)
+    sampler.start()
+
+    start = current_memory()
+    data = np.ones(50 * 1024 ** 2 // 8)
+
+    # Wait until the sampler has seen the allocated memory
+    deadline = time.time() + 10
+
+    while sampler.peak - start < 40 and time.time() < deadline:
+        time.sleep(0.001)
+
+    del data
+
+    peak = sampler.stop()
+
+    assert peak - start > 40
+    assert peak - current_memory() > 40
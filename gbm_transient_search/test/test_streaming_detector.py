@@ -0,0 +1,67 @@
+import numpy as np
+
+from gbm_transient_search.processors.changepoints import ChangepointPool
+from gbm_transient_search.processors.streaming_detector import (
+    StreamingTransientDetector,
+)
+from gbm_transient_search.processors.transient_detector import TransientDetector
+
+thresholds = dict(
+    min_significance_brightest=5,
+    min_significance_others=5,
+    min_significant_dets=3,
+    max_significant_dets=8,
+)
+
+
+def test_chunks_match_full_day(day):
+    with ChangepointPool(max_workers=2) as pool:
+        batch = TransientDetector(
+            min_bin_width=5, bad_fit_threshold=100, pool=pool, segment_transform=True
+        )
+        batch.load_data(**day)
+        batch.run(min_separation=5, model="native_l2", **thresholds)
+
+    streaming = StreamingTransientDetector(
+        day["dates"],
+        day["detectors"],
+        day["echans"],
+        min_bin_width=5,
+        bad_fit_threshold=100,
+        good_bkg_fit_mask=batch._good_bkg_fit_mask,
+        min_separation=5,
+        model="native_l2",
+        **thresholds,
+    )
+
+    n_bins = len(day["time_bins"])
+    reported = []
+
+    for start in range(0, n_bins, 397):
+        stop = min(start + 397, n_bins)
+
+        new_triggers = streaming.update(
+            day["time_bins"][start:stop],
+            day["observed_counts"][start:stop],
+            day["bkg_counts"][start:stop],
+            day["bkg_stat_err"][start:stop],
+            final=stop == n_bins,
+        )
+
+        reported.extend(new_triggers)
+
+    assert np.array_equal(streaming._rebinned_time_bins, batch._rebinned_time_bins)
+    assert np.array_equal(streaming._valid_slices, batch._valid_slices)
+
+    for cpts, batch_cpts in zip(streaming._change_points_all, batch._change_points_all):
+        assert np.array_equal(cpts, batch_cpts)
+
+    assert np.array_equal(streaming._intervals_all, batch._intervals_all)
+    assert np.allclose(streaming._significances_all, batch._significances_all)
+
+    assert list(streaming.trigger_information["triggers"]) == list(
+        batch.trigger_information["triggers"]
+    )
+
+    # The burst is reported once, although its interval grows with the data
+    assert len(reported) == len(batch.trigger_information["triggers"]) == 1
@@ -0,0 +1,71 @@
+import itertools
+
+from gbm_transient_search.processors.changepoints import ChangepointPool
+from gbm_transient_search.processors.transient_detector import TransientDetector
+
+grid = dict(
+    min_significance_brightest=[3, 6],
+    min_significance_others=[2, 4],
+    min_significant_dets=[1, 3],
+    max_significant_dets=[8],
+)
+
+
+def sweep_summary(triggers):
+    return [(trigger["trigger_time"], trigger["significance"]) for trigger in triggers]
+
+
+def run_summary(detector):
+    # The arrays of the run, the result dictionary merges triggers with the same name
+    return list(
+        zip(detector.trigger_times.tolist(), detector.trigger_significances.tolist())
+    )
+
+
+def test_sweep_matches_runs(day):
+    with ChangepointPool(max_workers=2) as pool:
+        detector = TransientDetector(min_bin_width=5, bad_fit_threshold=100, pool=pool)
+        detector.load_data(**day)
+
+        sweep = detector.threshold_sweep(min_separation=5, model="native_l2", **grid)
+
+        assert len(sweep) == 8
+
+        for result, thresholds in zip(sweep, itertools.product(*grid.values())):
+            thresholds = dict(zip(grid.keys(), thresholds))
+
+            detector.run(min_separation=5, model="native_l2", **thresholds)
+
+            assert {key: result[key] for key in grid} == thresholds
+            assert sweep_summary(result["triggers"]) == run_summary(detector)
+
+
+def test_sweep_after_new_day_and_window_search(day, make_day):
+    other_day = make_day(burst_bin=None, seed=2)
+
+    with ChangepointPool(max_workers=2) as pool:
+        detector = TransientDetector(min_bin_width=5, bad_fit_threshold=100, pool=pool)
+        detector.load_data(**day)
+        detector.run(model="native_l2")
+
+        # The intervals of the previous day are not reused
+        detector.load_data(**other_day)
+        sweep = detector.threshold_sweep(model="native_l2", **grid)
+
+        fresh = TransientDetector(min_bin_width=5, bad_fit_threshold=100, pool=pool)
+        fresh.load_data(**other_day)
+
+        assert sweep == fresh.threshold_sweep(model="native_l2", **grid)
+
+        # The windows cut at a significance of 6 are recalculated for a threshold of 3
+        detector.load_data(**day)
+        detector.run_window_search(min_significance_brightest=6)
+
+        sweep = detector.threshold_sweep(**grid)
+
+        for result in sweep:
+            detector.run_window_search(
+                **{key: result[key] for key in grid},
+            )
+
+            assert sweep_summary(result["triggers"]) == run_summary(detector)
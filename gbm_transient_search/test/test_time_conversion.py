@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from gbm_transient_search.utils.time_conversion import (
+    leap_second_met,
+    met_to_mjd,
+    met_to_time,
+    trigger_names_from_met,
+)
+
+gbmgeometry = pytest.importorskip("gbmgeometry")
+
+
+def test_trigger_names_match_gbm_time():
+    met = np.array([2.3e8, 252460801.0, 3.7e8, 4.6e8, 600016481.0])
+
+    names, dates, utc = trigger_names_from_met(met)
+
+    for i, t0 in enumerate(met):
+        gbm_time = gbmgeometry.GBMTime.from_MET(t0)
+        date_str = gbm_time.time.datetime.strftime("%y%m%d")
+        day_fraction = f"{round(gbm_time.time.mjd % 1, 3):.3f}"[2:]
+
+        assert names[i] == f"GRT{date_str}{day_fraction}"
+        assert dates[i] == date_str
+        assert utc[i] == gbm_time.utc
+        assert met_to_time(t0).fits == gbm_time.time.fits
+
+
+def test_leap_second_table_matches_gbm_time():
+    rng = np.random.default_rng(7)
+
+    # The table is hard coded in GBMTime, so it is compared at the leap seconds,
+    # around them and at random times between 2001 and 2032
+    met = np.concatenate(
+        [
+            leap_second_met,
+            leap_second_met - 0.5,
+            leap_second_met + 0.5,
+            [0.0, 1e9],
+            rng.uniform(0, 1e9, 200),
+        ]
+    )
+
+    expected = [gbmgeometry.GBMTime.from_MET(t0).time.mjd for t0 in met]
+
+    # One second is about 1e-5 days
+    assert np.allclose(met_to_mjd(met), expected, rtol=0, atol=1e-9)
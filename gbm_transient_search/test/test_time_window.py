@@ -0,0 +1,31 @@
+import numpy as np
+
+from gbm_transient_search.utils.time_window import TimeWindowIndex
+
+
+def test_window_matches_mask():
+    rng = np.random.default_rng(8)
+
+    edges = 600000000.0 + np.cumsum(rng.uniform(0.5, 2, 2001))
+    time_bins = np.column_stack([edges[:-1], edges[1:]])
+    saa_mask = np.repeat(rng.random(400) < 0.8, 5)
+
+    counts = rng.poisson(10, (2000, 12, 8)).astype(float)
+
+    mean_time = np.mean(time_bins, axis=1)
+    angles = rng.random(saa_mask.sum())
+
+    index = TimeWindowIndex(time_bins, saa_mask)
+
+    for start in rng.uniform(edges[0] - 100, edges[-1], 50):
+        stop = start + rng.uniform(0, 500)
+
+        time_mask = np.logical_and(
+            mean_time[saa_mask] > start, mean_time[saa_mask] < stop
+        )
+
+        rows = index.rows(start, stop)
+
+        assert np.array_equal(counts[rows, 3, 2], counts[:, 3, 2][saa_mask][time_mask])
+        assert np.array_equal(angles[index.window(start, stop)], angles[time_mask])
+
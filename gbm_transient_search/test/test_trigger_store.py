@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+
+from gbm_transient_search.processors import trigger_store
+from gbm_transient_search.processors.transient_detector import TransientDetector
+from gbm_transient_search.processors.trigger_store import (
+    load_trigger_tables,
+    save_trigger_table,
+    trigger_table_path,
+)
+
+
+def trigger_result(date, n_triggers, localized=False):
+    triggers = {}
+
+    for i in range(n_triggers):
+        trigger = {
+            "date": date,
+            "trigger_name": f"GRT{date}{i:03d}",
+            "trigger_time": 600000000.0 + i,
+            "trigger_time_utc": "2020-01-06 15:14:36.000",
+            "peak_time": 5.0,
+            "significances": 10.0 + i,
+            "interval": {"start": 600000000.0 + i, "stop": 600000010.0 + i},
+            "most_significant_detector": "n1",
+            "detector_significances": {"n0": 1.0, "n1": 10.0 + i},
+        }
+
+        if localized:
+            trigger.update(ra=10.0, ra_err=1.0, dec=-5.0, dec_err=1.0)
+
+        triggers[trigger["trigger_name"]] = trigger
+
+    return {
+        "dates": [date],
+        "data_type": "ctime",
+        "echans": [2, 3, 4, 5],
+        "detectors": ["n0", "n1"],
+        "triggers": triggers,
+    }
+
+
+def test_trigger_tables_round_trip(tmp_path):
+    paths = []
+
+    for date, n_triggers, localized in [
+        ("200106", 2, True),
+        ("200107", 0, False),
+        ("200108", 3, False),
+    ]:
+        path = trigger_table_path(str(tmp_path / f"{date}_trigger_result.yml"))
+        save_trigger_table(path, trigger_result(date, n_triggers, localized))
+        paths.append(path)
+
+    table = load_trigger_tables(paths + [str(tmp_path / "missing.h5")])
+
+    assert table["trigger_name"].tolist() == [
+        "GRT200106000",
+        "GRT200106001",
+        "GRT200108000",
+        "GRT200108001",
+        "GRT200108002",
+    ]
+    assert table["significance"].tolist() == [10.0, 11.0, 10.0, 11.0, 12.0]
+    assert table["interval_stop"][1] == 600000011.0
+    assert table["data_type"].tolist() == ["ctime"] * 5
+
+    assert table["detector_significances"].shape == (5, 12)
+    assert table["detector_significances"][4, 1] == 12.0
+    assert np.isnan(table["detector_significances"][0, 2])
+
+    assert table["ra"][:2].tolist() == [10.0, 10.0]
+    assert np.all(np.isnan(table["ra"][2:]))
+
+
+def test_failed_table_write(tmp_path, monkeypatch):
+    result_path = str(tmp_path / "trigger_result.yml")
+    table_path = trigger_table_path(result_path)
+
+    detector = TransientDetector()
+    detector._trigger_information = trigger_result("200106", 2)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(trigger_store.h5py.Group, "create_dataset", fail)
+
+        with pytest.raises(OSError):
+            detector.save_result(result_path)
+
+    # Neither the table nor the result file that completes the task is written
+    assert os.listdir(tmp_path) == []
+
+    detector.save_result(result_path)
+
+    assert sorted(os.listdir(tmp_path)) == ["trigger_result.h5", "trigger_result.yml"]
+    assert load_trigger_tables([table_path])["trigger_name"].tolist() == [
+        "GRT200106000",
+        "GRT200106001",
+    ]
@@ -0,0 +1,129 @@
+import numpy as np
+
+from gbm_transient_search.processors.changepoints import ChangepointPool
+from gbm_transient_search.processors.interval_statistics import IntervalStatistics
+from gbm_transient_search.processors.transient_detector import (
+    TransientDetector,
+    select_triggers,
+)
+from gbm_transient_search.processors.window_search import WindowSearch
+from gbm_transient_search.utils.intervals import merge_segments
+from gbm_transient_search.utils.significance import li_and_ma_gaussian_background
+
+
+def test_windows_match_direct_sums():
+    rng = np.random.default_rng(14)
+
+    bkg_counts = np.full((600, 4), 50.0)
+    bkg_stat_err = np.full_like(bkg_counts, 1.0)
+    counts = rng.poisson(bkg_counts).astype(float)
+
+    # Excess of 20 bins in two detectors
+    counts[300:320, :2] += 40
+
+    valid_slices = [(0, 250), (250, 251), (251, 600)]
+
+    window_search = WindowSearch(
+        IntervalStatistics(counts, bkg_counts, bkg_stat_err), valid_slices, 5.0
+    )
+
+    assert np.array_equal(window_search.window_bins([1, 10, 12, 100]), [1, 2, 20])
+
+    intervals, significances = window_search.search([10, 100])
+
+    # Every window inside a segment, none across the segment borders
+    assert len(intervals) == (249 + 348) + (231 + 330)
+    assert all(
+        any(start <= a and b <= stop for start, stop in valid_slices)
+        for a, b in intervals
+    )
+
+    for (a, b), significance in zip(intervals[::37], significances[::37]):
+        expected = li_and_ma_gaussian_background(
+            np.sum(counts[a:b], axis=0),
+            np.sum(bkg_counts[a:b], axis=0),
+            np.sqrt(np.sum(bkg_stat_err[a:b] ** 2, axis=0)),
+        )
+
+        assert np.allclose(significance, expected)
+
+    best = np.argmax(significances[:, 0])
+
+    assert np.array_equal(intervals[best], [300, 320])
+
+    intervals, significances = window_search.search([10, 100], min_significance=5)
+
+    assert len(intervals) > 0
+    assert np.all(np.max(significances, axis=1) > 5)
+
+    # No durations give no windows
+    intervals, significances = window_search.search([])
+
+    assert intervals.shape == (0, 2)
+    assert significances.shape == (0, 4)
+
+
+def old_select_triggers(intervals, significances, detectors):
+    # Loop over the triggers that was used before the grouping with the sorted index
+    trigger_intervals, segment_idx = merge_segments(intervals)
+
+    max_dets, max_intervals, max_significances = [], [], []
+
+    for i in range(len(trigger_intervals)):
+        sigs = significances[segment_idx == i]
+        ints = intervals[segment_idx == i]
+
+        int_idx, det_idx = np.where(sigs == np.max(sigs))
+
+        max_dets.append(detectors[det_idx[0]])
+        max_intervals.append(ints[int_idx[0]])
+        max_significances.append(np.max(sigs))
+
+    return trigger_intervals, max_dets, max_intervals, max_significances
+
+
+def test_select_triggers_matches_loop():
+    rng = np.random.default_rng(25)
+
+    detectors = np.array(["n0", "n1", "n2", "n3"])
+
+    for _ in range(20):
+        starts = rng.integers(0, 5000, 300)
+        intervals = np.column_stack([starts, starts + rng.integers(1, 50, 300)])
+
+        # Rounded significances give ties within and between the intervals
+        significances = np.round(rng.normal(0, 2, (300, 4)), 1)
+
+        for new, old in zip(
+            select_triggers(intervals, significances, detectors),
+            old_select_triggers(intervals, significances, detectors),
+        ):
+            assert np.array_equal(new, old)
+
+
+def test_window_search_end_to_end(day):
+    with ChangepointPool(max_workers=2) as pool:
+        detector = TransientDetector(min_bin_width=5, bad_fit_threshold=100, pool=pool)
+        detector.load_data(**day)
+
+        detector.run_window_search(
+            durations=[10, 20, 50, 100],
+            min_significance_brightest=5,
+            min_significance_others=5,
+            min_significant_dets=3,
+            max_significant_dets=8,
+        )
+
+    triggers = list(detector.trigger_information["triggers"].values())
+
+    # The burst is at the 2500th bin of the day with data
+    burst_time = day["time_bins"][2500, 0]
+
+    assert len(triggers) == 1
+    assert triggers[0]["interval"]["start"] <= burst_time
+    assert triggers[0]["interval"]["stop"] >= burst_time
+    assert triggers[0]["most_significant_detector"] == "n0"
+
+    # The trigger is the most significant of the windows that pass the thresholds
+    assert triggers[0]["significances"] == np.max(detector._significances)
+    assert np.all(np.max(detector._significances, axis=1) > 5)
@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class TimeRebinner(object):
+    """
+    Rebin time series to a minimal bin width, with the same bins as the
+    Rebinner of gbmbkgpy: the bins outside of the SAA are combined until
+    they reach the minimal width, a bin in the SAA closes the open bin and
+    stays a single bin. The bin mapping is calculated once, afterwards any
+    number of arrays with time as first axis are rebinned without a loop
+    over the rebinned bins.
+    """
+
+    def __init__(self, time_bins, min_bin_width, mask=None):
+        """
+        :param time_bins: (n, 2) array with the start and stop of the time bins
+        :param min_bin_width: minimal width of the rebinned bins
+        :param mask: bins outside of the SAA (True) and in the SAA (False)
+        """
+        time_bins = np.asarray(time_bins)
+
+        if mask is None:
+            mask = np.ones(len(time_bins), dtype=bool)
+
+        self._n_bins = len(time_bins)
+
+        self._starts, self._saa_mask = _bin_starts(
+            (time_bins[:, 1] - time_bins[:, 0]).tolist(),
+            np.asarray(mask, dtype=bool).tolist(),
+            min_bin_width,
+        )
+
+        stops = np.append(self._starts[1:], self._n_bins)[: len(self._starts)]
+
+        # Rebinned bins grouped by their number of input bins
+        lengths = stops - self._starts
+
+        self._groups = [
+            (length, np.flatnonzero(lengths == length)) for length in np.unique(lengths)
+        ]
+
+        self._time_rebinned = np.column_stack(
+            [time_bins[self._starts, 0], time_bins[stops - 1, 1]]
+        ).reshape((-1, 2))
+
+    def rebin(self, *arrays):
+        """
+        Sum the arrays in the rebinned bins
+        :param arrays: arrays with time as first axis
+        :returns: list with the rebinned arrays
+        """
+        return [self._reduce(array) for array in arrays]
+
+    def rebin_errors(self, *arrays):
+        """
+        Add the errors in the rebinned bins in quadrature
+        :param arrays: arrays with time as first axis
+        :returns: list with the rebinned errors
+        """
+        return [np.sqrt(self._reduce(np.square(array))) for array in arrays]
+
+    def _reduce(self, array):
+        """
+        Sum the input bins of every rebinned bin. The rebinned bins with the same
+        number of input bins are summed together, one shifted gather per input bin,
+        which adds the bins in the same order as a sum over each slice.
+        """
+        array = np.asarray(array)
+
+        if len(array) != self._n_bins:
+            raise ValueError(
+                f"Can not rebin {len(array)} bins with a mapping of {self._n_bins} bins"
+            )
+
+        rebinned = np.empty((len(self._starts),) + array.shape[1:], dtype=array.dtype)
+
+        for length, bins in self._groups:
+            starts = self._starts[bins]
+
+            summed = array[starts]
+
+            for i in range(1, length):
+                summed += array[starts + i]
+
+            rebinned[bins] = summed
+
+        return rebinned
+
+    @property
+    def rebinned_saa_mask(self):
+        return self._saa_mask
+
+    @property
+    def time_rebinned(self):
+        return self._time_rebinned
+
+    @property
+    def bin_starts(self):
+        return self._starts
+
+
+def _bin_starts(widths, mask, min_bin_width):
+    """
+    First input bin and SAA mask of the rebinned bins.
+    Loops over plain floats to have the same sums and comparisons
+    as the bin by bin accumulation of the gbmbkgpy Rebinner.
+    """
+    starts = []
+    saa_mask = []
+
+    width = 0.0
+    bin_open = False
+
+    for i, (bin_width, valid) in enumerate(zip(widths, mask)):
+
+        if not valid:
+            # A bin in the SAA closes the open bin and stays a single bin
+            bin_open = False
+
+            starts.append(i)
+            saa_mask.append(False)
+
+            continue
+
+        if not bin_open:
+            bin_open = True
+            width = 0.0
+
+            starts.append(i)
+            saa_mask.append(True)
+
+        width += bin_width
+
+        if width >= min_bin_width:
+            bin_open = False
+
+    return np.array(starts, dtype=int), np.array(saa_mask, dtype=bool)
@@ -64,10 +64,17 @@ structure["phys_bkg"] = dict(
 structure["transient_detection"] = dict(
     min_separation=5,
     model="l2",
+    coarse_factor=1,  # bins per block of a first coarse PELT pass, 1 to disable
+    engine="changepoints",  # or "windows" for the sliding window search
+    window_durations=[10, 20, 50, 100, 200, 500, 1000],  # seconds, "windows" engine
     min_significance_brightest=5,
     min_significance_others=5,
     min_significant_dets=3,
     max_significant_dets=8,
+    bin_widths=[5],
+    low_memory=False,
+    trace_memory=False,  # tracemalloc peak of every stage in search_timing.json, slow
+    previous_day_tail=0,  # seconds of the previous day to prepend, 0 to disable
 )
 
 structure["balrog"] = dict(
@@ -0,0 +1,16 @@
+# Names of the NaI detectors, their position in this list is the position
+# in the detector axis of the result files of the background fit
+valid_det_names = [
+    "n0",
+    "n1",
+    "n2",
+    "n3",
+    "n4",
+    "n5",
+    "n6",
+    "n7",
+    "n8",
+    "n9",
+    "na",
+    "nb",
+]
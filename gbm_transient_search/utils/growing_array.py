@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class GrowingArray(object):
+    """
+    Array with time as first axis that grows by appending rows.
+    The rows are stored in a buffer that doubles its capacity when it is full,
+    so appending n rows costs O(n) amortized instead of copying the whole array.
+    """
+
+    def __init__(self, array):
+        """
+        :param array: initial rows, the trailing shape and dtype are kept
+        """
+        array = np.asarray(array)
+
+        self._buffer = array.copy()
+        self._n_rows = len(array)
+
+    def append(self, rows):
+        """
+        Append rows with the same trailing shape
+        :param rows: rows to append
+        """
+        rows = np.asarray(rows)
+        n_rows = self._n_rows + len(rows)
+
+        if n_rows > len(self._buffer):
+            buffer = np.empty(
+                (max(n_rows, 2 * len(self._buffer)),) + self._buffer.shape[1:],
+                dtype=self._buffer.dtype,
+            )
+            buffer[: self._n_rows] = self._buffer[: self._n_rows]
+
+            self._buffer = buffer
+
+        self._buffer[self._n_rows : n_rows] = rows
+        self._n_rows = n_rows
+
+    @property
+    def values(self):
+        """
+        View of the rows, a later append can move the rows to a new buffer
+        """
+        return self._buffer[: self._n_rows]
+
+    def __len__(self):
+        return self._n_rows
+
+
+class CumulativeSum(GrowingArray):
+    """
+    Cumulative sum along the time axis with a leading zero,
+    so that the sum of [a, b) is values[b] - values[a].
+    Extending continues the sum from the last entry, which gives the
+    same values as the cumulative sum over all rows at once.
+    """
+
+    def __init__(self, array):
+        """
+        :param array: rows to sum
+        """
+        array = np.asarray(array)
+
+        cumsum = np.zeros((array.shape[0] + 1,) + array.shape[1:])
+
+        np.cumsum(array, axis=0, out=cumsum[1:])
+
+        super(CumulativeSum, self).__init__(cumsum)
+
+    def extend(self, array):
+        """
+        Continue the cumulative sum with new rows
+        :param array: rows to add
+        """
+        array = np.asarray(array)
+
+        if len(array) == 0:
+            return
+
+        cumsum = np.cumsum(np.concatenate([self.values[-1:], array]), axis=0)
+
+        self.append(cumsum[1:])
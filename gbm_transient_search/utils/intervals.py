@@ -0,0 +1,91 @@
+import numpy as np
+
+
+def mask_runs(mask):
+    """
+    Start and stop indices of the runs of True in a boolean mask
+    :param mask: array of bools
+    :returns: array of shape (n_runs, 2) with the half-open [start, stop) of each run
+    """
+    mask = np.asarray(mask, dtype=bool)
+
+    edges = np.diff(np.concatenate([[False], mask, [False]]).astype(np.int8))
+
+    return np.column_stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)])
+
+
+def compressed_runs(mask):
+    """
+    Start and stop indices of the runs of True in a boolean mask, in the index
+    space of the masked array (i.e. of array[mask])
+    :param mask: array of bools
+    :returns: array of shape (n_runs, 2) with the half-open [start, stop) of each run
+    """
+    lengths = np.diff(mask_runs(mask), axis=1)[:, 0]
+
+    stops = np.cumsum(lengths)
+
+    return np.column_stack([stops - lengths, stops])
+
+
+def index_runs(idx):
+    """
+    First and last index of the runs of consecutive integers in a sorted index array
+    :param idx: sorted array of indices
+    :returns: array of shape (n_runs, 2) with the closed [first, last] of each run
+    """
+    idx = np.asarray(idx, dtype=int)
+
+    if len(idx) == 0:
+        return np.empty((0, 2), dtype=int)
+
+    breaks = np.flatnonzero(np.diff(idx) > 1)
+
+    return np.column_stack(
+        [
+            idx[np.concatenate([[0], breaks + 1])],
+            idx[np.concatenate([breaks, [len(idx) - 1]])],
+        ]
+    )
+
+
+def gap_idx(time_bins, min_gap=10):
+    """
+    Indices of the time bins that follow a data gap (e.g. an SAA passage)
+    :param time_bins: array of shape (n, 2) with the start and stop of the time bins
+    :param min_gap: minimal gap between two time bins in seconds
+    """
+    jump = time_bins[1:, 0] - time_bins[:-1, 1]
+
+    return np.flatnonzero(jump > min_gap) + 1
+
+
+def merge_segments(segments):
+    """
+    Union of overlapping segments, touching segments are merged as well
+    :param segments: array of shape (n, 2) with the start and stop of the segments
+    :returns: array with the merged segments sorted by start and the index of the
+        merged segment of every input segment
+    """
+    segments = np.asarray(segments).reshape((-1, 2))
+
+    if len(segments) == 0:
+        return segments.copy(), np.empty(0, dtype=int)
+
+    order = np.argsort(segments[:, 0], kind="stable")
+
+    starts = segments[order, 0]
+    stops = segments[order, 1]
+
+    # A segment starts a new group if it begins after all previous segments ended
+    reach = np.maximum.accumulate(stops)
+    new_group = np.concatenate([[True], starts[1:] > reach[:-1]])
+
+    first = np.flatnonzero(new_group)
+
+    merged = np.column_stack([starts[first], np.maximum.reduceat(stops, first)])
+
+    groups = np.empty(len(segments), dtype=int)
+    groups[order] = np.cumsum(new_group) - 1
+
+    return merged, groups
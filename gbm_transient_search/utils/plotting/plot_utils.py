@@ -13,11 +13,11 @@ from chainconsumer import ChainConsumer
 from gbm_drm_gen.io.balrog_healpix_map import BALROGHealpixMap
 from gbmgeometry import gbm_detector_list
 from gbmgeometry.gbm_frame import GBMFrame
-from gbmgeometry.utils.gbm_time import GBMTime
 from gbmgeometry import PositionInterpolator
 
 import gbm_transient_search.utils.file_utils as file_utils
 from gbm_transient_search.utils.env import get_env_value
+from gbm_transient_search.utils.time_conversion import met_to_time
 
 
 _gbm_detectors = [
@@ -1052,8 +1052,7 @@ def utc(met):
     get utc time from met time
     :return:
     """
-    time = GBMTime.from_MET(met)
-    return time.time.fits
+    return met_to_time(met).fits
 
 
 def seperation_smaller_angle(center, phi, theta, angle):
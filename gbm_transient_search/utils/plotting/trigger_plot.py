@@ -4,25 +4,12 @@ import os
 import h5py
 import numpy as np
 import yaml
+from gbm_transient_search.utils.detectors import valid_det_names
+from gbm_transient_search.utils.time_window import TimeWindowIndex
 from gbmgeometry import GBMTime
 from matplotlib import cm
 from matplotlib import pyplot as plt
 
-valid_det_names = [
-    "n0",
-    "n1",
-    "n2",
-    "n3",
-    "n4",
-    "n5",
-    "n6",
-    "n7",
-    "n8",
-    "n9",
-    "na",
-    "nb",
-]
-
 echan_dict = {
     "0": "4-12 keV",
     "1": "12-27 keV",
@@ -60,6 +47,7 @@ class TriggerPlot(object):
         self._time_bin_widths = np.diff(time_bins, axis=1)[:, 0]
 
         self._saa_mask = saa_mask
+        self._window_index = TimeWindowIndex(time_bins, saa_mask)
         self._counts = counts
         self._echans = echans
         self._detectors = detectors
@@ -401,10 +389,11 @@ class TriggerPlot(object):
 
         fig, ax = plt.subplots(self._nr_subplots, 1, sharex=True, figsize=[6.4, 10])
 
-        time_mask = np.logical_and(
-            self._time[self._saa_mask] > trigger["interval"]["start"] - 1000,
-            self._time[self._saa_mask] < trigger["interval"]["stop"] + 1000,
+        time_window = (
+            trigger["interval"]["start"] - 1000,
+            trigger["interval"]["stop"] + 1000,
         )
+        rows = self._window_index.rows(*time_window)
 
         i = -1
 
@@ -421,8 +410,8 @@ class TriggerPlot(object):
                     data_color = "lightcoral"
 
                 ax[i].scatter(
-                    self._time[self._saa_mask][time_mask],
-                    self._counts[:, det_idx, e][self._saa_mask][time_mask],
+                    self._time[rows],
+                    self._counts[rows, det_idx, e],
                     alpha=0.9,
                     linewidth=0.5,
                     s=2,
@@ -431,8 +420,8 @@ class TriggerPlot(object):
                 )
 
                 ax[i].plot(
-                    self._time[self._saa_mask][time_mask],
-                    self._bkg_counts[:, det_idx, e][self._saa_mask][time_mask],
+                    self._time[rows],
+                    self._bkg_counts[rows, det_idx, e],
                     label="Bkg model",
                     color="red",
                     linewidth=1,
@@ -467,19 +456,15 @@ class TriggerPlot(object):
 
                 ax[i].set_ylabel(f"Counts e{e}", fontsize=fontsize)
 
-                ymin = np.percentile(
-                    self._counts[:, det_idx, e][self._saa_mask][time_mask], 0, axis=0
-                )
-                ymax = np.percentile(
-                    self._counts[:, det_idx, e][self._saa_mask][time_mask], 99.9, axis=0
-                )
+                ymin = np.percentile(self._counts[rows, det_idx, e], 0, axis=0)
+                ymax = np.percentile(self._counts[rows, det_idx, e], 99.9, axis=0)
                 ymin_bkg = np.percentile(
-                    self._bkg_counts[:, det_idx, e][self._saa_mask][time_mask],
+                    self._bkg_counts[rows, det_idx, e],
                     0,
                     axis=0,
                 )
                 ymax_bkg = np.percentile(
-                    self._bkg_counts[:, det_idx, e][self._saa_mask][time_mask],
+                    self._bkg_counts[rows, det_idx, e],
                     99.9,
                     axis=0,
                 )
@@ -499,8 +484,8 @@ class TriggerPlot(object):
         if self._show_counts_cleaned:
             i += 1
             ax[i].plot(
-                self._time[self._saa_mask][time_mask],
-                self._counts_cleaned[:, det_idx, :][self._saa_mask][time_mask],
+                self._time[rows],
+                self._counts_cleaned[rows, det_idx, :],
             )
 
             ax[i].axvspan(
@@ -523,11 +508,11 @@ class TriggerPlot(object):
         if self._show_all_echans:
             i += 1
             ax[i].plot(
-                self._time[self._saa_mask][time_mask],
+                self._time[rows],
                 np.sum(
-                    self._counts_cleaned[:, det_idx, :][
+                    self._counts_cleaned[rows, det_idx, :][
                         :, self._good_bkg_fit_mask[det_idx, :]
-                    ][self._saa_mask][time_mask],
+                    ],
                     axis=1,
                 ),
             )
@@ -562,8 +547,8 @@ class TriggerPlot(object):
             i += 1
 
             ax[i].plot(
-                self._time[self._saa_mask][time_mask],
-                self._angles[time_mask],
+                self._time[rows],
+                self._angles[self._window_index.window(*time_window)],
             )
 
             ax[i].axvspan(
@@ -649,10 +634,11 @@ class TriggerPlot(object):
             figsize=[6.4 * len(use_dets), 10],
         )
 
-        time_mask = np.logical_and(
-            self._time[self._saa_mask] > trigger["interval"]["start"] - 1000,
-            self._time[self._saa_mask] < trigger["interval"]["stop"] + 1000,
+        time_window = (
+            trigger["interval"]["start"] - 1000,
+            trigger["interval"]["stop"] + 1000,
         )
+        rows = self._window_index.rows(*time_window)
 
         for d, det in enumerate(use_dets):
             det_idx = valid_det_names.index(det)
@@ -672,8 +658,8 @@ class TriggerPlot(object):
                         data_color = "lightcoral"
 
                     ax[i, d].scatter(
-                        self._time[self._saa_mask][time_mask],
-                        self._counts[:, det_idx, e][self._saa_mask][time_mask],
+                        self._time[rows],
+                        self._counts[rows, det_idx, e],
                         alpha=0.9,
                         linewidth=0.5,
                         s=2,
@@ -682,8 +668,8 @@ class TriggerPlot(object):
                     )
 
                     ax[i, d].plot(
-                        self._time[self._saa_mask][time_mask],
-                        self._bkg_counts[:, det_idx, e][self._saa_mask][time_mask],
+                        self._time[rows],
+                        self._bkg_counts[rows, det_idx, e],
                         label="Bkg model",
                         color="red",
                         linewidth=1,
@@ -718,17 +704,11 @@ class TriggerPlot(object):
 
                     ax[i, 0].set_ylabel(f"Counts e{e}", fontsize=fontsize)
 
-                    ymin = np.percentile(
-                        self._counts[:, d, e][self._saa_mask][time_mask], 0, axis=0
-                    )
-                    ymax = np.percentile(
-                        self._counts[:, d, e][self._saa_mask][time_mask], 99.9, axis=0
-                    )
-                    ymin_bkg = np.percentile(
-                        self._bkg_counts[:, d, e][self._saa_mask][time_mask], 0, axis=0
-                    )
+                    ymin = np.percentile(self._counts[rows, d, e], 0, axis=0)
+                    ymax = np.percentile(self._counts[rows, d, e], 99.9, axis=0)
+                    ymin_bkg = np.percentile(self._bkg_counts[rows, d, e], 0, axis=0)
                     ymax_bkg = np.percentile(
-                        self._bkg_counts[:, d, e][self._saa_mask][time_mask],
+                        self._bkg_counts[rows, d, e],
                         99.9,
                         axis=0,
                     )
@@ -746,8 +726,8 @@ class TriggerPlot(object):
             if self._show_counts_cleaned:
                 i += 1
                 ax[i, d].plot(
-                    self._time[self._saa_mask][time_mask],
-                    self._counts_cleaned[:, det_idx, :][self._saa_mask][time_mask],
+                    self._time[rows],
+                    self._counts_cleaned[rows, det_idx, :],
                 )
 
                 ax[i, d].axvspan(
@@ -770,11 +750,11 @@ class TriggerPlot(object):
             if self._show_all_echans:
                 i += 1
                 ax[i, d].plot(
-                    self._time[self._saa_mask][time_mask],
+                    self._time[rows],
                     np.sum(
-                        self._counts_cleaned[:, det_idx, :][
+                        self._counts_cleaned[rows, det_idx, :][
                             :, self._good_bkg_fit_mask[det_idx, :]
-                        ][self._saa_mask][time_mask],
+                        ],
                         axis=1,
                     ),
                 )
@@ -837,10 +817,11 @@ class TriggerPlot(object):
 
             fig, ax = plt.subplots(len(self._echans), 1, sharex=True, figsize=[6.4, 10])
 
-            time_mask = np.logical_and(
-                self._time[self._saa_mask] > trigger["interval"]["start"] - 800,
-                self._time[self._saa_mask] < trigger["interval"]["stop"] + 800,
+            time_window = (
+                trigger["interval"]["start"] - 800,
+                trigger["interval"]["stop"] + 800,
             )
+            rows = self._window_index.rows(*time_window)
 
             i = -1
 
@@ -855,8 +836,8 @@ class TriggerPlot(object):
                     data_color = "darkgray"
 
                 ax[i].scatter(
-                    self._time[self._saa_mask][time_mask] - trigger["trigger_time"],
-                    self._counts[:, det_idx, e][self._saa_mask][time_mask],
+                    self._time[rows] - trigger["trigger_time"],
+                    self._counts[rows, det_idx, e],
                     alpha=0.9,
                     linewidth=0.8,
                     s=3,
@@ -866,8 +847,8 @@ class TriggerPlot(object):
                 )
 
                 ax[i].plot(
-                    self._time[self._saa_mask][time_mask] - trigger["trigger_time"],
-                    self._bkg_counts[:, det_idx, e][self._saa_mask][time_mask],
+                    self._time[rows] - trigger["trigger_time"],
+                    self._bkg_counts[rows, det_idx, e],
                     label="Bkg model",
                     color="red",
                     linewidth=1,
@@ -905,18 +886,18 @@ class TriggerPlot(object):
                 ax[i].tick_params(axis="both", which="minor", labelsize=fontsize)
 
                 # ymin = np.percentile(
-                #     self._counts[:, det_idx, e][self._saa_mask][time_mask], 0, axis=0
+                #     self._counts[rows, det_idx, e], 0, axis=0
                 # )
                 # ymax = np.percentile(
-                #     self._counts[:, det_idx, e][self._saa_mask][time_mask], 99.9, axis=0
+                #     self._counts[rows, det_idx, e], 99.9, axis=0
                 # )
                 # ymin_bkg = np.percentile(
-                #     self._bkg_counts[:, det_idx, e][self._saa_mask][time_mask],
+                #     self._bkg_counts[rows, det_idx, e],
                 #     0,
                 #     axis=0,
                 # )
                 # ymax_bkg = np.percentile(
-                #     self._bkg_counts[:, det_idx, e][self._saa_mask][time_mask],
+                #     self._bkg_counts[rows, det_idx, e],
                 #     99.9,
                 #     axis=0,
                 # )
@@ -0,0 +1,153 @@
+import hashlib
+import os
+import tempfile
+import time
+
+import numpy as np
+
+
+class RebinCache(object):
+    """
+    On-disk cache of rebinned data, keyed by the source of the input data
+    (e.g. the path, size and modification time of the result file),
+    the minimal bin width and the settings used to load the data.
+    The key is known before the data is loaded and does not depend on the size
+    of the data. The least recently used entries are removed when the cache
+    grows larger than max_size.
+    """
+
+    def __init__(self, cache_dir, max_size=10 * 1024 ** 3, tmp_max_age=3600):
+        """
+        :param cache_dir: directory of the cache files (e.g. $GBMDATA/bkg_pipe/cache)
+        :param max_size: maximal size of the cache in bytes
+        :param tmp_max_age: age in seconds after which the temporary files of
+            writes that did not finish (e.g. a killed process) are removed
+        """
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._tmp_max_age = tmp_max_age
+
+    @staticmethod
+    def file_source(path):
+        """
+        Source of the data in a file, changes when the file is rewritten
+        :param path: path of the file
+        :returns: tuple of the absolute path, size and modification time
+        """
+        stat = os.stat(path)
+
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def key(min_bin_width, source, **settings):
+        """
+        Hash of the data source, the bin width and the settings
+        :param min_bin_width: minimal bin width of the rebinning
+        :param source: source of the input data (e.g. from file_source)
+        :param settings: settings that change the loaded data (e.g. the loaded detectors)
+        """
+        sha = hashlib.sha256()
+
+        sha.update(repr(float(min_bin_width)).encode())
+        sha.update(repr(source).encode())
+        sha.update(repr(sorted(settings.items())).encode())
+
+        return sha.hexdigest()
+
+    def _cache_file(self, key):
+        return os.path.join(self._cache_dir, f"rebinned_{key}.npz")
+
+    def load(self, key):
+        """
+        Load the rebinned arrays for a key
+        :returns: dictionary with the rebinned arrays, None if the key is not cached
+        """
+        cache_file = self._cache_file(key)
+
+        try:
+            with np.load(cache_file) as f:
+                rebinned = {name: f[name] for name in f.files}
+
+        except (OSError, ValueError):
+            return None
+
+        # Mark as recently used
+        os.utime(cache_file)
+
+        return rebinned
+
+    def store(self, key, **rebinned):
+        """
+        Store the rebinned arrays for a key and evict the least recently used
+        entries if the cache is too large
+        """
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+        # Write to a temporary file first, so other processes never read a partial file
+        fd, tmp_file = tempfile.mkstemp(dir=self._cache_dir, suffix=".npz.tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **rebinned)
+
+            os.replace(tmp_file, self._cache_file(key))
+
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+        self._evict()
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the cache fits into max_size
+        and the temporary files that are older than tmp_max_age
+        """
+        entries = []
+
+        for file_name in os.listdir(self._cache_dir):
+
+            is_tmp = file_name.endswith(".npz.tmp")
+
+            if not (
+                is_tmp
+                or (file_name.startswith("rebinned_") and file_name.endswith(".npz"))
+            ):
+                continue
+
+            path = os.path.join(self._cache_dir, file_name)
+
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+
+            if is_tmp:
+                # The temporary files of running writes are kept
+                if time.time() - stat.st_mtime > self._tmp_max_age:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+
+            if total_size <= self._max_size:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            total_size -= size
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def li_and_ma_gaussian_background(counts, bkg_counts, bkg_err):
+    """
+    Li & Ma significance for Poisson distributed counts and a background
+    with Gaussian errors (Vianello 2018), the same as
+    Significance.li_and_ma_equivalent_for_gaussian_background of threeML.
+    Works on arrays of any shape (e.g. intervals x detectors) in one call
+    and stays finite for zero counts and zero background errors.
+    :param counts: observed counts
+    :param bkg_counts: background counts
+    :param bkg_err: 1 sigma errors of the background counts
+    :returns: array with the significances, negative for counts below the background
+    """
+    o, b, sigma_b = np.broadcast_arrays(
+        np.asarray(counts, dtype=float),
+        np.asarray(bkg_counts, dtype=float),
+        np.asarray(bkg_err, dtype=float),
+    )
+
+    var_b = sigma_b ** 2
+
+    # Profiled background b0 is the positive root of
+    # b0^2 - (b - var_b) * b0 - var_b * o = 0, the form of the solution is chosen
+    # to avoid the cancellation of root and half_p
+    half_p = 0.5 * (b - var_b)
+    root = np.sqrt(half_p * half_p + var_b * o)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b0 = np.where(half_p >= 0, half_p + root, var_b * o / (root - half_p))
+
+        # Gaussian constraint of the background, zero for a known background
+        log_ratio = np.where(var_b > 0, (b0 - b) ** 2 / (2 * var_b), 0.0)
+        log_ratio += b0 - o
+
+        # 0 * log(0) is 0 for zero counts
+        log_ratio += np.where(o > 0, o * np.log(o / b0), 0.0)
+
+    significance = np.sqrt(2 * np.clip(log_ratio, 0, None))
+
+    return np.where(o > b, significance, -significance)
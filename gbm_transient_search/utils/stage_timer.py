@@ -0,0 +1,214 @@
+import json
+import os
+import resource
+import socket
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def peak_memory():
+    """
+    Peak resident memory of the process since its start in MB,
+    this is the high-water mark of the whole process lifetime
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_memory():
+    """
+    Current resident memory of the process in MB,
+    None if it is not available (it is read from /proc, so only on Linux)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+
+    except (OSError, ValueError, IndexError):
+        return None
+
+    return rss_pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+class MemorySampler(object):
+    """
+    Samples the current resident memory in a thread to find its peak
+    between start and stop. Memory that is allocated and released again
+    between two samples is missed, so the peak is a lower bound.
+    """
+
+    def __init__(self, interval=0.01):
+        """
+        :param interval: time between two samples in seconds
+        """
+        self._interval = interval
+
+        self._peak = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start sampling, does nothing if the memory can not be read
+        """
+        self._peak = current_memory()
+
+        if self._peak is None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling
+        :returns: peak of the sampled memory in MB, None if it can not be read
+        """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+
+            self._thread = None
+
+        self._update_peak()
+
+        return self._peak
+
+    @property
+    def peak(self):
+        """
+        :returns: peak of the memory sampled so far in MB, None if it can not be read
+        """
+        return self._peak
+
+    def _update_peak(self):
+        memory = current_memory()
+
+        if memory is not None and self._peak is not None:
+            self._peak = max(self._peak, memory)
+
+    def _sample(self):
+        while not self._stop_event.wait(self._interval):
+            self._update_peak()
+
+
+class StageTimer(object):
+    """
+    Records the wall time, CPU time and memory of the stages of a search.
+    The CPU time is the one of this process, the time spent in the workers
+    of the changepoint pool only enters the wall time.
+    The memory of a stage is the resident memory at its start and end and
+    its peak during the stage, which is sampled in a thread. Peaks that are
+    shorter than the sample interval are missed, so the peak is a lower bound;
+    with trace_memory the exact peak of the memory allocated by Python is
+    recorded as well. The lifetime peak of the process is recorded too, but it
+    includes all previous stages.
+    """
+
+    def __init__(self, trace_memory=False, sample_interval=0.01):
+        """
+        :param trace_memory: also record the peak of the memory that is traced by
+            tracemalloc during each stage (slows down the search)
+        :param sample_interval: time between two samples of the resident memory
+            in seconds
+        """
+        self._trace_memory = trace_memory
+        self._sample_interval = sample_interval
+
+        self.reset()
+
+    def reset(self):
+        """
+        Remove all recorded stages
+        """
+        self._stages = []
+
+    @contextmanager
+    def stage(self, name, **info):
+        """
+        Context manager that records one stage
+        :param name: name of the stage (e.g. rebin)
+        :param info: additional information that is stored with the stage
+        """
+        # Tracing slows down everything, so it is stopped again by the stage
+        # that started it
+        start_tracing = self._trace_memory and not tracemalloc.is_tracing()
+
+        if start_tracing:
+            tracemalloc.start()
+
+        if self._trace_memory:
+            tracemalloc.reset_peak()
+
+        sampler = MemorySampler(self._sample_interval)
+        sampler.start()
+
+        rss_start = current_memory()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+
+            rss_end = current_memory()
+            peak_rss = sampler.stop()
+
+            if peak_rss is not None:
+                peak_rss = max(peak_rss, rss_start, rss_end)
+
+            record = dict(
+                stage=name,
+                wall_time=wall_time,
+                cpu_time=cpu_time,
+                rss_start_mb=rss_start,
+                rss_end_mb=rss_end,
+                rss_delta_mb=(None if rss_start is None else rss_end - rss_start),
+                peak_rss_mb=peak_rss,
+                lifetime_peak_rss_mb=peak_memory(),
+            )
+
+            if self._trace_memory:
+                record["peak_traced_mb"] = (
+                    tracemalloc.get_traced_memory()[1] / 1024 ** 2
+                )
+
+            if start_tracing:
+                tracemalloc.stop()
+
+            record.update(info)
+
+            self._stages.append(record)
+
+    def save(self, output_path):
+        """
+        Save the recorded stages as json
+        """
+        output_dir = os.path.dirname(output_path)
+
+        if output_dir != "" and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        with open(output_path, "w") as f:
+            json.dump(
+                dict(
+                    host=socket.gethostname(),
+                    created=datetime.now().isoformat(timespec="seconds"),
+                    total_wall_time=sum(s["wall_time"] for s in self._stages),
+                    total_cpu_time=sum(s["cpu_time"] for s in self._stages),
+                    stages=self._stages,
+                ),
+                f,
+                indent=2,
+            )
+
+    @property
+    def stages(self):
+        return self._stages
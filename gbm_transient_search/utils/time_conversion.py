@@ -0,0 +1,53 @@
+import astropy.time as astro_time
+import numpy as np
+
+# Leap second table of GBMTime: MET of the leap seconds since 2001 and
+# the difference between TT and UTC before, between and after them
+leap_second_met = np.array([252460801.0, 362793602.0, 457401603.0, 504921604.0])
+utc_tt_diff = np.array([65.184, 66.184, 67.184, 68.184, 69.184])
+
+
+def met_to_mjd(met):
+    """
+    Convert Fermi MET to MJD (UTC) with the same leap second table as GBMTime.from_MET
+    :param met: MET or array of METs
+    """
+    met = np.asarray(met, dtype=float)
+
+    diff = utc_tt_diff[np.searchsorted(leap_second_met, met, side="left")]
+
+    return ((met - diff) / 86400.0) + 51910 + 0.0007428703703
+
+
+def met_to_time(met):
+    """
+    Convert Fermi MET to an astropy Time object, arrays are converted in one call
+    :param met: MET or array of METs
+    """
+    return astro_time.Time(met_to_mjd(met), scale="utc", format="mjd")
+
+
+def trigger_names_from_met(met):
+    """
+    Trigger names, dates and UTC strings for an array of trigger times
+    :param met: array of trigger times in MET
+    :returns: arrays with the trigger names (GRTyymmddfff with the fraction of the day),
+        the dates (yymmdd) and the UTC iso strings
+    """
+    met = np.atleast_1d(met)
+
+    if len(met) == 0:
+        return np.array([], dtype=str), np.array([], dtype=str), np.array([], dtype=str)
+
+    times = met_to_time(met)
+
+    dates = np.atleast_1d(times.strftime("%y%m%d"))
+
+    # Thousandth of the day, rounded as in the trigger names of the single conversion
+    day_fractions = [f"{round(mjd % 1, 3):.3f}"[2:] for mjd in times.mjd.tolist()]
+
+    names = np.array(
+        [f"GRT{date}{fraction}" for date, fraction in zip(dates, day_fractions)]
+    )
+
+    return names, dates, np.atleast_1d(times.iso)
@@ -0,0 +1,37 @@
+import numpy as np
+
+
+class TimeWindowIndex(object):
+    """
+    Index of the time bins outside of the SAA, built once per day.
+    It maps a time window to the rows (or the slice of the bins outside of
+    the SAA) that the trigger plots index their arrays with. The bins are found
+    with a binary search on the mean times instead of masking the arrays of
+    the whole day, so a window only costs O(log T) plus the bins in the window.
+    """
+
+    def __init__(self, time_bins, saa_mask):
+        """
+        :param time_bins: (n, 2) array with the start and stop of the time bins
+        :param saa_mask: bins outside of the SAA (True) and in the SAA (False)
+        """
+        self._rows = np.flatnonzero(saa_mask)
+
+        self._mean_time = np.mean(time_bins, axis=1)[self._rows]
+
+    def window(self, start, stop):
+        """
+        Slice of the bins outside of the SAA with start < mean time < stop,
+        for arrays that only contain the bins outside of the SAA (e.g. the angles)
+        """
+        return slice(
+            np.searchsorted(self._mean_time, start, side="right"),
+            np.searchsorted(self._mean_time, stop, side="left"),
+        )
+
+    def rows(self, start, stop):
+        """
+        Rows of the bins outside of the SAA with start < mean time < stop,
+        for arrays with all bins of the day
+        """
+        return self._rows[self.window(start, stop)]
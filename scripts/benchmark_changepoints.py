@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+import time
+
+import numpy as np
+import ruptures as rpt
+
+from gbm_transient_search.processors.changepoints import pelt
+from gbm_transient_search.processors.transient_detector import TransientDetector
+
+
+def run_ruptures(array_slice, penalty, min_size, jump):
+    return (
+        rpt.Pelt(model="l2", min_size=min_size, jump=jump)
+        .fit(array_slice)
+        .predict(pen=penalty)
+    )
+
+
+def run_native(array_slice, penalty, min_size, jump):
+    return pelt(
+        array_slice, pen=penalty, model="native_l2", min_size=min_size, jump=jump
+    )
+
+
+def benchmark(result_file, min_bin_width, min_size=1, jump=1):
+    """
+    Run the changepoint detection on the angles of every valid slice
+    with ruptures and the native PELT implementation and compare
+    the run time and the change points.
+    """
+    transient_detector = TransientDetector(
+        result_file=result_file, min_bin_width=min_bin_width, bad_fit_threshold=100
+    )
+
+    run_time = {"ruptures": 0.0, "native": 0.0}
+    n_identical = 0
+
+    for start, stop in transient_detector._valid_slices:
+
+        array_slice = transient_detector._angles[start:stop]
+
+        penalty = 2 * np.log(len(array_slice))
+
+        cpts = {}
+
+        for name, func in [("ruptures", run_ruptures), ("native", run_native)]:
+            t0 = time.perf_counter()
+
+            cpts[name] = func(array_slice, penalty, min_size, jump)
+
+            run_time[name] += time.perf_counter() - t0
+
+        if cpts["ruptures"] == cpts["native"]:
+            n_identical += 1
+
+    n_slices = len(transient_detector._valid_slices)
+
+    print(
+        f"min_bin_width={min_bin_width}s | {len(transient_detector._angles)} bins | "
+        f"{n_slices} slices | identical change points in {n_identical}/{n_slices} slices"
+    )
+    print(
+        f"ruptures: {run_time['ruptures']:.2f}s | native: {run_time['native']:.2f}s | "
+        f"speed-up: {run_time['ruptures'] / run_time['native']:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ############## Argparse for parsing bash arguments ################
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    parser.add_argument(
+        "-f",
+        "--result_file",
+        type=str,
+        help="Path to the combined background fit result (phys_bkg_combined.hdf5)",
+        required=True,
+    )
+
+    parser.add_argument(
+        "-bw",
+        "--bin_widths",
+        type=float,
+        nargs="+",
+        default=[1, 5],
+        help="Minimal bin widths to benchmark",
+    )
+
+    args = parser.parse_args()
+
+    for bin_width in args.bin_widths:
+        benchmark(args.result_file, bin_width)